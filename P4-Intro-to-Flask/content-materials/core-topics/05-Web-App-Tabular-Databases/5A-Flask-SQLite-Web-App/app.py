@@ -15,9 +15,12 @@ USAGE:          Run in CLI with command `python(3) app.py`, `flask run`, or
 ################################################################################
 
 
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, Response, request, jsonify, make_response
 from flask_cors import CORS
 
+from itertools import chain
+import sqlite3
+
 import utils
 
 
@@ -50,10 +53,32 @@ def api_home():
 def api_access():
     return jsonify({"message": "This API supports access to GET, POST, PATCH, and DELETE requests."})
 
-# GET Request to Access All Mob Data.
+# GET Request to Access All Mob Data (Optionally Filtered, Sorted, and Limited).
+# NOTE: The JSON array is streamed one batch of rows at a time, so memory stays flat however many mobs exist.
+#       See `utils.build_mob_query()` for the supported query arguments.
+#       The first batch is read before responding, so a failed query still gets a `500`. A read that fails
+#       after that aborts the stream, rather than ending it as a shorter but valid array.
 @app.route("/api/mobs", methods=["GET"])
 def api_get_mobs():
-    return jsonify(utils.get_mobs())
+    try:
+        query, parameters = utils.build_mob_query(request.args)
+    except ValueError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    batches = utils.iterate_mob_batches(query=query, parameters=parameters)
+    try:
+        first_batch = next(batches, [])
+    except sqlite3.Error:
+        return make_response(jsonify({"error": "Failed to read mobs from the database."}), 500)
+
+    def generate_mobs_array():
+        yield "["
+        separator = ""
+        for batch in chain([first_batch], batches):
+            # NOTE: Each batch is encoded in one call, as a JSON array with its brackets trimmed.
+            yield separator + app.json.dumps(batch)[1:-1]
+            separator = ","
+        yield "]"
+    return Response(generate_mobs_array(), status=200, mimetype="application/json")
 
 # GET Request to Access Single Mob Data by ID.
 @app.route("/api/mobs/<int:mob_id>", methods=["GET"])
@@ -66,6 +91,22 @@ def api_add_mob():
     new_mob = request.json
     return jsonify(utils.create_mob(new_mob))
 
+# POST Request to Add (or, with `?upsert=true`, Add or Update) Many Mobs in One Transaction.
+# NOTE: Upserted mobs that carry a `mob_id` replace that mob's fields; all others are added.
+@app.route("/api/mobs/batch", methods=["POST"])
+def api_add_mobs():
+    new_mobs = request.json
+    if not isinstance(new_mobs, list):
+        return make_response(jsonify({"error": "Expected a JSON array of mobs."}), 400)
+    upsert = request.args.get("upsert", "false").lower() in ("1", "true")
+    try:
+        created_mobs = utils.create_mobs(new_mobs, upsert=upsert)
+    except ValueError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    except sqlite3.Error:
+        return make_response(jsonify({"error": "No mobs were written; the database could not be updated."}), 500)
+    return make_response(jsonify(created_mobs), 201)
+
 # PATCH Request to Update One Mob Metric for Single Mob in Database.
 @app.route("/api/mobs/<int:mob_id>", methods=["PATCH"])
 def api_update_mob(mob_id):
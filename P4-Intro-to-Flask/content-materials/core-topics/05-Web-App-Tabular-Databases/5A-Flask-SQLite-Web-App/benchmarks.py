@@ -0,0 +1,347 @@
+"""
+FILENAME:       `benchmarks.py`
+TITLE:          Flask REST API integrated with SQLite3.
+AUTHOR:         Aakash 'Kash' Sudhakar
+DESCRIPTION:    Performance checks for the mobs API and its SQLite helpers.
+                Every benchmark works on a scratch database, so `mobs.db`
+                is never touched.
+USAGE:          Run in CLI with command `python(3) benchmarks.py <benchmark>`.
+                (e.g. `python benchmarks.py connection-pool` or
+                `python benchmarks.py streaming --sizes 10000 10000000`)
+"""
+
+
+################################################################################
+#### IMPORTATIONS AND INITIALIZATIONS FOR SERVER DEVELOPMENT IN FLASK & SQL ####
+################################################################################
+
+
+from werkzeug.serving import make_server
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import utils
+
+# Point every helper at a scratch database before the app is imported.
+SCRATCH_DIRECTORY = tempfile.mkdtemp(prefix="mobs-benchmarks-")
+utils.connection_pool = utils.ConnectionPool(os.path.join(SCRATCH_DIRECTORY, "mobs.db"))
+
+from app import app
+
+
+################################################################################
+######################### DEFINE BENCHMARK UTILITIES ###########################
+################################################################################
+
+
+def seed_scratch_mobs(count: int):
+    utils.create_data_table()
+    fill_scratch_mobs(count)
+
+def generate_scratch_mobs(start: int, stop: int):
+    return ({"name": f"Mob {index}", "hit_points": 20, "damage": index % 10, "speed": 1, "is_hostile": index % 2 == 0} for index in range(start, stop))
+
+# Tops the scratch `mobs` table up to `count` rows in one transaction.
+def fill_scratch_mobs(count: int):
+    with utils.connect_to_database() as connection:
+        existing = connection.execute("SELECT COUNT(*) FROM mobs").fetchone()[0]
+    utils.create_mobs(generate_scratch_mobs(existing, count), returning=False)
+
+def count_open_file_descriptors():
+    # NOTE: Linux only; returns None where `/proc` is unavailable.
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except FileNotFoundError:
+        return None
+
+def print_table(headers: list, rows: list):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for line in [headers, ["-" * width for width in widths], *rows]:
+        print("  ".join(str(value).rjust(width) for value, width in zip(line, widths)))
+
+
+################################################################################
+################ CONNECTION POOLING THROUGHPUT AND LEAK CHECKS #################
+################################################################################
+
+
+# Sends GET requests from several client threads for a fixed time. Returns requests/sec.
+def measure_requests_per_second(port: int, paths: list, clients: int, seconds: float):
+    completed, stop_at = [0] * clients, time.monotonic() + seconds
+
+    def send_requests(client_index: int):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        while time.monotonic() < stop_at:
+            connection.request("GET", paths[completed[client_index] % len(paths)])
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                raise RuntimeError(f"Unexpected status {response.status}.")
+            completed[client_index] += 1
+        connection.close()
+
+    threads = [threading.Thread(target=send_requests, args=(index,)) for index in range(clients)]
+    started_at = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(completed) / (time.perf_counter() - started_at)
+
+def benchmark_connection_pool(mobs: int, clients: int, seconds: float):
+    seed_scratch_mobs(mobs)
+    paths = [f"/api/mobs/{mob_id}" for mob_id in range(1, mobs + 1)]
+    # NOTE: Per-request access logs would cost more than the route being measured.
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    # NOTE: Werkzeug's threaded server starts a thread per connection, as `app.run()` does.
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    # NOTE: The first mode mirrors the original helpers: a bare `sqlite3.connect()` for every call.
+    modes = [
+        ("bare connection per call", 0, []),
+        ("configured connection per call", 0, utils.CONNECTION_PRAGMAS),
+        (f"pooled ({utils.CONNECTION_POOL_SIZE} idle)", utils.CONNECTION_POOL_SIZE, utils.CONNECTION_PRAGMAS),
+    ]
+    rows = []
+    for label, pool_size, pragmas in modes:
+        utils.connection_pool.close_all()
+        utils.connection_pool.size = pool_size
+        utils.CONNECTION_PRAGMAS = pragmas
+        measure_requests_per_second(port, paths, clients, 0.5)
+        descriptors_before = count_open_file_descriptors()
+        requests_per_second = measure_requests_per_second(port, paths, clients, seconds)
+        # NOTE: Client sockets are closed by now, so anything left over belongs to the server.
+        time.sleep(0.2)
+        descriptors_after = count_open_file_descriptors()
+        rows.append([label, f"{requests_per_second:,.0f}", descriptors_before, descriptors_after, utils.connection_pool.open_count()])
+    server.shutdown()
+
+    print(f"GET /api/mobs/<id> with {clients} client threads for {seconds:g}s each:\n")
+    print_table(["Connections", "Requests/sec", "FDs before", "FDs after", "Open connections"], rows)
+    leaked = [row for row in rows if row[2] is not None and row[3] > row[2] + utils.CONNECTION_POOL_SIZE * 3]
+    # NOTE: Each pooled connection may hold up to three descriptors (database, WAL, and shared-memory files).
+    print("\n>> File descriptor check:", "FAILED (descriptors leaked)" if leaked else "passed (no descriptors leaked)")
+
+
+################################################################################
+################### STREAMED LISTING PEAK MEMORY CHECKS ########################
+################################################################################
+
+
+# Runs `function()` and returns its wall time and peak traced memory in MiB.
+def measure_peak_memory(function):
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    try:
+        function()
+        elapsed = time.perf_counter() - started_at
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+# The original `get_mobs()` followed by `jsonify()`: every row fetched, copied into a dict, then encoded.
+def build_legacy_listing():
+    with utils.connect_to_database() as connection:
+        rows = connection.execute("SELECT * FROM mobs").fetchall()
+    all_mobs = []
+    for row in rows:
+        mob = {}
+        for key in utils.MOB_FEATURES:
+            mob[key] = row[key]
+        all_mobs.append(mob)
+    return json.dumps(all_mobs)
+
+def read_streamed_listing():
+    response = app.test_client().get("/api/mobs", buffered=False)
+    received = sum(len(chunk) for chunk in response.response)
+    response.close()
+    return received
+
+def benchmark_streaming(sizes: list, legacy_max: int):
+    utils.create_data_table()
+    rows = []
+    for size in sorted(sizes):
+        fill_scratch_mobs(size)
+        legacy = measure_peak_memory(build_legacy_listing) if size <= legacy_max else None
+        streamed = measure_peak_memory(read_streamed_listing)
+        rows.append([
+            f"{size:,}",
+            f"{legacy[1]:,.1f}" if legacy else "skipped",
+            f"{legacy[0]:.2f}" if legacy else "skipped",
+            f"{streamed[1]:,.1f}",
+            f"{streamed[0]:.2f}",
+        ])
+
+    print(f"\nGET /api/mobs, peak traced memory (MiB) and time (s), streaming {utils.STREAM_BATCH_SIZE:,} rows per batch:\n")
+    print_table(["Mobs", "Legacy MiB", "Legacy s", "Streamed MiB", "Streamed s"], rows)
+
+
+################################################################################
+########################## ROW FACTORY THROUGHPUT ##############################
+################################################################################
+
+
+def measure_elapsed_seconds(function, rows: int):
+    started_at = time.perf_counter()
+    fetched = function()
+    elapsed = time.perf_counter() - started_at
+    if fetched != rows:
+        raise RuntimeError(f"Expected {rows:,} rows to be fetched, got {fetched:,}.")
+    return elapsed
+
+# Fetches every mob with `row_factory` set on the cursor, then applies `convert` to each row.
+def fetch_all_mobs(row_factory, convert=None):
+    with utils.connect_to_database() as connection:
+        cursor = connection.cursor()
+        cursor.row_factory = row_factory
+        rows = cursor.execute("SELECT * FROM mobs").fetchall()
+    return len(rows if convert is None else [convert(row) for row in rows])
+
+def benchmark_row_factory(mobs: int, repeats: int):
+    seed_scratch_mobs(mobs)
+    paths = [
+        ("plain tuples (no dicts)", lambda: fetch_all_mobs(None)),
+        ("sqlite3.Row (no dicts)", lambda: fetch_all_mobs(sqlite3.Row)),
+        ("sqlite3.Row, copied key by key", lambda: fetch_all_mobs(sqlite3.Row, lambda row: {key: row[key] for key in utils.MOB_FEATURES})),
+        ("build_row_factory()", lambda: fetch_all_mobs(utils.build_row_factory(tuple(utils.MOB_FEATURES)))),
+    ]
+    rows = []
+    for label, fetch in paths:
+        fetch()
+        best = min(measure_elapsed_seconds(fetch, mobs) for _ in range(repeats))
+        rows.append([label, f"{best * 1000:,.1f}", f"{mobs / best:,.0f}"])
+
+    print(f"\nFetching all {mobs:,} mobs (best of {repeats}):\n")
+    print_table(["Rows as", "Milliseconds", "Rows/sec"], rows)
+
+
+################################################################################
+###################### BULK INSERT AND UPSERT THROUGHPUT #######################
+################################################################################
+
+
+def measure_rows_per_second(function, rows: int):
+    started_at = time.perf_counter()
+    written = function()
+    elapsed = time.perf_counter() - started_at
+    if written != rows:
+        raise RuntimeError(f"Expected {rows:,} rows to be written, got {written:,}.")
+    return [f"{rows:,}", f"{elapsed:.2f}", f"{rows / elapsed:,.0f}"]
+
+def benchmark_batch_insert(rows: int, single_rows: int):
+    # NOTE: How `seed.py` used to write mobs: one `create_mob()` call, and so one transaction, per row.
+    utils.create_data_table()
+    single = measure_rows_per_second(lambda: sum(1 for mob in generate_scratch_mobs(0, single_rows) if utils.create_mob(mob)), single_rows)
+
+    utils.create_data_table()
+    returned = measure_rows_per_second(lambda: len(utils.create_mobs(generate_scratch_mobs(0, rows))), rows)
+
+    utils.create_data_table()
+    counted = measure_rows_per_second(lambda: utils.create_mobs(generate_scratch_mobs(0, rows), returning=False), rows)
+
+    # NOTE: Every row names an existing `mob_id`, so each one takes the `DO UPDATE` branch.
+    upserted_mobs = ({**mob, "mob_id": index + 1, "hit_points": 25} for index, mob in enumerate(generate_scratch_mobs(0, rows)))
+    upserted = measure_rows_per_second(lambda: len(utils.create_mobs(upserted_mobs, upsert=True)), rows)
+
+    print("\nRows written per second:\n")
+    print_table(["Path", "Rows", "Seconds", "Rows/sec"], [
+        ["create_mob() per row", *single],
+        ["create_mobs() with RETURNING", *returned],
+        ["create_mobs(returning=False)", *counted],
+        ["create_mobs(upsert=True) updating", *upserted],
+    ])
+
+
+################################################################################
+######################### PARTIAL UPDATE THROUGHPUT ############################
+################################################################################
+
+
+# The original `update_mob()`: read the whole mob, write all five columns, then read it again.
+def legacy_update_mob(mob_id: int, new_mob_info: dict):
+    with utils.connect_to_database() as connection:
+        original_mob = utils.get_mob_by_id(mob_id)
+        UPDATE_DATA = tuple(new_mob_info.get(key, original_mob[key]) for key in utils.MOB_FEATURES if key != "mob_id") + (mob_id,)
+        connection.execute("UPDATE mobs SET name = ?, hit_points = ?, damage = ?, speed = ?, is_hostile = ? WHERE mob_id = ?", UPDATE_DATA)
+        return utils.get_mob_by_id(mob_id)
+
+# Counts the statements each update sends by tracing the pooled connection it borrows.
+def count_update_statements(update, mob_id: int):
+    statements = []
+    with utils.connect_to_database() as connection:
+        connection.set_trace_callback(statements.append)
+        try:
+            update(mob_id, {"damage": 5})
+        finally:
+            connection.set_trace_callback(None)
+    return len([statement for statement in statements if not statement.startswith(("BEGIN", "COMMIT"))])
+
+def benchmark_partial_update(mobs: int, updates: int):
+    seed_scratch_mobs(mobs)
+    rows = []
+    for label, update in [("read, full UPDATE, re-read", legacy_update_mob), ("UPDATE <changed> RETURNING", utils.update_mob)]:
+        started_at = time.perf_counter()
+        for index in range(updates):
+            if not update(index % mobs + 1, {"damage": index % 10}):
+                raise RuntimeError(f"Update of mob {index % mobs + 1} failed.")
+        elapsed = time.perf_counter() - started_at
+        rows.append([label, count_update_statements(update, 1), f"{updates / elapsed:,.0f}"])
+
+    print(f"\nOne-field updates (`{{\"damage\": ...}}`) across {mobs:,} mobs:\n")
+    print_table(["update_mob()", "Statements", "Updates/sec"], rows)
+
+
+################################################################################
+################## COMMAND LINE INTERFACE FOR BENCHMARKS #######################
+################################################################################
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the Minecraft Mobs API.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    pool_parser = subparsers.add_parser("connection-pool", help="Compare requests/sec with and without pooled connections.")
+    pool_parser.add_argument("--mobs", type=int, default=1000)
+    pool_parser.add_argument("--clients", type=int, default=8)
+    pool_parser.add_argument("--seconds", type=float, default=5.0)
+
+    streaming_parser = subparsers.add_parser("streaming", help="Compare peak memory of the full and streamed mob listings.")
+    streaming_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    streaming_parser.add_argument("--legacy-max", type=int, default=1_000_000, help="Largest table to also run the original listing on.")
+
+    batch_parser = subparsers.add_parser("batch-insert", help="Compare rows/sec of single and bulk mob inserts and upserts.")
+    batch_parser.add_argument("--rows", type=int, default=1_000_000)
+    batch_parser.add_argument("--single-rows", type=int, default=10_000, help="Rows to insert one `create_mob()` at a time.")
+
+    row_factory_parser = subparsers.add_parser("row-factory", help="Compare rows/sec of dict rows from `build_row_factory()` and `sqlite3.Row`.")
+    row_factory_parser.add_argument("--mobs", type=int, default=200_000)
+    row_factory_parser.add_argument("--repeats", type=int, default=5)
+
+    update_parser = subparsers.add_parser("partial-update", help="Compare one-field mob updates before and after partial UPDATE statements.")
+    update_parser.add_argument("--mobs", type=int, default=10_000)
+    update_parser.add_argument("--updates", type=int, default=20_000)
+
+    arguments = parser.parse_args()
+
+    if arguments.benchmark == "connection-pool":
+        benchmark_connection_pool(arguments.mobs, arguments.clients, arguments.seconds)
+    elif arguments.benchmark == "streaming":
+        benchmark_streaming(arguments.sizes, arguments.legacy_max)
+    elif arguments.benchmark == "batch-insert":
+        benchmark_batch_insert(arguments.rows, arguments.single_rows)
+    elif arguments.benchmark == "row-factory":
+        benchmark_row_factory(arguments.mobs, arguments.repeats)
+    elif arguments.benchmark == "partial-update":
+        benchmark_partial_update(arguments.mobs, arguments.updates)
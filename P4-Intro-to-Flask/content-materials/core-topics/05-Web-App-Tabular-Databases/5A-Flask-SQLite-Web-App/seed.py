@@ -15,7 +15,7 @@ USAGE:          Run with `python(3) seed.py` to reset and populate
 ################################################################################
 
 
-from utils import create_data_table, create_mob
+from utils import create_data_table, create_mobs
 
 
 ################################################################################
@@ -76,5 +76,5 @@ mobs.append(mob_6)
 
 create_data_table()
 
-for mob in mobs:
-    print(create_mob(mob))
\ No newline at end of file
+for mob in create_mobs(mobs):
+    print(mob)
\ No newline at end of file
@@ -0,0 +1,95 @@
+import sqlite3
+
+import pytest
+
+import utils
+from app import app
+
+CREEPER = {"name": "Creeper", "hit_points": 20, "damage": 9, "speed": 1, "is_hostile": True}
+SKELETON = {"name": "Skeleton", "hit_points": 20, "damage": 4, "speed": 1, "is_hostile": True}
+
+def count_mobs():
+    with utils.connect_to_database() as connection:
+        return connection.execute("""SELECT COUNT(*) FROM mobs""").fetchone()[0]
+
+def drop_mobs_table():
+    with utils.connect_to_database() as connection:
+        connection.execute("""DROP TABLE mobs""")
+
+class TestCreateMobs:
+    '''  Testing class for assessing bulk inserts and upserts through `utils.create_mobs()`. '''
+
+    def test_inserts_and_returns_written_mobs(self):
+        ''' Tests that new mobs are inserted in order and come back with their new IDs. '''
+        created_mobs = utils.create_mobs([CREEPER, SKELETON])
+        assert ([(mob["mob_id"], mob["name"]) for mob in created_mobs] == [(7, "Creeper"), (8, "Skeleton")])
+        assert (utils.get_mob_by_id(8)["damage"] == 4)
+
+    def test_without_returning_counts_rows(self):
+        ''' Tests that `returning=False` writes a lazy iterable and returns only how many rows were written. '''
+        assert (utils.create_mobs((dict(CREEPER, name=f"Creeper {index}") for index in range(5)), returning=False) == 5)
+        assert (count_mobs() == 11)
+
+    def test_upsert_updates_existing_and_inserts_new(self):
+        ''' Tests that an upserted mob with an existing `mob_id` is updated in place, and one without is added. '''
+        written_mobs = utils.create_mobs([dict(CREEPER, mob_id=1), SKELETON], upsert=True)
+        assert ([(mob["mob_id"], mob["name"]) for mob in written_mobs] == [(1, "Creeper"), (7, "Skeleton")])
+        assert (utils.get_mob_by_id(1)["damage"] == 9)
+        assert (count_mobs() == 7)
+
+    @pytest.mark.parametrize("invalid_mob", [{"name": "Slime"}, dict(CREEPER, damage=None), "Slime"],
+                             ids=["missing-field", "null-field", "not-an-object"])
+    def test_invalid_mob_rolls_back_whole_batch(self, monkeypatch, invalid_mob):
+        ''' Tests that one invalid mob raises ValueError and leaves no row of its batch written, even from earlier chunks. '''
+        monkeypatch.setattr(utils, "INSERT_CHUNK_SIZE", 2)
+        with pytest.raises(ValueError):
+            utils.create_mobs([CREEPER, SKELETON, dict(CREEPER, name="Charged Creeper"), invalid_mob])
+        assert (count_mobs() == 6)
+
+    def test_database_error_is_raised(self):
+        ''' Tests that a database failure is raised as a `sqlite3.Error`, not reported as an invalid mob. '''
+        drop_mobs_table()
+        with pytest.raises(sqlite3.Error) as raised:
+            utils.create_mobs([CREEPER])
+        assert (not isinstance(raised.value, ValueError))
+
+    def test_create_mob_returns_empty_on_failure(self):
+        ''' Tests that `create_mob()` still returns an empty dict for an invalid mob or a failed write. '''
+        assert (utils.create_mob({"name": "Slime"}) == {})
+        drop_mobs_table()
+        assert (utils.create_mob(CREEPER) == {})
+
+class TestBatchRoute:
+    '''  Testing class for assessing `POST /api/mobs/batch`. '''
+
+    def test_adds_mobs(self):
+        ''' Tests that a JSON array of mobs is written and answered with `201` and the written mobs. '''
+        response = app.test_client().post("/api/mobs/batch", json=[CREEPER, SKELETON])
+        assert (response.status_code == 201)
+        assert ([mob["name"] for mob in response.get_json()] == ["Creeper", "Skeleton"])
+        assert (count_mobs() == 8)
+
+    def test_upserts_mobs(self):
+        ''' Tests that `?upsert=true` updates a mob carrying an existing `mob_id`. '''
+        response = app.test_client().post("/api/mobs/batch?upsert=true", json=[dict(SKELETON, mob_id=2)])
+        assert (response.status_code == 201)
+        assert (utils.get_mob_by_id(2)["name"] == "Skeleton")
+        assert (count_mobs() == 6)
+
+    def test_rejects_non_array(self):
+        ''' Tests that a body that is not a JSON array is answered with `400`. '''
+        assert (app.test_client().post("/api/mobs/batch", json=CREEPER).status_code == 400)
+
+    def test_invalid_mob_is_400(self):
+        ''' Tests that a batch holding an invalid mob is answered with `400` and writes nothing. '''
+        response = app.test_client().post("/api/mobs/batch", json=[CREEPER, {"name": "Slime"}])
+        assert (response.status_code == 400)
+        assert ("every mob needs" in response.get_json()["error"])
+        assert (count_mobs() == 6)
+
+    def test_database_error_is_500(self):
+        ''' Tests that a failed write is answered with `500`, not blamed on the mobs sent. '''
+        drop_mobs_table()
+        response = app.test_client().post("/api/mobs/batch", json=[CREEPER])
+        assert (response.status_code == 500)
+        assert ("every mob needs" not in response.get_json()["error"])
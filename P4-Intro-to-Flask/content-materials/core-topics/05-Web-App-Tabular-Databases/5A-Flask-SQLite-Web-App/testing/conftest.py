@@ -0,0 +1,21 @@
+import pytest
+
+import utils
+
+@pytest.fixture(autouse=True)
+def scratch_database(tmp_path):
+    ''' Points every helper at a fresh, seeded scratch database instead of `mobs.db`. '''
+    original_pool = utils.connection_pool
+    utils.connection_pool = utils.ConnectionPool(str(tmp_path / "mobs.db"))
+    utils.create_data_table()
+    utils.create_mobs([
+        {"name": "Zombie", "hit_points": 20, "damage": 2, "speed": 1, "is_hostile": True},
+        {"name": "Villager", "hit_points": 30, "damage": 1, "speed": 1, "is_hostile": False},
+        {"name": "Enderman", "hit_points": 40, "damage": 4, "speed": 2, "is_hostile": False},
+        {"name": "Cave Spider", "hit_points": 12, "damage": 2, "speed": 2, "is_hostile": True},
+        {"name": "cave_crawler", "hit_points": 10, "damage": 5, "speed": 1, "is_hostile": True},
+        {"name": "Iron Golem", "hit_points": 50, "damage": 6, "speed": 1, "is_hostile": False},
+    ])
+    yield
+    utils.connection_pool.close_all()
+    utils.connection_pool = original_pool
@@ -0,0 +1,98 @@
+import sqlite3
+import threading
+
+import pytest
+
+import utils
+
+def count_mobs():
+    with utils.connect_to_database() as connection:
+        return connection.execute("""SELECT COUNT(*) FROM mobs""").fetchone()[0]
+
+# Borrows `count` connections at once, one per thread, and returns them once every thread holds its own.
+def borrow_concurrently(count: int):
+    borrowed, all_borrowed = [], threading.Barrier(count)
+
+    def borrow():
+        with utils.connect_to_database() as connection:
+            borrowed.append(connection)
+            all_borrowed.wait(timeout=10)
+
+    threads = [threading.Thread(target=borrow) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return borrowed
+
+class TestConnectionReuse:
+    '''  Testing class for assessing that `utils.ConnectionPool` reuses its connections. '''
+
+    def test_sequential_borrows_share_one_connection(self):
+        ''' Tests that helpers called one after another all use the same pooled connection. '''
+        with utils.connect_to_database() as first_connection:
+            pass
+        utils.get_mob_by_id(1)
+        utils.get_mobs()
+        utils.update_mob(1, {"damage": 3})
+        with utils.connect_to_database() as last_connection:
+            pass
+        assert (last_connection is first_connection)
+        assert (utils.connection_pool.open_count() == 1)
+
+    def test_nested_borrows_share_the_outer_connection(self):
+        ''' Tests that a helper called inside another borrow uses the caller's connection. '''
+        with utils.connect_to_database() as outer_connection:
+            with utils.connect_to_database() as inner_connection:
+                assert (inner_connection is outer_connection)
+            assert (utils.create_mob({"name": "Creeper", "hit_points": 20, "damage": 9, "speed": 1, "is_hostile": True}))
+        assert (utils.connection_pool.open_count() == 1)
+
+    def test_threads_borrow_separate_connections(self):
+        ''' Tests that threads holding connections at the same time each get their own. '''
+        borrowed = borrow_concurrently(3)
+        assert (len({id(connection) for connection in borrowed}) == 3)
+
+    def test_idle_connections_are_capped_and_closed(self):
+        ''' Tests that at most `size` connections stay open after a burst, and that `close_all()` closes them. '''
+        utils.connection_pool.close_all()
+        utils.connection_pool.size = 2
+        borrowed = borrow_concurrently(5)
+        assert (utils.connection_pool.open_count() == 2)
+        for _ in range(50):
+            utils.get_mob_by_id(1)
+        assert (utils.connection_pool.open_count() == 2)
+        utils.connection_pool.close_all()
+        assert (utils.connection_pool.open_count() == 0)
+        with pytest.raises(sqlite3.ProgrammingError):
+            borrowed[0].execute("""SELECT 1""")
+
+    def test_connections_are_configured_once(self):
+        ''' Tests that pooled connections are opened with WAL and the busy timeout. '''
+        with utils.connect_to_database() as connection:
+            assert (connection.execute("""PRAGMA journal_mode""").fetchone()[0] == "wal")
+            assert (connection.execute("""PRAGMA busy_timeout""").fetchone()[0] == 5000)
+
+class TestTransactionRollback:
+    '''  Testing class for assessing that a borrowed connection commits or rolls back its transaction. '''
+
+    def test_error_rolls_back_and_returns_the_connection(self):
+        ''' Tests that an error inside a borrow rolls back its writes and the connection can be borrowed again. '''
+        with pytest.raises(RuntimeError):
+            with utils.connect_to_database() as failed_connection:
+                failed_connection.execute("""DELETE FROM mobs""")
+                raise RuntimeError("Failed mid-transaction.")
+        assert (count_mobs() == 6)
+        with utils.connect_to_database() as connection:
+            assert (connection is failed_connection)
+            assert (not connection.in_transaction)
+
+    def test_successful_borrow_commits(self):
+        ''' Tests that leaving a borrow normally commits, so another connection sees the write. '''
+        with utils.connect_to_database() as connection:
+            connection.execute("""DELETE FROM mobs WHERE name = 'Zombie'""")
+        other_connection = sqlite3.connect(utils.connection_pool.database)
+        try:
+            assert (other_connection.execute("""SELECT COUNT(*) FROM mobs""").fetchone()[0] == 5)
+        finally:
+            other_connection.close()
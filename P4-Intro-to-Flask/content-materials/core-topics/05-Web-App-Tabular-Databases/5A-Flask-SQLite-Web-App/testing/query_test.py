@@ -0,0 +1,70 @@
+import pytest
+
+import utils
+
+def query_mob_names(arguments: dict):
+    query, parameters = utils.build_mob_query(arguments)
+    return [mob["name"] for batch in utils.iterate_mob_batches(query=query, parameters=parameters) for mob in batch]
+
+def explain_mob_query(arguments: dict):
+    query, parameters = utils.build_mob_query(arguments)
+    with utils.connect_to_database() as connection:
+        return " ".join(row["detail"] for row in connection.execute(f"EXPLAIN QUERY PLAN {query}", parameters))
+
+class TestMobQueryBuilder:
+    '''  Testing class for assessing `utils.build_mob_query()` results. '''
+
+    def test_no_arguments_lists_every_mob(self):
+        ''' Tests that no arguments list every mob in ID order. '''
+        assert (query_mob_names({}) == ["Zombie", "Villager", "Enderman", "Cave Spider", "cave_crawler", "Iron Golem"])
+
+    def test_filters_by_hostility_and_damage(self):
+        ''' Tests that filters combine into one condition. '''
+        assert (query_mob_names({"is_hostile": "true", "min_damage": "2", "max_damage": "4"}) == ["Zombie", "Cave Spider"])
+        assert (query_mob_names({"is_hostile": "false"}) == ["Villager", "Enderman", "Iron Golem"])
+
+    def test_name_prefix_is_case_insensitive_and_literal(self):
+        ''' Tests that name prefixes ignore case and treat `%` and `_` literally. '''
+        assert (query_mob_names({"name_prefix": "CAVE"}) == ["Cave Spider", "cave_crawler"])
+        assert (query_mob_names({"name_prefix": "cave_"}) == ["cave_crawler"])
+        assert (query_mob_names({"name_prefix": "%"}) == [])
+
+    def test_sorts_and_limits(self):
+        ''' Tests that sorts run in either direction, break ties by ID, and honor limits. '''
+        assert (query_mob_names({"sort": "-damage", "limit": "3"}) == ["Iron Golem", "cave_crawler", "Enderman"])
+        assert (query_mob_names({"sort": "damage"}) == ["Villager", "Zombie", "Cave Spider", "Enderman", "cave_crawler", "Iron Golem"])
+        assert (query_mob_names({"sort": "name", "limit": "2"}) == ["Cave Spider", "cave_crawler"])
+
+    def test_values_are_bound_as_parameters(self):
+        ''' Tests that argument values never become part of the SQL text. '''
+        query, parameters = utils.build_mob_query({"name_prefix": "x' OR 1=1 --", "min_damage": "3"})
+        assert ("OR 1=1" not in query)
+        assert (parameters == (3, "x' OR 1=1 --%"))
+
+    def test_rejects_invalid_arguments(self):
+        ''' Tests that unknown arguments, sort columns, and bad values raise ValueError. '''
+        for arguments in [{"hostile": "true"}, {"sort": "mob_id; DROP TABLE mobs"}, {"min_damage": "lots"}, {"is_hostile": "maybe"}, {"limit": "0"}]:
+            with pytest.raises(ValueError):
+                utils.build_mob_query(arguments)
+
+class TestMobQueryIndexes:
+    '''  Testing class for assessing that `EXPLAIN QUERY PLAN` uses the mob indexes. '''
+
+    def test_hostility_filter_uses_index(self):
+        ''' Tests that `is_hostile` filters search `mobs_is_hostile_index`. '''
+        assert ("USING INDEX mobs_is_hostile_index (is_hostile=?)" in explain_mob_query({"is_hostile": "true"}))
+
+    def test_damage_range_uses_index(self):
+        ''' Tests that damage ranges search `mobs_damage_index`. '''
+        assert ("USING INDEX mobs_damage_index (damage>? AND damage<?)" in explain_mob_query({"min_damage": "2", "max_damage": "4"}))
+
+    def test_name_prefix_uses_index(self):
+        ''' Tests that name prefixes search `mobs_name_nocase_index`. '''
+        assert ("USING INDEX mobs_name_nocase_index (name>? AND name<?)" in explain_mob_query({"name_prefix": "cave"}))
+
+    def test_sorts_walk_indexes(self):
+        ''' Tests that damage and name sorts read their index in order instead of sorting. '''
+        for arguments, index in [({"sort": "-damage", "limit": "5"}, "mobs_damage_index"), ({"sort": "name"}, "mobs_name_nocase_index")]:
+            plan = explain_mob_query(arguments)
+            assert (f"SCAN mobs USING INDEX {index}" in plan)
+            assert ("TEMP B-TREE" not in plan)
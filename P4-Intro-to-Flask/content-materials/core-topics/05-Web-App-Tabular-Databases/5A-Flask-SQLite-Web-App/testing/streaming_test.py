@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+import utils
+from app import app
+
+# Mob IDs at or above this make `fails_from()` raise, so a read fails partway through the table.
+FAILING_MOB_ID = 4
+
+def fails_from(mob_id: int):
+    if mob_id >= FAILING_MOB_ID:
+        raise ValueError(f"Mob ID {mob_id} cannot be read.")
+    return mob_id
+
+@pytest.fixture
+def failing_query():
+    ''' A mob query that fails at the fourth mob, run on the pooled connection that knows `fails_from()`. '''
+    with utils.connect_to_database() as connection:
+        connection.create_function("fails_from", 1, fails_from)
+    return f"""SELECT fails_from(mob_id), {", ".join(utils.MOB_FEATURES[1:])} FROM mobs ORDER BY mob_id"""
+
+def drop_mobs_table():
+    with utils.connect_to_database() as connection:
+        connection.execute("""DROP TABLE mobs""")
+
+class TestMobReadErrors:
+    '''  Testing class for assessing how the 5A read helpers and listing route report failed reads. '''
+
+    def test_error_after_first_batch_is_raised(self, failing_query):
+        ''' Tests that a read failing after some batches were yielded raises instead of ending early. '''
+        batches = utils.iterate_mob_batches(batch_size=2, query=failing_query)
+        assert ([mob["mob_id"] for mob in next(batches)] == [1, 2])
+        with pytest.raises(sqlite3.Error):
+            next(batches)
+
+    def test_get_mobs_returns_nothing_on_error(self):
+        ''' Tests that `get_mobs()` still returns an empty list when the read fails. '''
+        drop_mobs_table()
+        assert (utils.get_mobs() == [])
+
+    def test_listing_error_before_streaming_is_500(self):
+        ''' Tests that `GET /api/mobs` answers 500 when its query fails before any row is sent. '''
+        drop_mobs_table()
+        response = app.test_client().get("/api/mobs")
+        assert (response.status_code == 500)
+        assert ("error" in response.get_json())
+
+    def test_listing_error_mid_stream_is_not_a_valid_array(self, monkeypatch):
+        ''' Tests that a read failing while `GET /api/mobs` streams aborts the response instead of closing the array. '''
+        def failing_batches(**arguments):
+            yield [{"mob_id": 1}]
+            raise sqlite3.OperationalError("disk I/O error")
+        monkeypatch.setattr(utils, "iterate_mob_batches", failing_batches)
+        with pytest.raises(sqlite3.Error):
+            app.test_client().get("/api/mobs").get_data()
+
+class TestMobReadById:
+    '''  Testing class for assessing `utils.get_mob_by_id()`. '''
+
+    def test_returns_plain_dict_of_features(self):
+        ''' Tests that a mob is returned as a plain dict keyed by `MOB_FEATURES`. '''
+        mob = utils.get_mob_by_id(2)
+        assert (type(mob) is dict)
+        assert (mob == {"mob_id": 2, "name": "Villager", "hit_points": 30, "damage": 1, "speed": "1", "is_hostile": 0})
+
+    def test_missing_mob_is_empty(self):
+        ''' Tests that an unknown ID, or a failed read, returns an empty dict. '''
+        assert (utils.get_mob_by_id(999) == {})
+        drop_mobs_table()
+        assert (utils.get_mob_by_id(1) == {})
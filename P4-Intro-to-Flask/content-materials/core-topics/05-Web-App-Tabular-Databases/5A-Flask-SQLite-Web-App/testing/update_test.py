@@ -0,0 +1,61 @@
+import pytest
+
+import utils
+from app import app
+
+ZOMBIE = {"mob_id": 1, "name": "Zombie", "hit_points": 20, "damage": 2, "speed": "1", "is_hostile": 1}
+
+@pytest.fixture
+def traced_statements():
+    ''' Records every data statement run on the pooled connection, which the helpers and routes below borrow. '''
+    statements = []
+    with utils.connect_to_database() as connection:
+        connection.set_trace_callback(statements.append)
+    yield lambda: [statement for statement in statements if statement.split()[0] in ("SELECT", "INSERT", "UPDATE", "DELETE")]
+    with utils.connect_to_database() as connection:
+        connection.set_trace_callback(None)
+
+class TestPartialUpdate:
+    '''  Testing class for assessing that `utils.update_mob()` writes only the fields it is given. '''
+
+    def test_writes_only_given_fields(self, traced_statements):
+        ''' Tests that only the changed column is set, and the whole updated row is returned. '''
+        assert (utils.update_mob(1, {"damage": 3}) == dict(ZOMBIE, damage=3))
+        assert (utils.get_mob_by_id(1) == dict(ZOMBIE, damage=3))
+        assert (traced_statements()[0].startswith("UPDATE mobs SET damage = 3 WHERE mob_id = 1"))
+
+    def test_updates_to_different_fields_both_persist(self):
+        ''' Tests that one update cannot undo another made to a different field in between. '''
+        utils.update_mob(1, {"damage": 3})
+        utils.update_mob(1, {"name": "Drowned"})
+        assert (utils.get_mob_by_id(1) == dict(ZOMBIE, name="Drowned", damage=3))
+
+    def test_ignores_unknown_keys_and_mob_id(self):
+        ''' Tests that keys outside `MOB_FEATURES`, and `mob_id` itself, are never written. '''
+        updated_mob = utils.update_mob(1, {"speed": 2, "armor": 5, "mob_id": 99, "damage; DROP TABLE mobs": 1})
+        assert (updated_mob == dict(ZOMBIE, speed="2"))
+        assert (utils.get_mob_by_id(99) == {})
+
+    @pytest.mark.parametrize("new_mob_info", [{}, {"armor": 5}], ids=["empty", "unknown-only"])
+    def test_no_known_fields_returns_current_row(self, traced_statements, new_mob_info):
+        ''' Tests that a change with no known fields writes nothing and returns the mob as it is. '''
+        assert (utils.update_mob(1, new_mob_info) == ZOMBIE)
+        assert (not any(statement.startswith("UPDATE") for statement in traced_statements()))
+
+    def test_missing_mob_is_empty(self):
+        ''' Tests that updating an unknown ID returns an empty dict and adds no mob. '''
+        assert (utils.update_mob(999, {"damage": 3}) == {})
+        assert (utils.get_mob_by_id(999) == {})
+
+class TestPatchRoute:
+    '''  Testing class for assessing `PATCH /api/mobs/<id>`. '''
+
+    def test_patch_runs_one_statement(self, traced_statements):
+        ''' Tests that a PATCH writes and reads back the mob in a single statement. '''
+        response = app.test_client().patch("/api/mobs/1", json={"hit_points": 25})
+        assert (response.get_json() == dict(ZOMBIE, hit_points=25))
+        assert (len(traced_statements()) == 1)
+
+    def test_patch_missing_mob_is_empty(self):
+        ''' Tests that a PATCH to an unknown ID answers with an empty object. '''
+        assert (app.test_client().patch("/api/mobs/999", json={"damage": 3}).get_json() == {})
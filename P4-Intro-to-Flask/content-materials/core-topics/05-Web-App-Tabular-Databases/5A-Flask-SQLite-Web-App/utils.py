@@ -14,10 +14,126 @@ USAGE:          Imports automatically into `app.py`.
 ################################################################################
 
 
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
+import queue
 import sqlite3
+import threading
 
 MOB_FEATURES = ["mob_id", "name", "hit_points", "damage", "speed", "is_hostile"]
 
+DATABASE_PATH = "mobs.db"
+
+# Idle connections kept open for reuse, and SQL statements each connection keeps compiled.
+CONNECTION_POOL_SIZE = 8
+STATEMENT_CACHE_SIZE = 128
+
+# Rows fetched from the cursor at a time when streaming the mobs table.
+STREAM_BATCH_SIZE = 1000
+
+# Rows written per multi-row `INSERT ... RETURNING` statement in `create_mobs()`.
+# NOTE: Six values per row keeps each statement well under SQLite's 32,766 bound parameters.
+INSERT_CHUNK_SIZE = 500
+
+# Settings applied once to every new connection.
+# NOTE: WAL lets readers keep reading while a write commits, and `busy_timeout`
+#       makes a connection wait for another's write lock instead of failing.
+CONNECTION_PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+]
+
+
+################################################################################
+###################### DEFINE POOL OF DATABASE CONNECTIONS #####################
+################################################################################
+
+
+# Pool of open, pre-configured SQLite connections shared by every request thread.
+# NOTE: A thread holds at most one connection at a time. Helpers that call other
+#       helpers (e.g. `create_mob()` reading back its new row) reuse the calling
+#       thread's connection and transaction rather than opening a second one.
+class ConnectionPool:
+    def __init__(self, database: str = DATABASE_PATH, size: int = CONNECTION_POOL_SIZE):
+        self.database = database
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._held = threading.local()
+        self._lock = threading.Lock()
+        self._open_connections = set()
+
+    def open_connection(self):
+        # NOTE: Connections move between request threads, but only ever one thread uses a connection at a time.
+        connection = sqlite3.connect(self.database, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            connection.execute(pragma)
+        with self._lock:
+            self._open_connections.add(connection)
+        return connection
+
+    def close_connection(self, connection):
+        with self._lock:
+            self._open_connections.discard(connection)
+        connection.close()
+
+    # Lends a connection for one transaction: committed if the block succeeds and rolled back if it raises.
+    @contextmanager
+    def connection(self):
+        held_connection = getattr(self._held, "connection", None)
+        if held_connection is not None:
+            yield held_connection
+            return
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self.open_connection()
+        self._held.connection = connection
+        try:
+            yield connection
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            self._held.connection = None
+            self.release(connection)
+
+    def release(self, connection):
+        if self._idle.qsize() < self.size:
+            self._idle.put(connection)
+        else:
+            self.close_connection(connection)
+
+    def close_all(self):
+        while True:
+            try:
+                self.close_connection(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    # Connections currently open, whether idle or lent out.
+    def open_count(self):
+        with self._lock:
+            return len(self._open_connections)
+
+
+connection_pool = ConnectionPool()
+
+
+################################################################################
+####################### DEFINE DICTIONARY ROW FACTORIES ########################
+################################################################################
+
+
+# Returns a row factory that turns each result tuple straight into a dict keyed by `columns`.
+# NOTE: This skips building a `sqlite3.Row` and then copying it key by key.
+#       (Run `python benchmarks.py row-factory` to compare the two.)
+def build_row_factory(columns: tuple):
+    return lambda cursor, row: dict(zip(columns, row))
+
 
 ################################################################################
 ############### DEFINE DATABASE CONNECTION AND LOADING FUNCTIONS ###############
@@ -25,47 +141,133 @@ MOB_FEATURES = ["mob_id", "name", "hit_points", "damage", "speed", "is_hostile"]
 
 
 def connect_to_database():
-    # Connect to database.
-    connection = sqlite3.connect("mobs.db")
-    return connection
+    # Borrow a pooled connection. (Use as `with connect_to_database() as connection:`.)
+    return connection_pool.connection()
 
 def create_data_table():
     try:
         # Connect to database.
-        connection = connect_to_database()
-
-        # Create database query in SQL for deleting preexisting data.
-        print(">> Dropping mob data...")
-        TABLE_DELETION_QUERY = """DROP TABLE IF EXISTS mobs"""
-
-        # Execute database deletion query using SQL connection.
-        connection.execute(TABLE_DELETION_QUERY)
-        print(">> Mobs dataset dropped.")
-
-        # Create database query in SQL for manually creating new data.
-        print(">> Creating new mobs table...")
-        TABLE_CREATION_QUERY = """
-            CREATE TABLE mobs (
-                mob_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
-                name TEXT NOT NULL,
-                hit_points INTEGER NOT NULL,
-                damage INTEGER NOT NULL,
-                speed TEXT NOT NULL,
-                is_hostile BOOLEAN NOT NULL
-            );
-        """
-
-        # Execute database population query using SQL connection.
-        connection.execute(TABLE_CREATION_QUERY)
-
-        # Commit all executed queries to SQL database for migration.
-        connection.commit()
+        with connect_to_database() as connection:
+
+            # Create database query in SQL for deleting preexisting data.
+            print(">> Dropping mob data...")
+            TABLE_DELETION_QUERY = """DROP TABLE IF EXISTS mobs"""
+
+            # Execute database deletion query using SQL connection.
+            connection.execute(TABLE_DELETION_QUERY)
+            print(">> Mobs dataset dropped.")
+
+            # Create database query in SQL for manually creating new data.
+            print(">> Creating new mobs table...")
+            TABLE_CREATION_QUERY = """
+                CREATE TABLE mobs (
+                    mob_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+                    name TEXT NOT NULL,
+                    hit_points INTEGER NOT NULL,
+                    damage INTEGER NOT NULL,
+                    speed TEXT NOT NULL,
+                    is_hostile BOOLEAN NOT NULL
+                );
+            """
+
+            # Execute database population query using SQL connection.
+            # NOTE: Leaving the `with` block commits all executed queries to SQL database for migration.
+            connection.execute(TABLE_CREATION_QUERY)
+
+            # Create indexes backing the filters and sorts of `build_mob_query()`.
+            for INDEX_CREATION_QUERY in MOB_INDEX_QUERIES:
+                connection.execute(INDEX_CREATION_QUERY)
         print(">> Mobs table created successfully.")
-    except:
+    except sqlite3.Error:
         print(">> Failed to create mobs table.")
-    finally:
-        # Close connection to SQL database.
-        connection.close()
+
+
+################################################################################
+##################### DEFINE FILTERED AND SORTED MOB QUERIES ###################
+################################################################################
+
+
+"""
+`GET /api/mobs` narrows, orders and caps its listing with query arguments,
+which `build_mob_query()` compiles into one parameterized SELECT. Argument
+values are only ever bound as parameters; column names and SQL fragments
+come from the tables below, never from the request.
+
+    GET /api/mobs?is_hostile=true&min_damage=3   -> hostile mobs dealing 3+ damage
+    GET /api/mobs?name_prefix=cave&sort=-damage  -> mobs named `Cave...`, hardest-hitting first
+    GET /api/mobs?sort=name&limit=10             -> first ten mobs alphabetically
+"""
+
+# Indexes serving the filters below, and name sorts. (`name` is compared case-insensitively.)
+MOB_INDEX_QUERIES = [
+    """CREATE INDEX IF NOT EXISTS mobs_is_hostile_index ON mobs (is_hostile)""",
+    """CREATE INDEX IF NOT EXISTS mobs_damage_index ON mobs (damage)""",
+    """CREATE INDEX IF NOT EXISTS mobs_name_nocase_index ON mobs (name COLLATE NOCASE)""",
+]
+
+def parse_boolean(value: str):
+    if value.lower() in ("true", "1"):
+        return True
+    if value.lower() in ("false", "0"):
+        return False
+    raise ValueError(f"Expected `true` or `false`, got `{value}`.")
+
+# Turns a name prefix into a LIKE pattern, so `%` and `_` in the prefix match only themselves.
+def escape_like_prefix(prefix: str):
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+# Each filter argument's SQL condition and the function converting its value.
+# NOTE: SQLite serves a `LIKE` prefix match from the NOCASE name index, since `LIKE` is case-insensitive.
+MOB_FILTERS = {
+    "is_hostile": ("is_hostile = ?", parse_boolean),
+    "min_damage": ("damage >= ?", int),
+    "max_damage": ("damage <= ?", int),
+    "name_prefix": ("""name LIKE ? ESCAPE '\\'""", escape_like_prefix),
+}
+
+# Columns accepted by `?sort=` (prefix with `-` for descending), and the SQL each sorts by.
+MOB_SORT_COLUMNS = {key: key for key in MOB_FEATURES} | {"name": "name COLLATE NOCASE"}
+
+# Compiles query arguments (e.g. `request.args`) into a SELECT statement and its parameters.
+# Raises ValueError for unknown arguments or values that cannot be converted.
+# NOTE: Ties are broken by `mob_id` in the same direction, so each sort can walk its index.
+def build_mob_query(arguments: dict):
+    unknown_arguments = set(arguments) - set(MOB_FILTERS) - {"sort", "limit"}
+    if unknown_arguments:
+        raise ValueError(f"Unknown query argument(s): {', '.join(sorted(unknown_arguments))}.")
+
+    conditions, parameters = [], []
+    for name, (condition, convert) in MOB_FILTERS.items():
+        if name in arguments:
+            try:
+                parameters.append(convert(arguments[name]))
+            except ValueError:
+                raise ValueError(f"Invalid value `{arguments[name]}` for `{name}`.") from None
+            conditions.append(condition)
+
+    sort = arguments.get("sort", "mob_id")
+    direction = "DESC" if sort.startswith("-") else "ASC"
+    if sort.lstrip("-") not in MOB_SORT_COLUMNS:
+        raise ValueError(f"Cannot sort by `{sort}`. Expected one of: {', '.join(MOB_SORT_COLUMNS)}.")
+    order = f"{MOB_SORT_COLUMNS[sort.lstrip('-')]} {direction}"
+    if sort.lstrip("-") != "mob_id":
+        order += f", mob_id {direction}"
+
+    query = f"""SELECT {", ".join(MOB_FEATURES)} FROM mobs"""
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {order}"
+
+    if "limit" in arguments:
+        try:
+            limit = int(arguments["limit"])
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise ValueError("`limit` must be a positive integer.")
+        query += " LIMIT ?"
+        parameters.append(limit)
+    return query, tuple(parameters)
 
 
 ################################################################################
@@ -73,111 +275,135 @@ def create_data_table():
 ################################################################################
 
 
+# NOTE: Each helper borrows one pooled connection for the whole operation; nested
+#       helper calls share it, and leaving the `with` block commits (or rolls back
+#       on an error) and returns the connection to the pool.
+
+
+# Yields every mob (or those matching a query from `build_mob_query()`), as lists of at most
+# `batch_size` dicts, straight from the cursor.
+# NOTE: Only one batch is held in memory at a time, however large the table is.
+#       The connection stays borrowed until the generator is exhausted or closed.
+#       A `sqlite3.Error` is raised to the caller, even after some batches were yielded,
+#       so that a failed read is never mistaken for the end of the table.
+def iterate_mob_batches(batch_size: int = STREAM_BATCH_SIZE, query: str = None, parameters: tuple = ()):
+    if query is None:
+        query, parameters = build_mob_query({})
+    with connect_to_database() as connection:
+        cursor = connection.cursor()
+        cursor.row_factory = build_row_factory(tuple(MOB_FEATURES))
+        cursor.execute(query, parameters)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch
+
 def get_mobs():
     all_mobs = []
     try:
-        connection = connect_to_database()
-        connection.row_factory = sqlite3.Row
-        cursor = connection.cursor()
-
-        FULL_SELECTION_QUERY = """SELECT * FROM mobs"""
-        cursor.execute(FULL_SELECTION_QUERY)
-        rows = cursor.fetchall()
-
-        for row in rows:
-            mob = {}
-            for key in MOB_FEATURES:
-                mob[key] = row[key]
-            all_mobs.append(mob)
-    except:
+        for batch in iterate_mob_batches():
+            all_mobs.extend(batch)
+    except sqlite3.Error:
         all_mobs = []
     return all_mobs
 
 def get_mob_by_id(mob_id: int):
     identified_mob = {}
     try:
-        connection = connect_to_database()
-        connection.row_factory = sqlite3.Row
-        cursor = connection.cursor()
-
-        SELECTION_BY_ID_QUERY = """SELECT * FROM mobs WHERE mob_id = ?"""
-        SELECTION_BY_ID_DATA = (mob_id,)
-        cursor.execute(SELECTION_BY_ID_QUERY, SELECTION_BY_ID_DATA)
-        row = cursor.fetchone()
-
-        for key in MOB_FEATURES:
-            identified_mob[key] = row[key]
-    except:
+        with connect_to_database() as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = build_row_factory(tuple(MOB_FEATURES))
+            SELECTION_BY_ID_QUERY = f"""SELECT {", ".join(MOB_FEATURES)} FROM mobs WHERE mob_id = ?"""
+            SELECTION_BY_ID_DATA = (mob_id,)
+            identified_mob = cursor.execute(SELECTION_BY_ID_QUERY, SELECTION_BY_ID_DATA).fetchone() or {}
+    except sqlite3.Error:
         identified_mob = {}
     return identified_mob
 
 def create_mob(mob: dict):
-    created_mob = {}
     try:
-        connection = connect_to_database()
-        cursor = connection.cursor()
-
-        CREATION_QUERY = """
-            INSERT INTO mobs (name, hit_points, damage, speed, is_hostile) 
-            VALUES (?, ?, ?, ?, ?)
-        """
-        CREATION_DATA = tuple(mob[key] for key in MOB_FEATURES if key != "mob_id")
-        cursor.execute(CREATION_QUERY, CREATION_DATA)
-
-        connection.commit()
-        created_mob = get_mob_by_id(cursor.lastrowid)
-    except:
-        connection().rollback()
-    finally:
-        connection.close()
-    return created_mob
-
+        created_mobs = create_mobs([mob])
+    except (ValueError, sqlite3.Error):
+        created_mobs = []
+    return created_mobs[0] if created_mobs else {}
+
+# Builds the bulk insert statement for `rows_per_statement` rows of `columns`.
+# NOTE: Upserts name `mob_id`, so a row whose ID already exists is updated in place,
+#       while a row without one (a NULL `mob_id`) is always inserted as a new mob.
+@lru_cache(maxsize=None)
+def build_mob_insert_query(columns: tuple, rows_per_statement: int, upsert: bool, returning: bool):
+    placeholders = "(" + ", ".join("?" for _ in columns) + ")"
+    query = f"""INSERT INTO mobs ({", ".join(columns)}) VALUES {", ".join([placeholders] * rows_per_statement)}"""
+    if upsert:
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != "mob_id")
+        query += f""" ON CONFLICT (mob_id) DO UPDATE SET {updates}"""
+    if returning:
+        query += f""" RETURNING {", ".join(MOB_FEATURES)}"""
+    return query
+
+# Inserts (or, with `upsert`, inserts or updates by `mob_id`) every mob in one transaction.
+# Returns the written mobs, or only how many were written when `returning` is False.
+# NOTE: With `returning`, rows are sent in multi-row `INSERT ... RETURNING` statements of
+#       `INSERT_CHUNK_SIZE`, so no row is read back afterwards. Without it, one `executemany()`
+#       consumes `mobs` lazily, so even very large iterables are never held in memory.
+#       Any failure rolls back the whole batch. A mob with a missing or NULL field raises
+#       ValueError, while any other database error is raised as the `sqlite3.Error` itself.
+def create_mobs(mobs, upsert: bool = False, returning: bool = True):
+    columns = tuple(MOB_FEATURES) if upsert else tuple(key for key in MOB_FEATURES if key != "mob_id")
+    CREATION_DATA = (
+        tuple(mob.get(key) if key == "mob_id" else mob[key] for key in columns)
+        for mob in mobs
+    )
+    written_mobs, written_count = [], 0
+    try:
+        with connect_to_database() as connection:
+            if not returning:
+                cursor = connection.executemany(build_mob_insert_query(columns, 1, upsert, False), CREATION_DATA)
+                written_count = cursor.rowcount
+            else:
+                cursor = connection.cursor()
+                cursor.row_factory = build_row_factory(tuple(MOB_FEATURES))
+                while chunk := list(islice(CREATION_DATA, INSERT_CHUNK_SIZE)):
+                    CREATION_QUERY = build_mob_insert_query(columns, len(chunk), upsert, True)
+                    cursor.execute(CREATION_QUERY, [value for row in chunk for value in row])
+                    written_mobs.extend(cursor.fetchall())
+    except (KeyError, TypeError, AttributeError, sqlite3.IntegrityError) as error:
+        raise ValueError("No mobs were written; every mob needs a name, hit_points, damage, speed, and is_hostile.") from error
+    return written_mobs if returning else written_count
+
+# Builds the statement that writes only `columns` of one mob and returns the updated row.
+@lru_cache(maxsize=None)
+def build_mob_update_query(columns: tuple):
+    assignments = ", ".join(f"{column} = ?" for column in columns)
+    return f"""UPDATE mobs SET {assignments} WHERE mob_id = ? RETURNING {", ".join(MOB_FEATURES)}"""
+
+# Writes only the fields present in `new_mob_info` in one `UPDATE ... RETURNING` statement.
+# NOTE: Column names come from `MOB_FEATURES`, never from the request, and unknown keys are ignored.
+#       No prior read is needed, so concurrent PATCHes to different fields cannot undo each other.
 def update_mob(mob_id: int, new_mob_info: dict):
-    updated_mob, original_mob = {}, get_mob_by_id(mob_id)
+    updated_mob = {}
     try:
-        connection = connect_to_database()
-        cursor = connection.cursor()
-
-        UPDATE_QUERY = """
-            UPDATE mobs SET name = ?, hit_points = ?, damage = ?, speed = ?, is_hostile = ? 
-            WHERE mob_id = ?
-        """
-
-
-        UPDATE_DATA = []
-
-        for key in MOB_FEATURES:
-            if key != "mob_id":
-                if key in new_mob_info:
-                    UPDATE_DATA.append(new_mob_info[key])
-                else:
-                    UPDATE_DATA.append(original_mob[key])
-
-        UPDATE_DATA = tuple(UPDATE_DATA) + (mob_id,)
-
-
-        cursor.execute(UPDATE_QUERY, UPDATE_DATA)
-
-        connection.commit()
-        updated_mob = get_mob_by_id(mob_id)
-    except:
-        connection.rollback()
+        columns = tuple(key for key in MOB_FEATURES if key != "mob_id" and key in new_mob_info)
+        if not columns:
+            return get_mob_by_id(mob_id)
+        with connect_to_database() as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = build_row_factory(tuple(MOB_FEATURES))
+            UPDATE_DATA = tuple(new_mob_info[key] for key in columns) + (mob_id,)
+            updated_mob = cursor.execute(build_mob_update_query(columns), UPDATE_DATA).fetchone() or {}
+    except (sqlite3.Error, TypeError):
         updated_mob = {}
     return updated_mob
 
 def delete_mob(mob_id: int):
     deleted_mob = {}
     try:
-        connection = connect_to_database()
-        
-        DELETION_QUERY = """DELETE from mobs WHERE mob_id = ?"""
-        DELETION_DATA = (mob_id,)
-        deleted_mob = get_mob_by_id(mob_id)
-        connection.execute(DELETION_QUERY, DELETION_DATA)
-        connection.commit()
-    except:
-        connection.rollback()
+        with connect_to_database() as connection:
+            DELETION_QUERY = """DELETE from mobs WHERE mob_id = ?"""
+            DELETION_DATA = (mob_id,)
+            deleted_mob = get_mob_by_id(mob_id)
+            connection.execute(DELETION_QUERY, DELETION_DATA)
+    except sqlite3.Error:
         deleted_mob = {}
-    finally:
-        connection.close()
     return deleted_mob
\ No newline at end of file
@@ -21,10 +21,16 @@ from flask import Flask, request, make_response, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate, migrate
 import os
+import sys
 
 # Import Database Prototype and Defined Model Architecture(s).
 from models import db, Mob
 
+# Import Request Timing Instrumentation Extension. (Shared with the DigDraft server, where it is maintained.)
+SHARED_MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "project-demos", "digdraft", "server")
+sys.path.append(os.path.normpath(SHARED_MODULES_DIR))
+from instrumentation import Instrumentation
+
 
 ################################################################################
 ##################### FLASK SERVER SETUP AND CONFIGURATIONS ####################
@@ -54,6 +60,10 @@ migrate = Migrate(app, db)
 # Reinstantiate Application.
 db.init_app(app)
 
+# Attach Request Timing Histograms, SQL Statement Counts, and `Server-Timing` Headers.
+# NOTE: Set `INSTRUMENTATION_METRICS_PATH` (e.g. to `/metrics`) before this line to serve the unauthenticated metrics route.
+instrumentation = Instrumentation(app)
+
 
 ################################################################################
 ####################### FLASK API DEVELOPMENT AND TESTING ######################
@@ -0,0 +1,50 @@
+"""
+FILENAME:       `wsgi.py`
+TITLE:          Production entry point for the Flask-SQLAlchemy web app.
+DESCRIPTION:    Serves the application from pre-forked worker processes
+                instead of the single process started by `app.run()`.
+USAGE:          Run in CLI with command `python(3) wsgi.py --workers 4`.
+                Any other WSGI server can import `wsgi:application`.
+"""
+
+
+################################################################################
+################# IMPORTATIONS AND INITIALIZATIONS FOR SERVING #################
+################################################################################
+
+
+# Import Flask Application (with Its Routes) and Database Prototype.
+from app import app
+from models import db
+
+# Import Pre-Forking Multi-Worker Launcher. (Shared with the DigDraft server; `app.py` Puts Its Directory on `sys.path`.)
+from prefork import serve_from_command_line
+
+
+application = app
+
+
+################################################################################
+##################### HOOKS AROUND FORKING WORKER PROCESSES ####################
+################################################################################
+
+
+# Close Pooled Connections Before Forking. (SQLite Connections Must Never Cross a Fork.)
+def before_fork():
+    with app.app_context():
+        db.engine.dispose()
+
+# Open Each Worker's First Connection Before It Accepts Any Traffic.
+def after_fork():
+    with app.app_context():
+        db.engine.dispose(close=False)
+        db.engine.connect().close()
+
+
+################################################################################
+######################### PRE-FORKED SERVER EXECUTION ##########################
+################################################################################
+
+
+if __name__ == "__main__":
+    serve_from_command_line(application, before_fork=before_fork, after_fork=after_fork)
@@ -8,11 +8,20 @@ from flask import Flask
 from models import db, Student, Course, Enrollment
 
 from flask_migrate import Migrate
+import os
+import sys
+
+# Request timing instrumentation, shared with (and maintained in) the DigDraft server.
+# NOTE: Set `INSTRUMENTATION_METRICS_PATH` (e.g. to `/metrics`) before attaching it to serve metrics.
+SHARED_MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "project-demos", "digdraft", "server")
+sys.path.append(os.path.normpath(SHARED_MODULES_DIR))
+from instrumentation import Instrumentation
 
 app = Flask(__name__)
 app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///app.db"
 migrate = Migrate(app, db)
 db.init_app(app)
+instrumentation = Instrumentation(app)
 
 
 #######################################################
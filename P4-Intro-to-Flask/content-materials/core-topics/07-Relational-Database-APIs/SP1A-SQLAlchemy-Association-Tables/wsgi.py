@@ -0,0 +1,47 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+# Get the Flask application (with its routes) and database instance.
+from app import app
+from models import db
+# Pre-forking multi-worker launcher, shared with the DigDraft server. (`app.py` puts its directory on `sys.path`.)
+from prefork import serve_from_command_line
+
+
+"""
+Production entry point. Instead of the single process started by `app.run()`:
+
+    python wsgi.py --workers 4 --bind 0.0.0.0:5555
+
+Any other WSGI server can import `wsgi:application` directly.
+"""
+
+application = app
+
+
+#######################################################
+########## HOOKS AROUND FORKING WORKER PROCESSES ######
+#######################################################
+
+
+# NOTE: SQLite connections must never cross a fork; each worker opens its own.
+def before_fork():
+    with app.app_context():
+        db.engine.dispose()
+
+# Opens the worker's first connection before it accepts any traffic.
+def after_fork():
+    with app.app_context():
+        db.engine.dispose(close=False)
+        db.engine.connect().close()
+
+
+#######################################################
+######### PRE-FORKED SERVER FOR EXECUTION #############
+#######################################################
+
+
+if __name__ == "__main__":
+    serve_from_command_line(application, before_fork=before_fork, after_fork=after_fork)
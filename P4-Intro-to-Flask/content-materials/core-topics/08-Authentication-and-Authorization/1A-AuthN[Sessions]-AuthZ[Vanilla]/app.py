@@ -5,14 +5,11 @@
 
 # Flask server request-response and session storage utilities.
 from flask import request, make_response, session
-# Configured application/server and database instances.
-from config import app, db
+# Configured application/server and database instances, and password hashing service.
+from config import app, db, credentials
 # Relative access to user model.
 from models import User
 
-# Cryptographic hashing tools for user authentication.
-import bcrypt
-
 
 #######################################################
 ######## INITIAL SETUP ROUTES FOR APPLICATION #########
@@ -56,15 +53,14 @@ def add_user():
         username = payload["username"]
         password = payload["password"]
 
-        # Generate salt for strenghening password encryption.
+        # Hash password with a random salt on the bounded credential pool.
         # NOTE: Salts add additional random bits to passwords prior to encryption.
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt=salt)
+        hashed_password = credentials.hash_password(password)
 
         # Create new user instance using username and hashed password.
         new_user = User(
             username=username,
-            password=hashed_password.decode("utf-8")
+            password=hashed_password
         )
 
         if new_user is not None:
@@ -94,11 +90,17 @@ def user_login():
         matching_user = User.query.filter(User.username.like(f"%{payload['username']}%")).first()
 
         # Check submitted password against hashed password in database for authentication.
-        AUTHENTICATION_IS_SUCCESSFUL = bcrypt.checkpw(
-            password=payload["password"].encode("utf-8"),
-            hashed_password=matching_user.password.encode("utf-8")
+        # NOTE: Unknown users are checked against a dummy hash so that both failures take equally long.
+        AUTHENTICATION_IS_SUCCESSFUL, upgraded_password = credentials.verify_password(
+            payload["password"],
+            matching_user.password if matching_user is not None else None
         )
         if matching_user is not None and AUTHENTICATION_IS_SUCCESSFUL:
+            # Rehash passwords stored with an outdated bcrypt cost factor.
+            if upgraded_password is not None:
+                matching_user.password = upgraded_password
+                db.session.commit()
+
             # Save authenticated user ID to server-persistent session storage.
             # NOTE: Sessions are to servers what cookies are to clients.
             # NOTE: Server sessions are NOT THE SAME as database sessions! (`session != db.session`)
@@ -17,6 +17,7 @@ from sqlalchemy import MetaData
 # Environment variable loading and operational tools.
 from dotenv import load_dotenv
 import os
+import sys
 
 # Initialize Flask server application.
 app = Flask(__name__)
@@ -49,4 +50,20 @@ CORS(app)
 # Load environment variables for additional application configuration.
 load_dotenv()
 # Configure application server with custom authentication token.
-app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
\ No newline at end of file
+app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
+
+# Make the modules shared with (and maintained in) the DigDraft server importable.
+# NOTE: Appended, so this app's own modules still take precedence.
+SHARED_MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "project-demos", "digdraft", "server")
+sys.path.append(os.path.normpath(SHARED_MODULES_DIR))
+
+# Attach request timing histograms, SQL statement counts, and `Server-Timing` headers.
+# NOTE: Set `INSTRUMENTATION_METRICS_PATH` (e.g. to `/metrics`) before this line to serve the unauthenticated
+#       metrics route. (See `instrumentation.py` in the DigDraft server.)
+from instrumentation import Instrumentation
+instrumentation = Instrumentation(app)
+
+# Hash and verify passwords on a bounded worker pool. (Saturated pools answer `429 Too Many Requests`.)
+# NOTE: Set `BCRYPT_ROUNDS` before this line to change the cost factor. (See `credentials.py` in the DigDraft server.)
+from credentials import CredentialService
+credentials = CredentialService(app)
@@ -5,16 +5,16 @@
 
 # Flask server request-response utilities.
 from flask import request, make_response, jsonify
-# Configured application/server and database instances.
-from config import app, db
+# Configured application/server and database instances, and password hashing service.
+from config import app, db, credentials
 # Relative access to user and pet models.
 from models import User, Pet
 # Custom authorization decorator middleware.
 from middleware import authorization_required
 
-# JSON web tokens and cryptographic hashing tools.
+# JSON web tokens.
 # NOTE: To be used for JWT token construction and encoding/decoding. 
-import jwt, bcrypt
+import jwt
 
 # Datetime-parsing utilities.
 # NOTE: To be used for JWT expiration configuration.
@@ -154,16 +154,15 @@ def add_user():
         # Check if user with email already exists in database. (They shouldn't!)
         preexisting_user = User.query.filter(User.email == email).first()
         if not preexisting_user:
-            # Generate salt for strenghening password encryption.
+            # Hash password with a random salt on the bounded credential pool.
             # NOTE: Salts add additional random bits to passwords prior to encryption.
-            salt = bcrypt.gensalt()
-            hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt=salt)
+            hashed_password = credentials.hash_password(password)
 
             # Create new user instance using email, username, and hashed password.
             new_user = User(
                 email=email,
                 username=username,
-                password=hashed_password.decode("utf-8")
+                password=hashed_password
             )
 
             if new_user is not None:
@@ -190,12 +189,18 @@ def user_login():
         matching_user = User.query.filter(User.email == payload["email"]).first()
 
         # Check submitted password against hashed password in database for authentication.
-        AUTHENTICATION_IS_SUCCESSFUL = bcrypt.checkpw(
-            password=payload["password"].encode("utf-8"),
-            hashed_password=matching_user.password.encode("utf-8")
+        # NOTE: Unknown users are checked against a dummy hash so that both failures take equally long.
+        AUTHENTICATION_IS_SUCCESSFUL, upgraded_password = credentials.verify_password(
+            payload["password"],
+            matching_user.password if matching_user is not None else None
         )
 
         if matching_user is not None and AUTHENTICATION_IS_SUCCESSFUL:
+            # Rehash passwords stored with an outdated bcrypt cost factor.
+            if upgraded_password is not None:
+                matching_user.password = upgraded_password
+                db.session.commit()
+
             # Generate expiration time as 30-minute window from current timewise execution.
             pending_expiration = datetime.utcnow() + timedelta(minutes=30)
 
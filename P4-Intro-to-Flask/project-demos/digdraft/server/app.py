@@ -5,14 +5,38 @@
 
 from flask import make_response, jsonify, request, session
 # from flask import render_template
-import bcrypt
 
-from config import app, db
+from sqlalchemy.exc import IntegrityError
+
+import click
+import time
+
+from config import app, db, credentials
 
 from models import Player, Mob, Biome, Spawn
+from models import find_mob_with_biomes, find_biome_with_mobs, find_spawns, create_spawn_indexes, ASSOCIATION_LOADING_STRATEGIES
+from models import find_with_spawns, update_returning, delete_returning, row_exists
+from models import rebuild_spawn_summary, find_player_by_username, migrate_normalized_usernames, create_leaderboard_indexes
+from models import LEADERBOARD_SCORES
 
 from middleware import authorization_required
 
+from caching import cached_response, response_cache
+
+from pagination import list_response, list_records_response, named_query, parse_integer_argument
+
+from replica import reference_replica, replicated_spawns_query, replicated_with_spawns, warm_reference_replica
+
+from serializers import serialize
+
+from bulk import BatchPayloadError, parse_batch_payload, ingest_spawns
+from bulk import parse_batch_edit, update_in_batch, delete_in_batch, validate_column_changes
+
+from leaderboard import top_players, player_rank
+
+import stats
+from instrumentation import timed_phase
+
 
 #######################################################
 ######## INITIAL SETUP ROUTES FOR APPLICATION #########
@@ -37,22 +61,36 @@ def api_entry(current_player):
 
 
 # GET route to access all mobs.
+# NOTE: Supports keyset pagination (`?limit=50&after=<id>`), streaming (`?stream=ndjson|json`), and `?name=` to match one name.
+#       Served from the in-memory replica without any SQL unless it is disabled. (See `replica.py`.)
 @app.get("/api/mobs")
 @authorization_required
+@cached_response(Mob)
 def view_all_mobs(current_player):
-    all_mobs = Mob.query.all()
-    spawnable_mobs = [mob.to_dict(rules=("-spawns",)) for mob in all_mobs]
-    return make_response(spawnable_mobs, 200)
+    name = request.args.get("name")
+    mobs = reference_replica.table(Mob)
+    if mobs is not None:
+        return list_records_response(mobs.listed(name), lambda mob: mob.to_dict())
+    return list_response(Mob, lambda mob: serialize(mob, rules=("-spawns",)), query=named_query(Mob, name))
     # return render_template("mobs.html", spawnable_mobs=spawnable_mobs)
 
 # GET route to access an individual mob by ID.
 @app.get("/api/mobs/<int:mob_id>")
 @authorization_required
+@cached_response(Mob, Spawn, Biome)
 def view_mob_by_id(current_player, mob_id: int):
-    matching_mob = Mob.query.filter(Mob.id == mob_id).first()
+    mobs, biomes = reference_replica.table(Mob), reference_replica.table(Biome)
+    if mobs is not None and biomes is not None:
+        # NOTE: Only the mob's spawns are queried; the mob and its biomes come from memory.
+        matching_record = mobs.get(mob_id)
+        if matching_record is None:
+            return make_response(jsonify({"error": f"Mob ID `{mob_id}` not found in database."}), 404)
+        spawns = db.session.execute(replicated_spawns_query(matching_record)).mappings()
+        return make_response(jsonify(replicated_with_spawns(matching_record, spawns, biomes)), 200)
+    matching_mob = find_with_spawns(Mob, mob_id)
     if not matching_mob:
         return make_response(jsonify({"error": f"Mob ID `{mob_id}` not found in database."}), 404)
-    return make_response(jsonify(matching_mob.to_dict()), 200)
+    return make_response(jsonify(serialize(matching_mob)), 200)
 
 # POST route to add new mob to database.
 @app.post("/api/mobs")
@@ -65,36 +103,78 @@ def add_mob(current_player):
         damage=POST_REQUEST["damage"],
         speed=POST_REQUEST["speed"],
         is_hostile=POST_REQUEST["is_hostile"],
-        can_spawn_during_daytime=POST_REQUEST["can_spawn_during_daytime"]
+        can_spawn_during_daytime=POST_REQUEST["can_spawn_during_daytime"],
+        # NOTE: A new mob has no spawns; saying so spares a query when it is serialized.
+        spawns=[]
     )
     db.session.add(new_mob)
+    db.session.flush()
+    response = make_response(jsonify(serialize(new_mob)), 201)
     db.session.commit()
-    return make_response(jsonify(new_mob.to_dict()), 201)
+    return response
 
 # PATCH route to edit a mob's information in database.
 @app.patch("/api/mobs/<int:mob_id>")
 @authorization_required
 def edit_mob(current_player, mob_id: int):
-    matching_mob = Mob.query.filter(Mob.id == mob_id).first()
+    PATCH_REQUEST = request.get_json()
+    if not isinstance(PATCH_REQUEST, dict):
+        return make_response(jsonify({"error": "Expected a JSON object of column values."}), 400)
+    error = validate_column_changes(Mob, PATCH_REQUEST)
+    if error:
+        return make_response(jsonify({"error": error}), 400)
+    # NOTE: One `UPDATE ... RETURNING` both writes the mob and tells us whether it exists.
+    matching_mob = update_returning(Mob, mob_id, PATCH_REQUEST) if PATCH_REQUEST else find_with_spawns(Mob, mob_id)
     if not matching_mob:
         return make_response(jsonify({"error": f"Mob ID `{mob_id}` not found in database."}), 404)
-    PATCH_REQUEST = request.get_json()
-    for attribute in PATCH_REQUEST:
-        setattr(matching_mob, attribute, PATCH_REQUEST[attribute])
-    db.session.add(matching_mob)
+    response = make_response(jsonify(serialize(matching_mob)), 200)
     db.session.commit()
-    return make_response(jsonify(matching_mob.to_dict()), 200)
+    return response
 
 # DELETE route to remove a mob from the database.
 @app.delete("/api/mobs/<int:mob_id>")
 @authorization_required
 def remove_mob(current_player, mob_id: int):
-    matching_mob = Mob.query.filter(Mob.id == mob_id).first()
+    matching_mob = delete_returning(Mob, mob_id)
     if not matching_mob:
         return make_response(jsonify({"error": f"Mob ID `{mob_id}` not found in database."}), 404)
-    db.session.delete(matching_mob)
+    response = make_response(jsonify(serialize(matching_mob)), 200)
     db.session.commit()
-    return make_response(jsonify(matching_mob.to_dict()), 200)
+    return response
+
+# NOTE: 200 when every ID matched a row, 207 when only some did, 404 when none did.
+def batch_edit_response(action: str, results: list, missing_ids: list):
+    if not missing_ids:
+        status_code = 200
+    elif results:
+        status_code = 207
+    else:
+        status_code = 404
+    return make_response(jsonify({action: len(results), "missing_ids": missing_ids, "results": results}), status_code)
+
+# PATCH route to apply the same changes to many mobs at once.
+# EXAMPLE: `{"ids": [1, 2, 3], "changes": {"damage": 4}}` (Only mob columns other than `id` may change.)
+@app.patch("/api/mobs/batch")
+@authorization_required
+def edit_mobs_in_batch(current_player):
+    try:
+        ids, changes = parse_batch_edit(Mob, require_changes=True)
+    except BatchPayloadError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    results, missing_ids = update_in_batch(Mob, ids, changes, lambda mob: serialize(mob, rules=("-spawns",)))
+    return batch_edit_response("updated", results, missing_ids)
+
+# DELETE route to remove many mobs at once. (Their spawns are kept with no mob, as with single deletes.)
+# EXAMPLE: `{"ids": [1, 2, 3]}`
+@app.delete("/api/mobs/batch")
+@authorization_required
+def remove_mobs_in_batch(current_player):
+    try:
+        ids, _ = parse_batch_edit(Mob, require_changes=False)
+    except BatchPayloadError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    results, missing_ids = delete_in_batch(Mob, ids, lambda mob: serialize(mob, rules=("-spawns",)))
+    return batch_edit_response("deleted", results, missing_ids)
 
 
 #######################################################
@@ -103,21 +183,35 @@ def remove_mob(current_player, mob_id: int):
 
 
 # GET route to access biomes.
+# NOTE: Supports keyset pagination (`?limit=50&after=<id>`), streaming (`?stream=ndjson|json`), and `?name=` to match one name.
+#       Served from the in-memory replica without any SQL unless it is disabled. (See `replica.py`.)
 @app.get("/api/biomes")
 @authorization_required
+@cached_response(Biome)
 def view_all_biomes(current_player):
-    all_biomes = Biome.query.all()
-    spawnable_biomes = [biome.to_dict(rules=("-spawns",)) for biome in all_biomes]
-    return make_response(jsonify(spawnable_biomes), 200)
+    name = request.args.get("name")
+    biomes = reference_replica.table(Biome)
+    if biomes is not None:
+        return list_records_response(biomes.listed(name), lambda biome: biome.to_dict())
+    return list_response(Biome, lambda biome: serialize(biome, rules=("-spawns",)), query=named_query(Biome, name))
 
 # GET route to access an individual biome by ID.
 @app.get("/api/biomes/<int:biome_id>")
 @authorization_required
+@cached_response(Biome, Spawn, Mob)
 def view_biome_by_id(current_player, biome_id: int):
-    matching_biome = Biome.query.filter(Biome.id == biome_id).first()
+    biomes, mobs = reference_replica.table(Biome), reference_replica.table(Mob)
+    if biomes is not None and mobs is not None:
+        # NOTE: Only the biome's spawns are queried; the biome and its mobs come from memory.
+        matching_record = biomes.get(biome_id)
+        if matching_record is None:
+            return make_response(jsonify({"error": f"Biome ID `{biome_id}` not found in database."}), 404)
+        spawns = db.session.execute(replicated_spawns_query(matching_record)).mappings()
+        return make_response(jsonify(replicated_with_spawns(matching_record, spawns, mobs)), 200)
+    matching_biome = find_with_spawns(Biome, biome_id)
     if not matching_biome:
         return make_response(jsonify({"error": f"Biome ID `{biome_id}` not found in database."}), 404)
-    return make_response(jsonify(matching_biome.to_dict()), 200)
+    return make_response(jsonify(serialize(matching_biome)), 200)
 
 # POST route to add new biome to database.
 @app.post("/api/biomes")
@@ -130,36 +224,68 @@ def add_biome(current_player):
         rarity=POST_REQUEST["rarity"],
         is_in_overworld=POST_REQUEST["is_in_overworld"],
         is_in_nether=POST_REQUEST["is_in_nether"],
-        is_in_end=POST_REQUEST["is_in_end"]
+        is_in_end=POST_REQUEST["is_in_end"],
+        # NOTE: A new biome has no spawns; saying so spares a query when it is serialized.
+        spawns=[]
     )
     db.session.add(new_biome)
+    db.session.flush()
+    response = make_response(jsonify(serialize(new_biome)), 201)
     db.session.commit()
-    return make_response(jsonify(new_biome.to_dict()), 201)
+    return response
 
 # PATCH route to edit a biome's information in database.
 @app.patch("/api/biomes/<int:biome_id>")
 @authorization_required
 def edit_biome(current_player, biome_id: int):
-    matching_biome = Biome.query.filter(Biome.id == biome_id).first()
+    PATCH_REQUEST = request.get_json()
+    if not isinstance(PATCH_REQUEST, dict):
+        return make_response(jsonify({"error": "Expected a JSON object of column values."}), 400)
+    error = validate_column_changes(Biome, PATCH_REQUEST)
+    if error:
+        return make_response(jsonify({"error": error}), 400)
+    # NOTE: One `UPDATE ... RETURNING` both writes the biome and tells us whether it exists.
+    matching_biome = update_returning(Biome, biome_id, PATCH_REQUEST) if PATCH_REQUEST else find_with_spawns(Biome, biome_id)
     if not matching_biome:
         return make_response(jsonify({"error": f"Biome ID `{biome_id}` not found in database."}), 404)
-    PATCH_REQUEST = request.get_json()
-    for attribute in PATCH_REQUEST:
-        setattr(matching_biome, attribute, PATCH_REQUEST[attribute])
-    db.session.add(matching_biome)
+    response = make_response(jsonify(serialize(matching_biome)), 200)
     db.session.commit()
-    return make_response(jsonify(matching_biome.to_dict()), 200)
+    return response
 
 # DELETE route to remove a biome from the database.
 @app.delete("/api/biomes/<int:biome_id>")
 @authorization_required
 def remove_biome(current_player, biome_id: int):
-    matching_biome = Biome.query.filter(Biome.id == biome_id).first()
+    matching_biome = delete_returning(Biome, biome_id)
     if not matching_biome:
         return make_response(jsonify({"error": f"Biome ID `{biome_id}` not found in database."}), 404)
-    db.session.delete(matching_biome)
+    response = make_response(jsonify(serialize(matching_biome)), 200)
     db.session.commit()
-    return make_response(jsonify(matching_biome.to_dict()), 200)
+    return response
+
+# PATCH route to apply the same changes to many biomes at once.
+# EXAMPLE: `{"ids": [1, 2, 3], "changes": {"rarity": "rare"}}` (Only biome columns other than `id` may change.)
+@app.patch("/api/biomes/batch")
+@authorization_required
+def edit_biomes_in_batch(current_player):
+    try:
+        ids, changes = parse_batch_edit(Biome, require_changes=True)
+    except BatchPayloadError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    results, missing_ids = update_in_batch(Biome, ids, changes, lambda biome: serialize(biome, rules=("-spawns",)))
+    return batch_edit_response("updated", results, missing_ids)
+
+# DELETE route to remove many biomes at once. (Their spawns are kept with no biome, as with single deletes.)
+# EXAMPLE: `{"ids": [1, 2, 3]}`
+@app.delete("/api/biomes/batch")
+@authorization_required
+def remove_biomes_in_batch(current_player):
+    try:
+        ids, _ = parse_batch_edit(Biome, require_changes=False)
+    except BatchPayloadError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    results, missing_ids = delete_in_batch(Biome, ids, lambda biome: serialize(biome, rules=("-spawns",)))
+    return batch_edit_response("deleted", results, missing_ids)
 
 
 #######################################################
@@ -171,39 +297,48 @@ def remove_biome(current_player, biome_id: int):
 @app.post("/api/mobs/<int:mob_id>/spawns")
 @authorization_required
 def spawn_mob_in_biome(current_player, mob_id: int):
-    # 1. Find the mob that matches the given ID from the URL/route.
-    matching_mob = Mob.query.filter(Mob.id == mob_id).first()
+    # 1. Check that a mob matches the given ID from the URL/route.
+    # NOTE: Only the mob's ID is fetched, since the response never shows the mob.
+    if not row_exists(Mob, mob_id):
+        return make_response(jsonify({"error": f"Mob ID `{mob_id}` not found in database."}), 404)
     # 2. Find the biome that matches the given ID from the request. 
     # NOTE: The request will be neither a `Mob()` nor a `Biome()`. 
     #       It will be a `Spawn()` with IDs for a mob and a biome.
     POST_REQUEST = request.get_json()
     biome_id, hour_spawned = POST_REQUEST["biome_id"], POST_REQUEST["hour_spawned"]
-    matching_biome = Biome.query.filter(Biome.id == biome_id).first()
+    matching_biome = db.session.get(Biome, biome_id)
     # NOTE: It's helpful to validate our matching objects before attempting to manipulate SQL tables.
-    if not matching_mob:
-        return make_response(jsonify({"error": f"Mob ID `{mob_id}` not found in database."}), 404)
     if not matching_biome:
         return make_response(jsonify({"error": f"Biome ID `{biome_id}` not found in database."}), 404)
     # 3. Link our matching mob and biome using a third object: `Spawn`. 
-    new_spawn = Spawn(mob_id=matching_mob.id, 
-                      biome_id=matching_biome.id,
+    new_spawn = Spawn(mob_id=mob_id, 
+                      biome=matching_biome,
                       hour_spawned=hour_spawned)
     # 4. Stage and commit changes to our database.
+    # NOTE: The spawn is serialized before committing, which would expire it and its biome.
     db.session.add(new_spawn)
-    db.session.commit()
+    db.session.flush()
     # 5. Return acceptable value to frontend/API.
     # NOTE: Must give additional serialization rules to stop cascading 
     #       after showing a mob's spawned biomes.
-    return make_response(jsonify(new_spawn.to_dict(rules=("-mob",))), 201)
+    response = make_response(jsonify(serialize(new_spawn, rules=("-mob",))), 201)
+    db.session.commit()
+    return response
 
 # GET route to view all spawned biomes for a current mob.
 @app.get("/api/mobs/<int:mob_id>/biomes")
 @authorization_required
+@cached_response(Mob, Spawn, Biome)
 def view_spawned_biomes_for_mob(current_player, mob_id: int):
-    matching_mob = Mob.query.filter(Mob.id == mob_id).first()
+    # NOTE: Spawns and their biomes are eagerly loaded to avoid one query per spawn.
+    #       Clients may pick a strategy with `?loading=selectin|joined|lazy`.
+    strategy = request.args.get("loading", app.config["ASSOCIATION_LOADING_STRATEGY"])
+    if strategy not in ASSOCIATION_LOADING_STRATEGIES:
+        return make_response(jsonify({"error": f"Unknown loading strategy `{strategy}`."}), 400)
+    matching_mob = find_mob_with_biomes(mob_id, strategy=strategy)
     if not matching_mob:
         return make_response(jsonify({"error": f"Mob ID `{mob_id}` not found in database."}), 404)
-    spawned_biomes_for_mob = [biome.to_dict(rules=("-spawns",)) for biome in matching_mob.biomes]
+    spawned_biomes_for_mob = [serialize(biome, rules=("-spawns",)) for biome in matching_mob.biomes]
     return make_response(jsonify(spawned_biomes_for_mob), 200)
 
 
@@ -216,42 +351,286 @@ def view_spawned_biomes_for_mob(current_player, mob_id: int):
 @app.post("/api/biomes/<int:biome_id>/spawns")
 @authorization_required
 def spawn_mob_from_biome(current_player, biome_id: int):
-    # 1. Find the biome that matches the given ID from the URL/route.
-    matching_biome = Biome.query.filter(Biome.id == biome_id).first()
+    # 1. Check that a biome matches the given ID from the URL/route.
+    # NOTE: Only the biome's ID is fetched, since the response never shows the biome.
+    if not row_exists(Biome, biome_id):
+        return make_response(jsonify({"error": f"Biome ID `{biome_id}` not found in database."}), 404)
     # 2. Find the mob that matches the given ID from the request. 
     # NOTE: My request will be neither a `Biome()` nor a `Mob()`. 
     #       It will be a `Spawn()` with IDs for a biome and a mob.
     POST_REQUEST = request.get_json()
     mob_id, hour_spawned = POST_REQUEST["mob_id"], POST_REQUEST["hours_spawned"]
-    matching_mob = Mob.query.filter(Mob.id == mob_id).first()
+    matching_mob = db.session.get(Mob, mob_id)
     # NOTE: It's helpful to validate our matching objects before attempting to manipulate SQL tables.
-    if not matching_biome:
-        return make_response(jsonify({"error": f"Biome ID `{biome_id}` not found in database."}), 404)
     if not matching_mob:
         return make_response(jsonify({"error": f"Mob ID `{mob_id}` not found in database."}), 404)
     # 3. Link our matching biome and mob using an association table: `Spawn`. 
-    new_spawn = Spawn(biome_id=matching_biome.id,
-                      mob_id=matching_mob.id, 
+    new_spawn = Spawn(biome_id=biome_id,
+                      mob=matching_mob, 
                       hour_spawned=hour_spawned)
     # 4. Stage and commit changes to our database.
+    # NOTE: The spawn is serialized before committing, which would expire it and its mob.
     db.session.add(new_spawn)
-    db.session.commit()
+    db.session.flush()
     # 5. Return acceptable value to frontend/API.
     # NOTE: Must give additional serialization rules to stop cascading 
     #       after showing a biome's spawned mobs.
-    return make_response(jsonify(new_spawn.to_dict(rules=("-biome",))), 201)
+    response = make_response(jsonify(serialize(new_spawn, rules=("-biome",))), 201)
+    db.session.commit()
+    return response
 
 # GET route to view all spawned mobs for a current biome.
 @app.get("/api/biomes/<int:biome_id>/mobs")
 @authorization_required
+@cached_response(Biome, Spawn, Mob)
 def view_spawned_mobs_for_biome(current_player, biome_id: int):
-    matching_biome = Biome.query.filter(Biome.id == biome_id).first()
+    # NOTE: Spawns and their mobs are eagerly loaded to avoid one query per spawn.
+    #       Clients may pick a strategy with `?loading=selectin|joined|lazy`.
+    strategy = request.args.get("loading", app.config["ASSOCIATION_LOADING_STRATEGY"])
+    if strategy not in ASSOCIATION_LOADING_STRATEGIES:
+        return make_response(jsonify({"error": f"Unknown loading strategy `{strategy}`."}), 400)
+    matching_biome = find_biome_with_mobs(biome_id, strategy=strategy)
     if not matching_biome:
         return make_response(jsonify({"error": f"Biome ID `{biome_id}` not found in database."}), 404)
-    spawned_mobs_for_biome = [mob.to_dict(rules=("-spawns",)) for mob in matching_biome.mobs]
+    spawned_mobs_for_biome = [serialize(mob, rules=("-spawns",)) for mob in matching_biome.mobs]
     return make_response(jsonify(spawned_mobs_for_biome), 200)
 
 
+#######################################################
+############ FILTERED QUERY ROUTES FOR SPAWNS #########
+#######################################################
+
+
+# GET route to search spawns by mob, biome, dimension, and/or hour range.
+# EXAMPLE: `/api/spawns?dimension=nether&from_hour=18&to_hour=6` (hour ranges may wrap past midnight).
+# NOTE: Supports the same pagination and streaming arguments as `/api/mobs`.
+@app.get("/api/spawns")
+@authorization_required
+@cached_response(Spawn, Biome)
+def search_spawns(current_player):
+    filters = {}
+    for argument in ("mob_id", "biome_id", "from_hour", "to_hour"):
+        if argument in request.args:
+            filters[argument] = parse_integer_argument(argument, None)
+            if filters[argument] is None:
+                return make_response(jsonify({"error": f"`{argument}` must be an integer."}), 400)
+    try:
+        query = find_spawns(dimension=request.args.get("dimension"), **filters)
+    except ValueError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    return list_response(Spawn, lambda spawn: serialize(spawn, rules=("-mob", "-biome")), query=query)
+
+# CLI command to add the spawn search indexes to databases created before they existed.
+# USAGE: `flask --app app create-spawn-indexes`
+@app.cli.command("create-spawn-indexes")
+def create_spawn_indexes_command():
+    index_count = create_spawn_indexes()
+    print(f">> Created {index_count} spawn index(es), if missing.")
+
+
+#######################################################
+############ BULK INGESTION ROUTES FOR SPAWNS #########
+#######################################################
+
+
+# POST route to add many spawns at once.
+# NOTE: Accepts a JSON array or an NDJSON body of `{"mob_id", "biome_id", "hour_spawned"}` objects.
+#       All referenced IDs are validated with one query and valid rows are inserted in one transaction.
+@app.post("/api/spawns/batch")
+@authorization_required
+def add_spawns_in_batch(current_player):
+    try:
+        items = parse_batch_payload()
+    except BatchPayloadError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    statuses = ingest_spawns(items)
+    created_count = sum(1 for status in statuses if status["status"] == "created")
+    # NOTE: 201 when every item was created, 207 when only some were, 400 when none were.
+    if created_count == len(statuses):
+        status_code = 201
+    elif created_count:
+        status_code = 207
+    else:
+        status_code = 400
+    return make_response(jsonify({"created": created_count, "failed": len(statuses) - created_count, "results": statuses}), status_code)
+
+
+#######################################################
+########### AGGREGATE STATISTICS ROUTES (SQL) #########
+#######################################################
+
+
+# NOTE: Spawn distributions read the trigger-maintained summary table by default.
+#       Pass `?source=live` to group over `spawn_table` directly.
+def requested_stat_source():
+    source = request.args.get("source", "summary")
+    if source not in stats.STAT_SOURCES:
+        raise ValueError(f"Unknown statistics source `{source}`. Expected one of: {', '.join(stats.STAT_SOURCES)}.")
+    return source
+
+# GET route to view the average hit points of mobs that spawn in each biome.
+@app.get("/api/stats/biomes/average-hit-points")
+@authorization_required
+@cached_response(Biome, Spawn, Mob)
+def view_average_hit_points_per_biome(current_player):
+    return make_response(jsonify(stats.average_hit_points_per_biome()), 200)
+
+# GET route to view how many hostile mobs spawn in each dimension.
+@app.get("/api/stats/mobs/hostile-by-dimension")
+@authorization_required
+@cached_response(Mob, Spawn, Biome)
+def view_hostile_mob_counts_by_dimension(current_player):
+    return make_response(jsonify(stats.hostile_mob_counts_by_dimension()), 200)
+
+# GET route to view the number of spawns per hour. (Optionally for one biome with `?biome_id=`.)
+@app.get("/api/stats/spawns/by-hour")
+@authorization_required
+@cached_response(Spawn)
+def view_spawn_counts_by_hour(current_player):
+    biome_id = parse_integer_argument("biome_id", None)
+    if "biome_id" in request.args and biome_id is None:
+        return make_response(jsonify({"error": "`biome_id` must be an integer."}), 400)
+    try:
+        source = requested_stat_source()
+    except ValueError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    return make_response(jsonify(stats.spawn_counts_by_hour(biome_id=biome_id, source=source)), 200)
+
+# GET route to view the number of spawns per biome.
+@app.get("/api/stats/spawns/by-biome")
+@authorization_required
+@cached_response(Biome, Spawn)
+def view_spawn_counts_by_biome(current_player):
+    try:
+        source = requested_stat_source()
+    except ValueError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    return make_response(jsonify(stats.spawn_counts_by_biome(source=source)), 200)
+
+# CLI command to (re)build the spawn summary table and its triggers for an existing database.
+# USAGE: `flask --app app rebuild-spawn-summary`
+@app.cli.command("rebuild-spawn-summary")
+def rebuild_spawn_summary_command():
+    rebuild_spawn_summary()
+    print(">> Spawn summary rebuilt.")
+
+
+#######################################################
+########## SPAWN SIMULATION ROUTES (NUMPY) ############
+#######################################################
+
+
+# Reads comma-separated integer IDs (e.g. `?biome_ids=1,4,7`) from the query string. (None when absent.)
+def parse_id_list_argument(name: str):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return [int(identifier) for identifier in value.split(",") if identifier.strip()]
+    except ValueError:
+        raise ValueError(f"`{name}` must be a comma-separated list of integer IDs.")
+
+# GET route to simulate which mobs spawn in which biomes over a range of ticks (one tick per in-game hour).
+# EXAMPLE: `/api/simulate?from_tick=0&to_tick=48&dimension=nether&seed=7&events=20`
+# NOTE: Simulates every mob and biome unless `mob_ids`, `biome_ids`, and/or `dimension` narrow the world.
+#       The same arguments always give the same spawns. (See `simulation.py`.)
+@app.get("/api/simulate")
+@authorization_required
+@cached_response(Mob, Biome, Spawn)
+def view_spawn_simulation(current_player):
+    # NOTE: Imported on first use, so that only the simulation needs NumPy. (See the `Pipfile`.)
+    try:
+        from simulation import current_spawn_world, simulate_spawns, simulation_summary
+    except ImportError:
+        return make_response(jsonify({"error": "Spawn simulation requires NumPy, which is not installed."}), 501)
+    arguments = {}
+    for argument, default in (("from_tick", 0), ("to_tick", 24), ("seed", 0), ("events", 100)):
+        arguments[argument] = parse_integer_argument(argument, default)
+        if arguments[argument] is None or arguments[argument] < 0:
+            return make_response(jsonify({"error": f"`{argument}` must be a non-negative integer."}), 400)
+    if arguments["events"] > app.config["PAGINATION_MAX_LIMIT"]:
+        return make_response(jsonify({"error": f"`events` must be at most {app.config['PAGINATION_MAX_LIMIT']}."}), 400)
+    try:
+        biome_ids, mob_ids = parse_id_list_argument("biome_ids"), parse_id_list_argument("mob_ids")
+        with timed_phase("simulate"):
+            simulation = simulate_spawns(
+                current_spawn_world(),
+                from_tick=arguments["from_tick"],
+                to_tick=arguments["to_tick"],
+                biome_ids=biome_ids,
+                mob_ids=mob_ids,
+                dimension=request.args.get("dimension"),
+                seed=arguments["seed"],
+                event_limit=arguments["events"],
+                max_candidates=app.config["SIMULATION_MAX_CANDIDATES"]
+            )
+    except ValueError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    return make_response(jsonify(simulation_summary(simulation)), 200)
+
+# CLI command to run a spawn simulation without a server. (No limit on its size.)
+# USAGE: `flask --app app simulate-spawns --to-tick 240 --dimension overworld --seed 7`
+@app.cli.command("simulate-spawns")
+@click.option("--from-tick", type=int, default=0, show_default=True, help="First tick (in-game hour) to simulate.")
+@click.option("--to-tick", type=int, default=24, show_default=True, help="Tick to stop before.")
+@click.option("--biome-ids", default=None, help="Comma-separated biome IDs. (Default: every biome.)")
+@click.option("--mob-ids", default=None, help="Comma-separated mob IDs. (Default: every mob.)")
+@click.option("--dimension", type=click.Choice(["overworld", "nether", "end"]), default=None, help="Only simulate biomes in this dimension.")
+@click.option("--seed", type=int, default=0, show_default=True, help="Random seed. (Same seed, same spawns.)")
+@click.option("--events", type=int, default=10, show_default=True, help="Individual spawns to print.")
+def simulate_spawns_command(from_tick, to_tick, biome_ids, mob_ids, dimension, seed, events):
+    try:
+        from simulation import current_spawn_world, simulate_spawns
+    except ImportError:
+        raise click.ClickException("Spawn simulation requires NumPy, which is not installed.")
+    started_at = time.perf_counter()
+    world = current_spawn_world()
+    print(f">> Loaded {len(world.mob_ids):,} mobs and {len(world.biome_ids):,} biomes in {time.perf_counter() - started_at:.2f}s.")
+    try:
+        simulation = simulate_spawns(
+            world,
+            from_tick=from_tick,
+            to_tick=to_tick,
+            biome_ids=[int(identifier) for identifier in biome_ids.split(",")] if biome_ids else None,
+            mob_ids=[int(identifier) for identifier in mob_ids.split(",")] if mob_ids else None,
+            dimension=dimension,
+            seed=seed,
+            event_limit=events
+        )
+    except ValueError as error:
+        raise click.BadParameter(str(error))
+    rate = simulation.candidates / simulation.seconds if simulation.seconds else 0
+    print(f">> Simulated {simulation.candidates:,} candidates ({simulation.eligible_candidates:,} eligible) "
+          f"in {simulation.seconds:.3f}s ({rate:,.0f} candidates/s): {simulation.spawns:,} spawns.")
+    for tick, biome_id, mob_id in simulation.events:
+        print(f"\t>> Tick {tick} (hour {tick % 24}): mob {mob_id} spawns in biome {biome_id}.")
+
+
+#######################################################
+########## CACHE, REPLICA, AND POOL MONITORING ########
+#######################################################
+
+
+# GET route to view hit/miss counters for cached read routes.
+# NOTE: Read routes answer `If-None-Match` with `304 Not Modified` while their tables are unchanged.
+@app.get("/api/cache/stats")
+@authorization_required
+def view_response_cache_statistics(current_player):
+    return make_response(jsonify(response_cache.statistics()), 200)
+
+# GET route to view the rows, load time, and memory of each table in the in-memory replica.
+@app.get("/api/replica/stats")
+@authorization_required
+def view_reference_replica_statistics(current_player):
+    return make_response(jsonify(reference_replica.report()), 200)
+
+# GET route to view completed, rejected, timed-out, and rehashed operations of the password hashing pool.
+@app.get("/api/credentials/stats")
+@authorization_required
+def view_credential_statistics(current_player):
+    return make_response(jsonify(credentials.statistics()), 200)
+
+
 #######################################################
 ############ PLAYER AUTHENTICATION ROUTING ############
 #######################################################
@@ -266,20 +645,30 @@ def add_player():
         username = payload["username"]
         password = payload["password"]
 
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt=salt)
+        # NOTE: Usernames are unique regardless of case or surrounding whitespace.
+        if find_player_by_username(username) is not None:
+            return make_response({"error": "Username is already taken. Try another."}, 409)
+
+        # NOTE: Hashing runs on the bounded credential pool. (A saturated pool answers `429`.)
+        hashed_password = credentials.hash_password(password)
 
         new_player = Player(
             username=username,
-            password=hashed_password.decode("utf-8")
+            password=hashed_password
         )
 
         if new_player is not None:
             db.session.add(new_player)
-            db.session.commit()
+            # NOTE: A concurrent signup for the same normalized username can commit while this one is hashing.
+            #       Its unique index then rejects this insert, which gets the same answer as the check above.
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                return make_response({"error": "Username is already taken. Try another."}, 409)
             session["player_id"] = new_player.id
             return make_response(
-                new_player.to_dict(only=("id", "kills", "deaths", "experience", "username", "created_at")), 
+                serialize(new_player, only=("id", "kills", "deaths", "experience", "username", "created_at")), 
                 201
             )
         else:
@@ -293,17 +682,23 @@ def player_login():
     if request.method == "POST":
         payload = request.get_json()
 
-        matching_player = Player.query.filter(Player.username.like(f"%{payload['username']}%")).first()
+        # NOTE: An exact match on the normalized username uses its unique index. (See `models.py`.)
+        matching_player = find_player_by_username(payload["username"])
 
-        AUTHENTICATION_IS_SUCCESSFUL = bcrypt.checkpw(
-            password=payload["password"].encode("utf-8"),
-            hashed_password=matching_player.password.encode("utf-8")
+        # NOTE: Unknown players are still checked (against a dummy hash) so that both failures take equally long.
+        AUTHENTICATION_IS_SUCCESSFUL, upgraded_password = credentials.verify_password(
+            payload["password"],
+            matching_player.password if matching_player is not None else None
         )
 
         if matching_player is not None and AUTHENTICATION_IS_SUCCESSFUL:
+            # Rehash passwords stored with an outdated bcrypt cost factor.
+            if upgraded_password is not None:
+                matching_player.password = upgraded_password
+                db.session.commit()
             session["player_id"] = matching_player.id
             return make_response(
-                matching_player.to_dict(only=("id", "kills", "deaths", "experience", "username", "created_at")), 
+                serialize(matching_player, only=("id", "kills", "deaths", "experience", "username", "created_at")), 
                 200
             )
         else:
@@ -320,6 +715,94 @@ def player_logout():
     else:
         return make_response({"error": f"Invalid request type. (Expected DELETE; received {request.method}.)"}, 400)
 
+# CLI command to add (and backfill) the normalized usernames used by logins.
+# USAGE: `flask --app app normalize-usernames`
+@app.cli.command("normalize-usernames")
+def normalize_usernames_command():
+    player_count = migrate_normalized_usernames()
+    print(f">> Normalized {player_count} username(s).")
+
+
+#######################################################
+############ PLAYER STATS AND LEADERBOARDS ############
+#######################################################
+
+
+# Parses `?limit=` for leaderboard routes.
+def parse_leaderboard_limit():
+    limit = parse_integer_argument("limit", app.config["LEADERBOARD_DEFAULT_LIMIT"])
+    if limit is None or not 0 < limit <= app.config["PAGINATION_MAX_LIMIT"]:
+        raise ValueError(f"`limit` must be an integer between 1 and {app.config['PAGINATION_MAX_LIMIT']}.")
+    return limit
+
+def unknown_leaderboard_response(board: str):
+    return make_response(jsonify({"error": f"Unknown leaderboard `{board}`. Expected one of: {', '.join(LEADERBOARD_SCORES)}."}), 404)
+
+# GET route to view the top players on every leaderboard.
+@app.get("/api/leaderboard")
+@authorization_required
+def view_leaderboards(current_player):
+    try:
+        limit = parse_leaderboard_limit()
+    except ValueError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    return make_response(jsonify({board: top_players(board, limit) for board in LEADERBOARD_SCORES}), 200)
+
+# GET route to view the top players on one leaderboard (`kills`, `kill-death-ratio`, or `experience`).
+# NOTE: Players with equal scores share a rank. (`?limit=` defaults to `DIGDRAFT_LEADERBOARD_DEFAULT_LIMIT`.)
+@app.get("/api/leaderboard/<board>")
+@authorization_required
+def view_leaderboard(current_player, board: str):
+    if board not in LEADERBOARD_SCORES:
+        return unknown_leaderboard_response(board)
+    try:
+        limit = parse_leaderboard_limit()
+    except ValueError as error:
+        return make_response(jsonify({"error": str(error)}), 400)
+    return make_response(jsonify(top_players(board, limit)), 200)
+
+# GET route to view one player's rank on a leaderboard.
+@app.get("/api/leaderboard/<board>/players/<int:player_id>")
+@authorization_required
+def view_player_rank(current_player, board: str, player_id: int):
+    if board not in LEADERBOARD_SCORES:
+        return unknown_leaderboard_response(board)
+    ranked_player = player_rank(board, player_id)
+    if ranked_player is None:
+        return make_response(jsonify({"error": f"Player ID `{player_id}` not found in database."}), 404)
+    return make_response(jsonify(ranked_player), 200)
+
+# PATCH route to set the logged-in player's own kills, deaths, and/or experience.
+# NOTE: Written through the ORM, so that the leaderboards' in-memory ranks are updated incrementally.
+@app.patch("/api/players/<int:player_id>/stats")
+@authorization_required
+def edit_player_stats(current_player, player_id: int):
+    if current_player["id"] != player_id:
+        return make_response(jsonify({"error": "Players can only edit their own stats."}), 403)
+    PATCH_REQUEST = request.get_json()
+    if not isinstance(PATCH_REQUEST, dict) or not PATCH_REQUEST:
+        return make_response(jsonify({"error": "Expected a JSON object with any of `kills`, `deaths`, and `experience`."}), 400)
+    for stat, value in PATCH_REQUEST.items():
+        if stat not in ("kills", "deaths", "experience"):
+            return make_response(jsonify({"error": f"Unknown player stat `{stat}`."}), 400)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            return make_response(jsonify({"error": f"`{stat}` must be a non-negative integer."}), 400)
+    matching_player = db.session.get(Player, player_id)
+    if matching_player is None:
+        return make_response(jsonify({"error": f"Player ID `{player_id}` not found in database."}), 404)
+    for stat, value in PATCH_REQUEST.items():
+        setattr(matching_player, stat, value)
+    response = make_response(jsonify(serialize(matching_player, only=("id", "kills", "deaths", "experience", "username", "created_at"))), 200)
+    db.session.commit()
+    return response
+
+# CLI command to add the leaderboard indexes to databases created before they existed.
+# USAGE: `flask --app app create-leaderboard-indexes`
+@app.cli.command("create-leaderboard-indexes")
+def create_leaderboard_indexes_command():
+    index_count = create_leaderboard_indexes()
+    print(f">> Created {index_count} leaderboard index(es), if missing.")
+
 
 #######################################################
 ############# PLAYER AUTHORIZATION ROUTING ############
@@ -333,10 +816,10 @@ def authorize_player():
     if not player_id:
         return make_response({"error": "Player account not authenticated. Please log in or sign up to continue using the application."}, 401)
     else:
-        matching_player = Player.query.filter(Player.id == player_id).first()
+        matching_player = db.session.get(Player, player_id)
         if matching_player is not None:
             return make_response(
-                matching_player.to_dict(only=("id", "username", "created_at")), 
+                serialize(matching_player, only=("id", "username", "created_at")), 
                 200
             )
         else:
@@ -360,4 +843,5 @@ def page_not_found(error):
 
 
 if __name__ == "__main__":
+    warm_reference_replica()
     app.run(port=5555, debug=True)
\ No newline at end of file
@@ -0,0 +1,166 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from flask import request
+
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from io import BytesIO
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from config import app, db, apply_sqlite_pragmas
+
+from replica import warm_reference_replica
+
+# NOTE: Importing `app` registers every route, including the read routes served natively below.
+import app as routes
+
+
+"""
+An ASGI entry point that serves Digdraft's hot read routes from coroutines.
+
+    uvicorn asgi:application --port 5555
+
+Under WSGI, every request holds a server thread for as long as it waits on
+SQLite. Here, the read routes below run on the event loop and query through
+an async SQLAlchemy engine (`sqlite+aiosqlite`). While one request waits on
+the database, the event loop serves others, so one process keeps many
+concurrent readers in flight without a thread for each of them.
+
+    -> GET /api/mobs, /api/mobs/<id>, /api/mobs/<id>/biomes, /api/biomes,
+       /api/biomes/<id>, /api/biomes/<id>/mobs, and /api/spawns run natively.
+    -> Native requests run the unchanged Flask views from `app.py` (with
+       their middleware, serializers, query builders, replica, and response
+       cache) inside `AsyncSession.run_sync()`. There, `db.session` is the
+       async session's synchronous facade: every statement it executes awaits
+       the async driver, and the event loop serves other requests meanwhile.
+       Only the I/O differs, so responses are identical to the WSGI app's.
+    -> Every other request (writes, logins, statistics, streamed listings,
+       the metrics route) is handed to the same Flask app through asgiref's
+       `WsgiToAsgi`, which runs it on a thread pool.
+
+Requires `aiosqlite`, `greenlet`, `asgiref`, and an ASGI server such as
+`uvicorn`. (See the `Pipfile`.) Run `python benchmarks.py serving-modes` to
+compare both modes.
+
+NOTE: Streamed bodies are produced after the view returns (outside of
+      `run_sync()`), so streamed listings are always served by the thread pool.
+"""
+
+
+def async_database_uri():
+    if app.config["ASYNC_DATABASE_URI"]:
+        return app.config["ASYNC_DATABASE_URI"]
+    # NOTE: The synchronous engine's URL is used, since Flask-SQLAlchemy resolves relative SQLite paths.
+    with app.app_context():
+        url = db.engine.url
+    if url.get_backend_name() != "sqlite":
+        raise RuntimeError("Set `DIGDRAFT_ASYNC_DATABASE_URI` to serve a non-SQLite database asynchronously.")
+    return url.set(drivername="sqlite+aiosqlite")
+
+
+async_engine = create_async_engine(async_database_uri(), pool_size=app.config["ASYNC_POOL_SIZE"])
+if async_engine.dialect.name == "sqlite":
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+#######################################################
+########### NATIVE ASYNC READ ROUTE DISPATCH ##########
+#######################################################
+
+
+def is_not_streamed():
+    return "stream" not in request.args
+
+# Endpoints of the `app.py` read routes served on the event loop, each with the requests it accepts (or None for all).
+# NOTE: Requests a route declines are handed to the thread pool instead.
+NATIVE_ENDPOINTS = {
+    "view_all_mobs": is_not_streamed,
+    "view_mob_by_id": None,
+    "view_all_biomes": is_not_streamed,
+    "view_biome_by_id": None,
+    "view_spawned_biomes_for_mob": None,
+    "view_spawned_mobs_for_biome": None,
+    "search_spawns": is_not_streamed,
+}
+
+# Checks the request context's URL match (made when it was pushed) against the native endpoints.
+def serves_natively():
+    if request.method != "GET" or request.routing_exception is not None:
+        return False
+    if request.url_rule.endpoint not in NATIVE_ENDPOINTS:
+        return False
+    accepts = NATIVE_ENDPOINTS[request.url_rule.endpoint]
+    return accepts is None or accepts()
+
+# Runs Flask's full request pipeline with `db.session` bound to the async session's synchronous facade.
+# NOTE: Called through `run_sync()`, where each statement awaits the async driver instead of blocking.
+def dispatch_request(sync_session):
+    db.session.registry.set(sync_session)
+    try:
+        return app.full_dispatch_request()
+    finally:
+        db.session.registry.clear()
+
+
+#######################################################
+########### EXPORTABLE ASGI APPLICATION OBJECT ########
+#######################################################
+
+
+flask_application = WsgiToAsgi(app)
+
+# Builds the WSGI environ Flask expects from an ASGI HTTP scope, with asgiref's own translation. (GETs carry no body.)
+# NOTE: asgiref reads the headers from the instance's `scope`, so it is set before building.
+def build_environ(scope):
+    translator = WsgiToAsgiInstance(app)
+    translator.scope = scope
+    return translator.build_environ(scope, BytesIO())
+
+async def send_response(send, response):
+    await send({
+        "type": "http.response.start",
+        "status": response.status_code,
+        "headers": [(header.lower().encode("latin-1"), value.encode("latin-1")) for header, value in response.headers.to_wsgi_list()],
+    })
+    await send({"type": "http.response.body", "body": response.get_data()})
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # NOTE: Loading the replica now keeps its first load off the event loop's request path.
+                warm_reference_replica()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await async_engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] != "http" or scope["method"] != "GET":
+        return await flask_application(scope, receive, send)
+
+    # NOTE: Flask's contexts live in context variables, so each asyncio task sees only its own request.
+    context = app.request_context(build_environ(scope))
+    context.push()
+    response, error = None, None
+    try:
+        if serves_natively():
+            try:
+                async with AsyncSession() as async_session:
+                    response = await async_session.run_sync(dispatch_request)
+            except Exception as exception:
+                error = exception
+                response = app.handle_exception(exception)
+    finally:
+        context.pop(error)
+
+    if response is None:
+        return await flask_application(scope, receive, send)
+    await send_response(send, response)
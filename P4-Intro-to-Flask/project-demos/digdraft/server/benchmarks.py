@@ -0,0 +1,731 @@
+#######################################################
+############# IMPORTS AND INITIALIZATIONS #############
+#######################################################
+
+
+import os
+
+# NOTE: Benchmarks write to a scratch database unless told otherwise, so real data is never touched.
+os.environ.setdefault("DIGDRAFT_DATABASE_URI", "sqlite:///digdraft_benchmarks.db")
+
+# Get database instance and Flask application connection.
+from config import app, db, credentials
+# Register the API's routes on the application. (Imported under an alias so it does not shadow `app`.)
+import app as digdraft_routes
+# Get all physical models and the associator.
+from models import Player, Mob, Biome, Spawn, find_spawns, find_player_by_username, count_queries
+# Compiled serialization utilities.
+from serializers import serialize
+
+from simulation import load_spawn_world, simulate_spawns, DAYTIME_HOURS
+# In-memory snapshot of mobs and biomes.
+from replica import reference_replica, REPLICATED_RECORDS
+# Leaderboard ranks and their in-memory order statistics.
+from leaderboard import player_rankings, player_rank, top_players
+from models import LEADERBOARD_SCORES, create_leaderboard_indexes
+
+from sqlalchemy import func, insert, select, text
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Event, Thread
+import argparse
+import asyncio
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+#######################################################
+############ DEFINING BENCHMARK UTILITIES #############
+#######################################################
+
+
+# Runs a callable over a list of rows and reports throughput in rows per second.
+def measure_rows_per_second(function, rows: list, repeat: int = 3):
+    best_duration = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        for row in rows:
+            function(row)
+        best_duration = min(best_duration, time.perf_counter() - started_at)
+    return len(rows) / best_duration if best_duration else float("inf")
+
+# Creates the schema and a logged-in test client for route-level benchmarks.
+def prepare_client(mob_count: int = 10, biome_count: int = 10):
+    db.create_all()
+    if db.session.query(Mob.id).count() < mob_count:
+        db.session.add_all([Mob(name=f"Mob {index}", hit_points=10, damage=1, speed=1, is_hostile=True,
+                                can_spawn_during_daytime=False) for index in range(mob_count)])
+    if db.session.query(Biome.id).count() < biome_count:
+        db.session.add_all([Biome(name=f"Biome {index}", elevation="base", rarity="common", is_in_overworld=True,
+                                  is_in_nether=False, is_in_end=False) for index in range(biome_count)])
+    benchmark_player = Player.query.filter(Player.username == "benchmark_player").first()
+    if benchmark_player is None:
+        benchmark_player = Player(username="benchmark_player", password="not-a-real-hash")
+        db.session.add(benchmark_player)
+    db.session.commit()
+    client = app.test_client()
+    with client.session_transaction() as server_session:
+        server_session["player_id"] = benchmark_player.id
+    return client
+
+# Runs a callable repeatedly and reports its median latency in milliseconds.
+def measure_median_milliseconds(function, repeat: int = 20):
+    durations = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started_at)
+    return statistics.median(durations) * 1000
+
+# Inserts spawns in large Core `executemany` batches until the table holds `count` rows.
+def populate_spawns(count: int, batch_size: int = 50000):
+    prepare_client(mob_count=100, biome_count=100)
+    existing = db.session.query(Spawn.id).count()
+    mob_ids = [identifier for (identifier,) in db.session.query(Mob.id).all()]
+    biome_ids = [identifier for (identifier,) in db.session.query(Biome.id).all()]
+    generator = random.Random(42)
+    while existing < count:
+        batch = [{"mob_id": generator.choice(mob_ids), "biome_id": generator.choice(biome_ids), "hour_spawned": generator.randrange(24)}
+                 for _ in range(min(batch_size, count - existing))]
+        db.session.execute(insert(Spawn.__table__), batch)
+        db.session.commit()
+        existing += len(batch)
+    return mob_ids, biome_ids
+
+def print_table(headers: list, rows: list):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for line in [headers, ["-" * width for width in widths], *rows]:
+        print("  ".join(str(value).rjust(width) for value, width in zip(line, widths)))
+
+
+#######################################################
+########### SERIALIZATION BENCHMARK (TO_DICT) #########
+#######################################################
+
+
+# Builds transient (unsaved) model instances so that no database I/O is measured.
+def build_serialization_fixtures(count: int):
+    mobs = [Mob(id=index, name=f"Mob {index}", hit_points=index % 200, damage=index % 9, speed=index % 5,
+                is_hostile=index % 2 == 0, can_spawn_during_daytime=index % 3 == 0) for index in range(count)]
+    biomes = [Biome(id=index, name=f"Biome {index}", elevation="base", rarity="common",
+                    is_in_overworld=True, is_in_nether=False, is_in_end=False) for index in range(count)]
+    spawns = [Spawn(id=index, mob=mobs[index], biome=biomes[(index * 7) % count], hour_spawned=index % 24)
+              for index in range(count)]
+    players = [Player(id=index, username=f"player_{index}", password="not-a-real-hash", kills=index,
+                      deaths=index % 10, experience=index * 3, created_at=datetime(2023, 9, 11)) for index in range(count)]
+    return {Mob: mobs, Biome: biomes, Spawn: spawns, Player: players}
+
+# Rule sets mirror what the routes in `app.py` ask for.
+SERIALIZATION_CASES = [
+    (Mob, {}),
+    (Mob, {"rules": ("-spawns",)}),
+    (Biome, {}),
+    (Biome, {"rules": ("-spawns",)}),
+    (Spawn, {"rules": ("-mob",)}),
+    (Spawn, {"rules": ("-biome",)}),
+    (Player, {"only": ("id", "kills", "deaths", "experience", "username", "created_at")}),
+]
+
+# NOTE: Parity with `to_dict()` is checked by `testing/serializers_test.py`; this only measures speed.
+def benchmark_serializers(count: int):
+    fixtures = build_serialization_fixtures(count)
+    results = []
+    for model, options in SERIALIZATION_CASES:
+        rows = fixtures[model]
+        baseline = measure_rows_per_second(lambda row: row.to_dict(**options), rows)
+        compiled = measure_rows_per_second(lambda row: serialize(row, **options), rows)
+        results.append([model.__name__, str(options), f"{baseline:,.0f}", f"{compiled:,.0f}", f"{compiled / baseline:.1f}x"])
+    print_table(["Model", "Options", "to_dict rows/s", "compiled rows/s", "Speedup"], results)
+
+
+#######################################################
+######### SPAWN INGESTION BENCHMARK (ONE VS MANY) #####
+#######################################################
+
+
+def benchmark_spawn_ingestion(count: int):
+    client = prepare_client()
+    mob_ids = [identifier for (identifier,) in db.session.query(Mob.id).all()]
+    biome_ids = [identifier for (identifier,) in db.session.query(Biome.id).all()]
+    spawns = [{"mob_id": random.choice(mob_ids), "biome_id": random.choice(biome_ids), "hour_spawned": random.randrange(24)}
+              for _ in range(count)]
+
+    started_at = time.perf_counter()
+    for spawn in spawns:
+        response = client.post(f"/api/mobs/{spawn['mob_id']}/spawns", json=spawn)
+        assert response.status_code == 201, response.get_data(as_text=True)
+    single_duration = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    response = client.post("/api/spawns/batch", json=spawns)
+    assert response.status_code == 201, response.get_data(as_text=True)
+    batch_duration = time.perf_counter() - started_at
+
+    print_table(["Route", "Spawns", "Seconds", "Spawns/s"], [
+        ["POST /api/mobs/<id>/spawns", count, f"{single_duration:.3f}", f"{count / single_duration:,.0f}"],
+        ["POST /api/spawns/batch", count, f"{batch_duration:.3f}", f"{count / batch_duration:,.0f}"],
+    ])
+
+# Compares editing and deleting mobs one request at a time with the set-based batch routes.
+def benchmark_batch_edits(count: int):
+    client = prepare_client(mob_count=2 * count)
+    mob_ids = [identifier for (identifier,) in db.session.query(Mob.id).order_by(Mob.id).limit(2 * count).all()]
+    edited_ids, deleted_ids = mob_ids[:count], mob_ids[count:2 * count]
+    results = []
+
+    started_at = time.perf_counter()
+    for mob_id in edited_ids:
+        response = client.patch(f"/api/mobs/{mob_id}", json={"damage": 5})
+        assert response.status_code == 200, response.get_data(as_text=True)
+    results.append(["PATCH /api/mobs/<id>", count, time.perf_counter() - started_at])
+    started_at = time.perf_counter()
+    response = client.patch("/api/mobs/batch", json={"ids": edited_ids, "changes": {"damage": 6}})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    results.append(["PATCH /api/mobs/batch", count, time.perf_counter() - started_at])
+
+    half = count // 2
+    started_at = time.perf_counter()
+    for mob_id in deleted_ids[:half]:
+        response = client.delete(f"/api/mobs/{mob_id}")
+        assert response.status_code == 200, response.get_data(as_text=True)
+    results.append(["DELETE /api/mobs/<id>", half, time.perf_counter() - started_at])
+    started_at = time.perf_counter()
+    response = client.delete("/api/mobs/batch", json={"ids": deleted_ids[half:]})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    results.append(["DELETE /api/mobs/batch", count - half, time.perf_counter() - started_at])
+
+    print_table(["Route", "Mobs", "Seconds", "Mobs/s"],
+                [[route, mobs, f"{seconds:.3f}", f"{mobs / seconds:,.0f}"] for route, mobs, seconds in results])
+
+
+#######################################################
+######## SQL STATEMENTS PER SINGLE-ROW CRUD ROUTE #####
+#######################################################
+
+
+# Counts the SQL statements each single-row route issues for a mob and a biome that each have `spawns` spawns.
+# NOTE: The response cache is disabled so that every GET reaches the database.
+def benchmark_crud_queries(spawns: int):
+    app.config["RESPONSE_CACHE_ENABLED"] = False
+    client = prepare_client(mob_count=spawns, biome_count=spawns)
+    client.get("/api")
+    mob_ids = db.session.scalars(select(Mob.id).order_by(Mob.id).limit(spawns)).all()
+    biome_ids = db.session.scalars(select(Biome.id).order_by(Biome.id).limit(spawns)).all()
+    mob = Mob(name="Query Mob", hit_points=10, damage=1, speed=1, is_hostile=True, can_spawn_during_daytime=False)
+    biome = Biome(name="Query Biome", elevation="base", rarity="common", is_in_overworld=True, is_in_nether=False, is_in_end=False)
+    db.session.add_all([mob, biome])
+    db.session.flush()
+    db.session.add_all([Spawn(mob_id=mob.id, biome_id=biome_id, hour_spawned=index % 24) for index, biome_id in enumerate(biome_ids)])
+    db.session.add_all([Spawn(mob_id=mob_id, biome_id=biome.id, hour_spawned=index % 24) for index, mob_id in enumerate(mob_ids)])
+    db.session.commit()
+    mob_id, biome_id, missing_id = mob.id, biome.id, 10 ** 9
+
+    routes = [
+        ("GET", f"/api/mobs/{mob_id}", None),
+        ("GET", f"/api/mobs/{missing_id}", None),
+        ("PATCH", f"/api/mobs/{mob_id}", {"damage": 2}),
+        ("PATCH", f"/api/mobs/{missing_id}", {"damage": 2}),
+        ("POST", f"/api/mobs/{mob_id}/spawns", {"biome_id": biome_id, "hour_spawned": 3}),
+        ("POST", f"/api/mobs/{missing_id}/spawns", {"biome_id": biome_id, "hour_spawned": 3}),
+        ("GET", f"/api/biomes/{biome_id}", None),
+        ("PATCH", f"/api/biomes/{biome_id}", {"rarity": "rare"}),
+        ("POST", f"/api/biomes/{biome_id}/spawns", {"mob_id": mob_id, "hours_spawned": 4}),
+        ("POST", "/api/mobs", {"name": "New Mob", "hit_points": 1, "damage": 1, "speed": 1, "is_hostile": True, "can_spawn_during_daytime": True}),
+        ("DELETE", f"/api/mobs/{mob_id}", None),
+        ("DELETE", f"/api/mobs/{missing_id}", None),
+        ("DELETE", f"/api/biomes/{biome_id}", None),
+    ]
+    rows = []
+    for method, path, body in routes:
+        # NOTE: Requests share this app context's session; a fresh one keeps earlier rows out of its identity map.
+        db.session.remove()
+        with count_queries() as queries:
+            started_at = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            milliseconds = (time.perf_counter() - started_at) * 1000
+        rows.append([f"{method} {path.replace(str(missing_id), '<missing>')}", response.status_code, queries.count, f"{milliseconds:.2f}"])
+    print_table(["Route", "Status", "Queries", "Milliseconds"], rows)
+
+
+#######################################################
+######### IN-MEMORY REFERENCE REPLICA BENCHMARK #######
+#######################################################
+
+
+# Bytes allocated while building a table's records, compared with loading the same rows as ORM objects.
+def measure_allocated_bytes(function):
+    tracemalloc.start()
+    try:
+        kept = function()
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return allocated
+
+def benchmark_reference_replica(mobs: int, biomes: int, spawns: int):
+    app.config["RESPONSE_CACHE_ENABLED"] = False
+    client = prepare_client(mob_count=mobs, biome_count=biomes)
+    populate_spawns(spawns)
+    mob_id = db.session.scalars(select(Spawn.mob_id).where(Spawn.mob_id.is_not(None)).limit(1)).first()
+    biome_id = db.session.scalars(select(Spawn.biome_id).where(Spawn.biome_id.is_not(None)).limit(1)).first()
+    mob_name = db.session.scalar(select(Mob.name).where(Mob.id == mob_id))
+    db.session.remove()
+
+    print("Startup load:")
+    reference_replica.clear()
+    rows = []
+    for model in REPLICATED_RECORDS:
+        reference_replica.clear()
+        record_bytes = measure_allocated_bytes(lambda: reference_replica.table(model))
+        table = reference_replica.table(model)
+        orm_bytes = measure_allocated_bytes(lambda: db.session.scalars(select(model)).all())
+        db.session.remove()
+        rows.append([model.__tablename__, f"{len(table.records):,}", f"{table.load_seconds * 1000:.1f}",
+                     f"{table.memory_bytes() / 1024:,.0f}", f"{record_bytes / 1024:,.0f}", f"{orm_bytes / 1024:,.0f}"])
+    print_table(["Table", "Rows", "Load ms", "Records KiB", "Allocated KiB", "ORM objects KiB"], rows)
+
+    # NOTE: Each entry is timed as a whole. The last one shows the read right after a write, which uses SQL
+    #       while the table is rebuilt in the background. Statements are counted once that rebuild is done.
+    patch_mob = ("PATCH", f"/api/mobs/{mob_id}", {"damage": 2})
+    routes = [
+        [("GET", "/api/mobs", None)],
+        [("GET", "/api/mobs?limit=50&after=100", None)],
+        [("GET", f"/api/mobs?name={mob_name}", None)],
+        [("GET", f"/api/mobs/{mob_id}", None)],
+        [("GET", "/api/biomes", None)],
+        [("GET", f"/api/biomes/{biome_id}", None)],
+        [patch_mob],
+        [patch_mob, ("GET", f"/api/mobs/{mob_id}", None)],
+    ]
+    results = {}
+    for enabled in (False, True):
+        app.config["REFERENCE_REPLICA_ENABLED"] = enabled
+        reference_replica.clear()
+        for index, requests in enumerate(routes):
+
+            def request_route():
+                for method, path, body in requests:
+                    client.open(path, method=method, json=body)
+                    db.session.remove()
+
+            request_route()
+            reference_replica.wait_for_refresh()
+            with count_queries() as queries:
+                request_route()
+                reference_replica.wait_for_refresh()
+            results[(enabled, index)] = (queries.count, measure_median_milliseconds(request_route))
+    print(f"\nRoutes ({mobs:,} mobs, {biomes:,} biomes, {spawns:,} spawns):")
+    rows = []
+    for index, requests in enumerate(routes):
+        (sql_queries, sql_milliseconds), (replica_queries, replica_milliseconds) = results[(False, index)], results[(True, index)]
+        label = " + ".join(f"{method} {path}" for method, path, _ in requests)
+        rows.append([label, sql_queries, f"{sql_milliseconds:.2f}", replica_queries, f"{replica_milliseconds:.2f}"])
+    print_table(["Route", "SQL queries", "SQL ms", "Replica queries", "Replica ms"], rows)
+
+
+#######################################################
+######### VECTORIZED SPAWN SIMULATION THROUGHPUT ######
+#######################################################
+
+
+# Evaluates candidates one at a time in Python, as a baseline for the vectorized engine.
+def simulate_spawns_in_python(world, biome_count: int, mob_count: int, ticks: int, seed: int = 0):
+    generator = random.Random(seed)
+    spawns = 0
+    for tick in range(ticks):
+        hour = tick % 24
+        is_daytime = DAYTIME_HOURS[0] <= hour < DAYTIME_HOURS[1]
+        for biome in range(biome_count):
+            for mob in range(mob_count):
+                if not world.biome_dimensions[biome] & world.mob_dimensions[mob]:
+                    continue
+                if is_daytime and not world.mob_spawns_by_day[mob]:
+                    continue
+                chance = app.config["SIMULATION_BASE_CHANCE"] * world.biome_weights[biome] * world.mob_activity[mob, hour]
+                spawns += generator.random() < chance
+    return spawns
+
+def benchmark_spawn_simulation(mobs: int, biomes: int, spawns: int, ticks: int):
+    prepare_client(mob_count=mobs, biome_count=biomes)
+    populate_spawns(spawns)
+    started_at = time.perf_counter()
+    world = load_spawn_world()
+    print(f"Loaded {len(world.mob_ids):,} mobs and {len(world.biome_ids):,} biomes from {spawns:,} spawns in {time.perf_counter() - started_at:.2f}s.\n")
+
+    rows = []
+    sample_biomes, sample_mobs = min(50, len(world.biome_ids)), min(50, len(world.mob_ids))
+    started_at = time.perf_counter()
+    simulate_spawns_in_python(world, sample_biomes, sample_mobs, 24)
+    seconds = time.perf_counter() - started_at
+    rows.append(["Python loop", f"{sample_biomes} x {sample_mobs} x 24", sample_biomes * sample_mobs * 24, seconds])
+    # NOTE: The one-biome, one-mob world shows the per-tick overhead that large worlds hide.
+    for biome_count, mob_count, tick_count in [(1, 1, 1_000_000), (sample_biomes, sample_mobs, 24),
+                                               (min(1000, biomes), min(1000, mobs), 24),
+                                               (len(world.biome_ids), len(world.mob_ids), ticks)]:
+        simulation = simulate_spawns(world, to_tick=tick_count, biome_ids=world.biome_ids[:biome_count], mob_ids=world.mob_ids[:mob_count])
+        rows.append(["NumPy", f"{biome_count} x {mob_count} x {tick_count}", simulation.candidates, simulation.seconds])
+    print_table(["Engine", "Biomes x Mobs x Ticks", "Candidates", "Seconds", "Candidates/s"],
+                [[engine, world_size, f"{candidates:,}", f"{seconds:.3f}", f"{candidates / seconds:,.0f}"]
+                 for engine, world_size, candidates, seconds in rows])
+
+
+#######################################################
+######## INDEXED SPAWN QUERY BENCHMARK (EXPLAIN) ######
+#######################################################
+
+
+# NOTE: The SQLite driver caches statements by their text (including their EXPLAIN output),
+#       so a distinct trailing comment per `label` keeps plans fresh after indexes change.
+def explain_query_plan(query, label: str):
+    compiled = query.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+    return [row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled} -- {label}"))]
+
+def benchmark_spawn_queries(count: int):
+    mob_ids, biome_ids = populate_spawns(count)
+    # NOTE: Queries mirror `GET /api/spawns` with the default page size.
+    cases = {
+        "by biome": find_spawns(biome_id=biome_ids[0]),
+        "by mob": find_spawns(mob_id=mob_ids[0]),
+        "by biome, 18h-6h": find_spawns(biome_id=biome_ids[0], from_hour=18, to_hour=6),
+        "by mob, 3h-5h": find_spawns(mob_id=mob_ids[0], from_hour=3, to_hour=5),
+        "by hour, 12h": find_spawns(from_hour=12, to_hour=12),
+    }
+    limit = app.config["PAGINATION_DEFAULT_LIMIT"]
+    spawn_indexes = list(Spawn.__table__.indexes)
+    results = []
+    for label in ("with indexes", "without indexes"):
+        if label == "without indexes":
+            for index in spawn_indexes:
+                index.drop(bind=db.session.connection(), checkfirst=True)
+            db.session.commit()
+        print(f"\n>> EXPLAIN QUERY PLAN ({label}, {count:,} spawns)")
+        for name, query in cases.items():
+            for query_label, measured in (("page", query.order_by(Spawn.id).limit(limit)), ("all", query)):
+                plan = explain_query_plan(measured, label)
+                print(f"\t{name} [{query_label}]: {' | '.join(plan)}")
+            page_latency = measure_median_milliseconds(lambda: db.session.scalars(query.order_by(Spawn.id).limit(limit)).all())
+            full_latency = measure_median_milliseconds(lambda: db.session.execute(query.with_only_columns(Spawn.id)).all(), repeat=5)
+            results.append([name, label, f"{page_latency:.2f}", f"{full_latency:.2f}"])
+    for index in spawn_indexes:
+        index.create(bind=db.session.connection(), checkfirst=True)
+    db.session.commit()
+    print()
+    print_table(["Query", "Indexes", f"First page of {limit} (ms)", "All matching IDs (ms)"], results)
+
+
+#######################################################
+######## LOGIN THROUGHPUT BENCHMARK (CONCURRENCY) #####
+#######################################################
+
+
+# Sends bursts of concurrent logins while probing a cheap route, to show that logins no longer starve it.
+def benchmark_logins(concurrency_levels: list, logins: int, rounds: int):
+    prepare_client()
+    credentials.rounds = rounds
+    password = "b3nchm4rk-p4ssw0rd"
+    benchmark_player = Player.query.filter(Player.username == "benchmark_player").first()
+    benchmark_player.password = credentials.hash_password(password)
+    db.session.commit()
+
+    def log_in(_):
+        started_at = time.perf_counter()
+        response = app.test_client().post("/players/login", json={"username": "benchmark_player", "password": password})
+        return response.status_code, time.perf_counter() - started_at
+
+    results = []
+    for concurrency in concurrency_levels:
+        probe_latencies, stop_probing = [], Event()
+
+        def probe():
+            probe_client = app.test_client()
+            while not stop_probing.is_set():
+                started_at = time.perf_counter()
+                probe_client.get("/")
+                probe_latencies.append(time.perf_counter() - started_at)
+                time.sleep(0.005)
+
+        prober = Thread(target=probe)
+        prober.start()
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(log_in, range(logins)))
+        duration = time.perf_counter() - started_at
+        stop_probing.set()
+        prober.join()
+
+        accepted = sorted(seconds for status, seconds in outcomes if status == 200)
+        rejected = sum(1 for status, _ in outcomes if status == 429)
+        probe_latencies.sort()
+        results.append([
+            concurrency, logins, len(accepted), rejected, f"{len(accepted) / duration:.1f}",
+            f"{accepted[len(accepted) // 2] * 1000:.0f}" if accepted else "n/a",
+            f"{accepted[int(len(accepted) * 0.95)] * 1000:.0f}" if accepted else "n/a",
+            f"{probe_latencies[int(len(probe_latencies) * 0.95)] * 1000:.1f}" if probe_latencies else "n/a",
+        ])
+    print(f"bcrypt cost {rounds}; {app.config['CREDENTIAL_WORKERS']} worker(s), queue of {app.config['CREDENTIAL_QUEUE_SIZE']}.")
+    print_table(["Concurrency", "Logins", "200", "429", "Logins/s", "p50 (ms)", "p95 (ms)", "GET / p95 (ms)"], results)
+    print(f"Credential pool totals: {credentials.statistics()}")
+
+
+#######################################################
+###### USERNAME LOOKUP BENCHMARK (LIKE VS INDEXED) ####
+#######################################################
+
+
+# Inserts players (sharing one placeholder hash) until the table holds `count` rows.
+def populate_players(count: int, batch_size: int = 50000):
+    db.create_all()
+    existing = db.session.query(Player.id).count()
+    while existing < count:
+        batch = [{"username": f"lookup_player_{index:07d}", "password": "not-a-real-hash"}
+                 for index in range(existing, min(existing + batch_size, count))]
+        db.session.execute(insert(Player.__table__), batch)
+        db.session.commit()
+        existing += len(batch)
+
+def benchmark_username_lookups(sizes: list):
+    results = []
+    for size in sorted(sizes):
+        populate_players(size)
+        usernames = [username for (username,) in db.session.query(Player.username).order_by(func.random()).limit(25).all()]
+        lookups = iter(usernames * 100)
+        # NOTE: Mirrors the original login query, which wraps the username in leading and trailing wildcards.
+        like_latency = measure_median_milliseconds(
+            lambda: Player.query.filter(Player.username.like(f"%{next(lookups)}%")).first(), repeat=25)
+        exact_latency = measure_median_milliseconds(lambda: find_player_by_username(next(lookups).upper()), repeat=500)
+        results.append([f"{size:,}", f"{like_latency:.3f}", f"{exact_latency:.4f}", f"{like_latency / exact_latency:,.0f}x"])
+    sample = select(Player).where(Player.username.like("%lookup_player_0000001%"))
+    print(">> EXPLAIN QUERY PLAN (LIKE):", " | ".join(explain_query_plan(sample, "like")))
+    sample = select(Player).where(Player.username_normalized == "lookup_player_0000001")
+    print(">> EXPLAIN QUERY PLAN (normalized):", " | ".join(explain_query_plan(sample, "normalized")))
+    print()
+    print_table(["Players", "LIKE '%name%' (ms)", "Normalized lookup (ms)", "Speedup"], results)
+
+
+#######################################################
+######### LEADERBOARD RANKS IN SQL AND IN MEMORY ######
+#######################################################
+
+
+# Inserts players with random stats until the table holds `count` rows.
+def populate_ranked_players(count: int, batch_size: int = 50000):
+    db.create_all()
+    create_leaderboard_indexes()
+    existing = db.session.query(Player.id).count()
+    generator = random.Random(7)
+    while existing < count:
+        batch = [{"username": f"ranked_player_{index:07d}", "password": "not-a-real-hash", "kills": generator.randrange(5000),
+                  "deaths": generator.randrange(1000), "experience": generator.randrange(1000000)}
+                 for index in range(existing, min(existing + batch_size, count))]
+        db.session.execute(insert(Player.__table__), batch)
+        db.session.commit()
+        existing += len(batch)
+
+def benchmark_leaderboard(sizes: list):
+    results = []
+    for size in sorted(sizes):
+        populate_ranked_players(size)
+        player_ids = [identifier for (identifier,) in db.session.query(Player.id).order_by(func.random()).limit(50).all()]
+        app.config["LEADERBOARD_IN_MEMORY_RANKS"] = True
+        # NOTE: Players were inserted with Core statements, which the in-memory ranks never see.
+        player_rankings.clear()
+        player_rankings.boards()
+        load_seconds = player_rankings.load_seconds
+        for board in LEADERBOARD_SCORES:
+            lookups = iter(player_ids * 100)
+            top_latency = measure_median_milliseconds(lambda: top_players(board, 10), repeat=50)
+            app.config["LEADERBOARD_IN_MEMORY_RANKS"] = False
+            sql_latency = measure_median_milliseconds(lambda: player_rank(board, next(lookups)), repeat=25)
+            app.config["LEADERBOARD_IN_MEMORY_RANKS"] = True
+            memory_latency = measure_median_milliseconds(lambda: player_rank(board, next(lookups)), repeat=500)
+            results.append([f"{size:,}", board, f"{top_latency:.3f}", f"{sql_latency:.3f}", f"{memory_latency:.3f}"])
+        # NOTE: One ORM update per commit, each applied to every leaderboard's keys in place.
+        player = db.session.get(Player, player_ids[0])
+        update_latency = measure_median_milliseconds(lambda: (setattr(player, "kills", player.kills + 1), db.session.commit()), repeat=50)
+        print(f"{size:,} players: ranks loaded in {load_seconds:.2f}s; an incremental stat update commits in {update_latency:.3f}ms.")
+        db.session.remove()
+    print()
+    print_table(["Players", "Leaderboard", "Top 10 (ms)", "Rank by SQL COUNT (ms)", "Rank in memory (ms)"], results)
+
+
+#######################################################
+###### SERVING MODE BENCHMARK (WSGI VS ASGI/ASYNC) ####
+#######################################################
+
+
+# NOTE: `{port}` is replaced with a free port for each mode.
+SERVING_MODE_COMMANDS = {
+    "sync (WSGI threads)": ["-m", "flask", "--app", "app", "run", "--with-threads", "--port", "{port}"],
+    f"pre-forked (WSGI, {os.cpu_count()} workers)": ["wsgi.py", "--workers", str(os.cpu_count()), "--bind", "127.0.0.1:{port}"],
+    "async (ASGI)": ["-m", "uvicorn", "asgi:application", "--log-level", "warning", "--port", "{port}"],
+}
+
+# Starts one serving mode in its own process, so that clients and server never share a GIL.
+def start_server(arguments: list, port: int, environment: dict):
+    arguments = [argument.replace("{port}", str(port)) for argument in arguments]
+    server = subprocess.Popen([sys.executable, *arguments], env=environment, cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"Server `{' '.join(arguments)}` did not start on port {port}.")
+
+# Sends GET requests over one keep-alive connection and records each status code and latency.
+# NOTE: A refused or reset connection is recorded as status `0` for the remaining requests.
+async def run_connection(port: int, cookie: str, paths: list, outcomes: list):
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    except OSError:
+        outcomes.extend((0, 0.0) for _ in paths)
+        return
+    try:
+        for position, path in enumerate(paths):
+            started_at = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nCookie: {cookie}\r\n\r\n".encode("latin-1"))
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            await reader.readexactly(int(headers.get("content-length", 0)))
+            outcomes.append((status, time.perf_counter() - started_at))
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+        outcomes.extend((0, 0.0) for _ in paths[position:])
+    finally:
+        writer.close()
+
+async def run_clients(port: int, cookie: str, paths: list, concurrency: int):
+    outcomes = []
+    await asyncio.gather(*[run_connection(port, cookie, paths[index::concurrency], outcomes) for index in range(concurrency)])
+    return outcomes
+
+def benchmark_serving_modes(spawns: int, concurrency_levels: list, requests: int):
+    mob_ids, biome_ids = populate_spawns(spawns)
+    benchmark_player = Player.query.filter(Player.username == "benchmark_player").first()
+    cookie = f"{app.config['SESSION_COOKIE_NAME']}={app.session_interface.get_signing_serializer(app).dumps({'player_id': benchmark_player.id})}"
+
+    generator = random.Random(42)
+    route_mix = [
+        lambda: f"/api/mobs/{generator.choice(mob_ids)}/biomes",
+        lambda: f"/api/biomes/{generator.choice(biome_ids)}",
+        lambda: f"/api/mobs?limit=100&after={generator.choice(mob_ids)}",
+        lambda: f"/api/spawns?mob_id={generator.choice(mob_ids)}&from_hour={generator.randrange(24)}&limit=50",
+    ]
+    paths = [generator.choice(route_mix)() for _ in range(requests)]
+
+    # NOTE: The response cache is disabled so that every request reaches SQLite in both modes.
+    environment = dict(os.environ, DIGDRAFT_DATABASE_URI=app.config["SQLALCHEMY_DATABASE_URI"],
+                       DIGDRAFT_RESPONSE_CACHE_ENABLED="0")
+    results = []
+    for port, (mode, arguments) in enumerate(SERVING_MODE_COMMANDS.items(), start=5601):
+        server = start_server(arguments, port, environment)
+        try:
+            asyncio.run(run_clients(port, cookie, paths[:50], 1))
+            for concurrency in concurrency_levels:
+                started_at = time.perf_counter()
+                outcomes = asyncio.run(run_clients(port, cookie, paths, concurrency))
+                duration = time.perf_counter() - started_at
+                latencies = sorted(seconds for status, seconds in outcomes if status) or [0.0]
+                errors = sum(1 for status, _ in outcomes if status != 200)
+                results.append([mode, concurrency, len(outcomes), errors, f"{len(outcomes) / duration:.0f}",
+                                f"{latencies[len(latencies) // 2] * 1000:.1f}",
+                                f"{latencies[int(len(latencies) * 0.95)] * 1000:.1f}",
+                                f"{latencies[int(len(latencies) * 0.99)] * 1000:.1f}"])
+        finally:
+            server.terminate()
+            server.wait()
+    print(f"{spawns:,} spawns; route mix of mob associations, biome details, and mob and spawn pages.")
+    print_table(["Mode", "Clients", "Requests", "Errors", "Requests/s", "p50 (ms)", "p95 (ms)", "p99 (ms)"], results)
+
+
+#######################################################
+######## COMMAND LINE INTERFACE FOR BENCHMARKS ########
+#######################################################
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the Digdraft API.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    serializer_parser = subparsers.add_parser("serializers", help="Compare `to_dict()` with compiled serializers.")
+    serializer_parser.add_argument("--rows", type=int, default=5000)
+
+    ingestion_parser = subparsers.add_parser("spawn-ingestion", help="Compare single-spawn POSTs with the batch route.")
+    ingestion_parser.add_argument("--spawns", type=int, default=2000)
+
+    batch_edit_parser = subparsers.add_parser("batch-edits", help="Compare per-mob PATCH/DELETE requests with the batch routes.")
+    batch_edit_parser.add_argument("--mobs", type=int, default=500)
+
+    crud_query_parser = subparsers.add_parser("crud-queries", help="Count SQL statements per single-row mob and biome route.")
+    crud_query_parser.add_argument("--spawns", type=int, default=25)
+
+    simulation_parser = subparsers.add_parser("simulation", help="Measure spawn simulation throughput in candidates per second.")
+    simulation_parser.add_argument("--mobs", type=int, default=2000)
+    simulation_parser.add_argument("--biomes", type=int, default=2000)
+    simulation_parser.add_argument("--spawns", type=int, default=200000)
+    simulation_parser.add_argument("--ticks", type=int, default=48)
+
+    replica_parser = subparsers.add_parser("replica", help="Measure the in-memory replica's load time, memory, and read routes.")
+    replica_parser.add_argument("--mobs", type=int, default=5000)
+    replica_parser.add_argument("--biomes", type=int, default=500)
+    replica_parser.add_argument("--spawns", type=int, default=20000)
+
+    spawn_query_parser = subparsers.add_parser("spawn-queries", help="Show query plans and latency for spawn searches.")
+    spawn_query_parser.add_argument("--spawns", type=int, default=1000000)
+
+    login_parser = subparsers.add_parser("logins", help="Measure login throughput and backpressure under concurrency.")
+    login_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    login_parser.add_argument("--logins", type=int, default=64, help="Logins per concurrency level.")
+    login_parser.add_argument("--rounds", type=int, default=app.config["BCRYPT_ROUNDS"])
+
+    lookup_parser = subparsers.add_parser("username-lookup", help="Compare login lookups by LIKE and by normalized username.")
+    lookup_parser.add_argument("--players", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+
+    leaderboard_parser = subparsers.add_parser("leaderboard", help="Compare leaderboard ranks counted in SQL with in-memory ranks.")
+    leaderboard_parser.add_argument("--players", type=int, nargs="+", default=[10000, 100000, 1000000])
+
+    serving_parser = subparsers.add_parser("serving-modes", help="Compare read throughput of `app.run()`, `wsgi.py`, and `asgi.py`.")
+    serving_parser.add_argument("--spawns", type=int, default=20000)
+    serving_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    serving_parser.add_argument("--requests", type=int, default=4000, help="Requests per concurrency level.")
+
+    arguments = parser.parse_args()
+
+    with app.app_context():
+        if arguments.benchmark == "serializers":
+            benchmark_serializers(arguments.rows)
+        elif arguments.benchmark == "spawn-ingestion":
+            benchmark_spawn_ingestion(arguments.spawns)
+        elif arguments.benchmark == "batch-edits":
+            benchmark_batch_edits(arguments.mobs)
+        elif arguments.benchmark == "crud-queries":
+            benchmark_crud_queries(arguments.spawns)
+        elif arguments.benchmark == "simulation":
+            benchmark_spawn_simulation(arguments.mobs, arguments.biomes, arguments.spawns, arguments.ticks)
+        elif arguments.benchmark == "replica":
+            benchmark_reference_replica(arguments.mobs, arguments.biomes, arguments.spawns)
+        elif arguments.benchmark == "spawn-queries":
+            benchmark_spawn_queries(arguments.spawns)
+        elif arguments.benchmark == "logins":
+            benchmark_logins(arguments.concurrency, arguments.logins, arguments.rounds)
+        elif arguments.benchmark == "username-lookup":
+            benchmark_username_lookups(arguments.players)
+        elif arguments.benchmark == "leaderboard":
+            benchmark_leaderboard(arguments.players)
+        elif arguments.benchmark == "serving-modes":
+            benchmark_serving_modes(arguments.spawns, arguments.concurrency, arguments.requests)
@@ -0,0 +1,261 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from flask import request
+
+from sqlalchemy import delete, insert, literal, select, union_all, update
+
+import json
+
+from config import app, db
+
+from models import Mob, Biome, Spawn
+
+
+#######################################################
+######### PARSING BATCH PAYLOADS FROM REQUESTS ########
+#######################################################
+
+
+class BatchPayloadError(Exception):
+    pass
+
+
+# Reads a batch of items from either a JSON array or an NDJSON (one object per line) body.
+def parse_batch_payload():
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        items = []
+        for line_number, line in enumerate(request.get_data(as_text=True).splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                raise BatchPayloadError(f"Line {line_number} is not valid JSON.")
+    else:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list):
+            raise BatchPayloadError("Expected a JSON array (or an NDJSON body) of items.")
+    if not items:
+        raise BatchPayloadError("Batch contains no items.")
+    if len(items) > app.config["BATCH_MAX_ITEMS"]:
+        raise BatchPayloadError(f"Batch contains {len(items)} items. (Maximum: {app.config['BATCH_MAX_ITEMS']}.)")
+    return items
+
+
+# IDs bound per statement. (Older SQLite builds allow only 999 parameters per statement.)
+BATCH_ID_CHUNK_SIZE = 500
+
+def chunked(values: list, size: int = BATCH_ID_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+#######################################################
+############## BULK INGESTION FOR SPAWNS ##############
+#######################################################
+
+
+SPAWN_FIELDS = ("mob_id", "biome_id", "hour_spawned")
+
+def is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def validate_spawn_item(item):
+    if not isinstance(item, dict):
+        return "Item must be an object."
+    missing_fields = [field for field in SPAWN_FIELDS if field not in item]
+    if missing_fields:
+        return f"Missing field(s): {', '.join(missing_fields)}."
+    for field in SPAWN_FIELDS:
+        if not is_integer(item[field]):
+            return f"`{field}` must be an integer."
+    if not 0 <= item["hour_spawned"] <= 23:
+        return "`hour_spawned` must be between 0 and 23."
+    return None
+
+# Looks up which of the referenced mob and biome IDs exist using set-based queries.
+# NOTE: Each query binds at most `BATCH_ID_CHUNK_SIZE` IDs (half mobs, half biomes), so a batch of
+#       any size fits SQLite's parameter limit. Small batches still take a single query.
+def find_existing_references(mob_ids: set, biome_ids: set):
+    existing = {"mob": set(), "biome": set()}
+    mob_chunks = list(chunked(sorted(mob_ids), BATCH_ID_CHUNK_SIZE // 2))
+    biome_chunks = list(chunked(sorted(biome_ids), BATCH_ID_CHUNK_SIZE // 2))
+    for index in range(max(len(mob_chunks), len(biome_chunks))):
+        mob_chunk = mob_chunks[index] if index < len(mob_chunks) else []
+        biome_chunk = biome_chunks[index] if index < len(biome_chunks) else []
+        query = union_all(
+            select(literal("mob").label("kind"), Mob.id).where(Mob.id.in_(mob_chunk)),
+            select(literal("biome").label("kind"), Biome.id).where(Biome.id.in_(biome_chunk))
+        )
+        for kind, identifier in db.session.execute(query):
+            existing[kind].add(identifier)
+    return existing["mob"], existing["biome"]
+
+# Validates and inserts a batch of spawns in a single transaction.
+# NOTE: Returns one status per item (in request order) so that clients can retry failures.
+def ingest_spawns(items: list):
+    statuses, valid_rows, valid_positions = [], [], []
+    for position, item in enumerate(items):
+        error = validate_spawn_item(item)
+        statuses.append({"index": position, "status": "error", "error": error} if error else None)
+
+    candidates = [items[position] for position, status in enumerate(statuses) if status is None]
+    existing_mob_ids, existing_biome_ids = find_existing_references(
+        {item["mob_id"] for item in candidates},
+        {item["biome_id"] for item in candidates}
+    )
+
+    for position, item in enumerate(items):
+        if statuses[position] is not None:
+            continue
+        if item["mob_id"] not in existing_mob_ids:
+            statuses[position] = {"index": position, "status": "error", "error": f"Mob ID `{item['mob_id']}` not found in database."}
+        elif item["biome_id"] not in existing_biome_ids:
+            statuses[position] = {"index": position, "status": "error", "error": f"Biome ID `{item['biome_id']}` not found in database."}
+        else:
+            valid_rows.append({field: item[field] for field in SPAWN_FIELDS})
+            valid_positions.append(position)
+
+    if valid_rows:
+        # NOTE: A list of parameter dictionaries makes SQLAlchemy batch the rows into multi-row
+        #       INSERT statements. SQLite hands out increasing row IDs within a single write
+        #       transaction, so sorting the returned IDs lines them up with the rows' order.
+        #       (Asking SQLAlchemy to sort by parameter order would insert one row at a time.)
+        try:
+            new_ids = sorted(db.session.scalars(insert(Spawn).returning(Spawn.id), valid_rows).all())
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        for position, new_id in zip(valid_positions, new_ids):
+            statuses[position] = {"index": position, "status": "created", "id": new_id}
+
+    return statuses
+
+
+#######################################################
+###### SET-BASED BATCH UPDATES AND DELETES (IDS) ######
+#######################################################
+
+
+"""
+Batch edits name the rows by ID and apply ONE set of changes to all of them:
+
+    PATCH  /api/mobs/batch   {"ids": [1, 2, 3], "changes": {"damage": 4, "speed": 2}}
+    DELETE /api/mobs/batch   {"ids": [1, 2, 3]}
+
+Each becomes a single `UPDATE ... WHERE id IN (...)` (or `DELETE`) per chunk
+of IDs, all in one transaction, rather than a SELECT, a `setattr()` loop,
+and a commit per row. Only whitelisted columns may change, and values are
+checked against each column's type. Affected rows come back from `RETURNING`
+when the database supports it, or from one SELECT otherwise.
+"""
+
+# Columns that batch edits may change, per model.
+BATCH_EDITABLE_COLUMNS = {
+    Mob: ("name", "hit_points", "damage", "speed", "is_hostile", "can_spawn_during_daytime"),
+    Biome: ("name", "elevation", "rarity", "is_in_overworld", "is_in_nether", "is_in_end"),
+}
+
+# Foreign keys that are set to NULL before the rows they reference are deleted.
+# NOTE: This matches `db.session.delete()`, which nullifies the spawns of a deleted mob or biome.
+BATCH_DETACHED_ON_DELETE = {
+    Mob: (Spawn.mob_id,),
+    Biome: (Spawn.biome_id,),
+}
+
+# Reads `{"ids": [...], "changes": {...}}` from the request. (`changes` only when required.)
+def parse_batch_edit(model, require_changes: bool):
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        raise BatchPayloadError("Expected a JSON object with an `ids` array.")
+    ids = payload.get("ids")
+    if not isinstance(ids, list) or not ids:
+        raise BatchPayloadError("`ids` must be a non-empty array of integer IDs.")
+    if not all(is_integer(identifier) for identifier in ids):
+        raise BatchPayloadError("`ids` must contain only integer IDs.")
+    if len(ids) > app.config["BATCH_MAX_ITEMS"]:
+        raise BatchPayloadError(f"Batch contains {len(ids)} IDs. (Maximum: {app.config['BATCH_MAX_ITEMS']}.)")
+    # NOTE: Duplicates are dropped; request order is otherwise kept.
+    ids = list(dict.fromkeys(ids))
+    if not require_changes:
+        return ids, None
+    changes = payload.get("changes")
+    if not isinstance(changes, dict) or not changes:
+        raise BatchPayloadError("`changes` must be a non-empty object of column values.")
+    error = validate_column_changes(model, changes)
+    if error:
+        raise BatchPayloadError(error)
+    return ids, changes
+
+# Returns an error message, or None when every change names an editable column and fits its type.
+def validate_column_changes(model, changes: dict):
+    editable_columns = BATCH_EDITABLE_COLUMNS[model]
+    for name, value in changes.items():
+        if name not in editable_columns:
+            return f"`{name}` cannot be changed. Editable columns: {', '.join(editable_columns)}."
+        column = model.__table__.columns[name]
+        if value is None:
+            continue
+        python_type = column.type.python_type
+        if python_type is bool and not isinstance(value, bool):
+            return f"`{name}` must be a boolean."
+        if python_type is int and not is_integer(value):
+            return f"`{name}` must be an integer."
+        if python_type is str:
+            if not isinstance(value, str):
+                return f"`{name}` must be a string."
+            if column.type.length is not None and len(value) > column.type.length:
+                return f"`{name}` must be at most {column.type.length} characters."
+    return None
+
+# Applies the same changes to every row with one of the given IDs, in one transaction.
+# NOTE: Rows are serialized before the commit, which would otherwise expire them.
+def update_in_batch(model, ids: list, changes: dict, serialize):
+    returning = db.engine.dialect.update_returning
+    rows = []
+    try:
+        for chunk in chunked(ids):
+            statement = update(model).where(model.id.in_(chunk)).values(**changes)
+            if returning:
+                rows.extend(db.session.scalars(statement.returning(model)))
+            else:
+                db.session.execute(statement)
+                rows.extend(db.session.scalars(select(model).where(model.id.in_(chunk))))
+        results = [serialize(row) for row in rows]
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return ordered_batch_results(ids, results)
+
+# Deletes every row with one of the given IDs (after detaching referencing spawns), in one transaction.
+def delete_in_batch(model, ids: list, serialize):
+    returning = db.engine.dialect.delete_returning
+    results = []
+    try:
+        for chunk in chunked(ids):
+            for foreign_key in BATCH_DETACHED_ON_DELETE[model]:
+                db.session.execute(update(foreign_key.class_).where(foreign_key.in_(chunk)).values({foreign_key.key: None}))
+            statement = delete(model).where(model.id.in_(chunk))
+            if returning:
+                chunk_rows = list(db.session.scalars(statement.returning(model)))
+            else:
+                chunk_rows = list(db.session.scalars(select(model).where(model.id.in_(chunk))))
+                db.session.execute(statement)
+            results.extend(serialize(row) for row in chunk_rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return ordered_batch_results(ids, results)
+
+# Orders serialized rows by their position in the request and lists the IDs that matched nothing.
+def ordered_batch_results(ids: list, results: list):
+    results_by_id = {result["id"]: result for result in results}
+    ordered_results = [results_by_id[identifier] for identifier in ids if identifier in results_by_id]
+    missing_ids = [identifier for identifier in ids if identifier not in results_by_id]
+    return ordered_results, missing_ids
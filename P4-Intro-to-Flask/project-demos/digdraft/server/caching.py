@@ -0,0 +1,257 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from flask import make_response, request
+
+from functools import wraps
+from collections import OrderedDict
+from threading import Lock
+import ctypes
+import hashlib
+import inspect
+import multiprocessing
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from config import app
+
+from models import Mob, Biome, Spawn
+
+
+#######################################################
+########### PER-TABLE VERSION COUNTERS ################
+#######################################################
+
+
+"""
+Every cacheable read route declares which tables its payload depends on. Each
+table carries a version counter that is bumped whenever a transaction that
+wrote to it commits. A cached payload is reused only while the versions of all
+of its tables are unchanged, so a `304 Not Modified` (or a cached body) never
+requires a query or a serializer pass.
+
+NOTE: Counters live in this process unless `share_between_processes()` is
+      called before forking workers (as `wsgi.py` does). Other multi-process
+      deployments must disable the cache (`DIGDRAFT_RESPONSE_CACHE_ENABLED=0`),
+      since writes made by other workers would not be seen here.
+"""
+
+# Fixed set of counters in anonymous shared memory, readable and writable by every forked process.
+class SharedVersions:
+    def __init__(self, table_names, initial_versions: dict):
+        self._slots = {table_name: index for index, table_name in enumerate(sorted(table_names))}
+        self._counters = multiprocessing.RawArray(ctypes.c_uint64, len(self._slots))
+        for table_name, index in self._slots.items():
+            self._counters[index] = initial_versions.get(table_name, 0)
+
+    def get(self, table_name: str, default: int = 0):
+        index = self._slots.get(table_name)
+        return default if index is None else self._counters[index]
+
+    def __setitem__(self, table_name: str, version: int):
+        self._counters[self._slots[table_name]] = version
+
+
+class TableVersions:
+    def __init__(self):
+        self._versions = {}
+        self._lock = Lock()
+
+    # Moves the counters into shared memory so that processes forked afterwards see each other's bumps.
+    def share_between_processes(self, table_names):
+        with self._lock:
+            self._versions = SharedVersions(table_names, self._versions)
+            self._lock = multiprocessing.Lock()
+
+    def bump(self, *table_names: str):
+        with self._lock:
+            for table_name in table_names:
+                self._versions[table_name] = self._versions.get(table_name, 0) + 1
+
+    def snapshot(self, table_names: tuple):
+        return tuple(self._versions.get(table_name, 0) for table_name in table_names)
+
+
+table_versions = TableVersions()
+
+VERSIONED_MODELS = (Mob, Biome, Spawn)
+VERSIONED_TABLES = {model.__tablename__ for model in VERSIONED_MODELS}
+
+
+# NOTE: Writes are recorded on the session and only bumped once the transaction commits,
+#       so a concurrent reader never caches pre-commit data under a post-commit version.
+def record_written_table(session, table_name: str):
+    if session is not None:
+        session.info.setdefault("written_tables", set()).add(table_name)
+
+def record_written_row(mapper, connection, target):
+    record_written_table(object_session(target), mapper.local_table.name)
+
+for model in VERSIONED_MODELS:
+    for event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, event_name, record_written_row)
+
+# Bulk statements (e.g. `insert(Spawn)` with many rows, or `Spawn.query.delete()`) bypass mapper events.
+@event.listens_for(Session, "do_orm_execute")
+def record_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        for mapper in orm_execute_state.all_mappers:
+            if mapper.local_table.name in VERSIONED_TABLES:
+                record_written_table(orm_execute_state.session, mapper.local_table.name)
+
+@event.listens_for(Session, "after_commit")
+def bump_written_tables(session):
+    written_tables = session.info.pop("written_tables", None)
+    if written_tables:
+        table_versions.bump(*written_tables)
+
+@event.listens_for(Session, "after_rollback")
+def forget_written_tables(session):
+    session.info.pop("written_tables", None)
+
+
+#######################################################
+############## CACHED RESPONSE STORAGE ################
+#######################################################
+
+
+# Headers that are never replayed from the cache. (Everything else, e.g. `Link`, is kept.)
+UNCACHED_HEADERS = {"content-length", "content-type", "set-cookie", "etag", "cache-control", "x-cache"}
+
+class CachedResponse:
+    __slots__ = ("versions", "etag", "body", "mimetype", "headers")
+
+    def __init__(self, versions: tuple, etag: str, body: bytes, mimetype: str, headers: list):
+        self.versions = versions
+        self.etag = etag
+        self.body = body
+        self.mimetype = mimetype
+        self.headers = headers
+
+
+# Bounded LRU store of serialized payloads keyed by route and query arguments.
+class ResponseCache:
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: tuple, versions: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.versions != versions:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def statistics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+response_cache = ResponseCache(max_entries=app.config["RESPONSE_CACHE_MAX_ENTRIES"])
+
+
+#######################################################
+######## EXPORTABLE CACHING DECORATOR FUNCTION ########
+#######################################################
+
+
+def compute_etag(body: bytes):
+    # NOTE: A strong ETag: identical ETags always mean byte-identical bodies.
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def etag_matches(etag: str):
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def build_response(entry: CachedResponse, cache_status: str):
+    if etag_matches(entry.etag):
+        response_cache.not_modified += 1
+        response = make_response("", 304)
+    else:
+        response = make_response(entry.body, 200)
+        response.mimetype = entry.mimetype
+    for header, value in entry.headers:
+        response.headers[header] = value
+    response.headers["ETag"] = entry.etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.headers["X-Cache"] = cache_status
+    return response
+
+def request_cache_key():
+    return (request.endpoint, tuple(sorted(request.view_args.items())), tuple(sorted(request.args.items(multi=True))))
+
+def store_response(key: tuple, versions: tuple, response):
+    if response.status_code != 200 or response.is_streamed:
+        return response
+    body = response.get_data()
+    headers = [(header, value) for header, value in response.headers if header.lower() not in UNCACHED_HEADERS]
+    entry = CachedResponse(versions, compute_etag(body), body, response.mimetype, headers)
+    response_cache.put(key, entry)
+    return build_response(entry, "MISS")
+
+# Caches a read route's successful responses until any of the given tables is written.
+# NOTE: Apply BELOW `authorization_required` so that players are still authenticated first.
+#       Streamed responses are passed through untouched. Coroutine views (see `asgi.py`) are
+#       cached the same way and share entries with the synchronous view of the same endpoint.
+def cached_response(*models):
+    table_names = tuple(sorted(model.__tablename__ for model in models))
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def decorated_async_cache(*args, **kwargs):
+                if not app.config["RESPONSE_CACHE_ENABLED"]:
+                    return await func(*args, **kwargs)
+                key, versions = request_cache_key(), table_versions.snapshot(table_names)
+                entry = response_cache.get(key, versions)
+                if entry is not None:
+                    return build_response(entry, "HIT")
+                return store_response(key, versions, make_response(await func(*args, **kwargs)))
+            return decorated_async_cache
+
+        @wraps(func)
+        def decorated_cache(*args, **kwargs):
+            if not app.config["RESPONSE_CACHE_ENABLED"]:
+                return func(*args, **kwargs)
+            key = request_cache_key()
+            # NOTE: Versions are read BEFORE the payload is built, so a write that commits
+            #       mid-request leaves this entry stale (and refreshed next time), never wrong.
+            versions = table_versions.snapshot(table_names)
+            entry = response_cache.get(key, versions)
+            if entry is not None:
+                return build_response(entry, "HIT")
+            return store_response(key, versions, make_response(func(*args, **kwargs)))
+        return decorated_cache
+    return decorator
@@ -2,13 +2,16 @@ from flask import Flask
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, event
 
 import os
 from dotenv import load_dotenv
 
+# NOTE: Environment variables are loaded first so that `.env` can override the database location.
+load_dotenv()
+
 app = Flask(__name__)
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///digdraft.db"
+app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DIGDRAFT_DATABASE_URI", "sqlite:///digdraft.db")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 app.json.compact = False
 
@@ -24,6 +27,84 @@ db.init_app(app)
 
 CORS(app)
 
-load_dotenv()
+# Per-connection SQLite settings, applied by a `connect` event as the engine opens each connection.
+# NOTE: Every worker process (see `wsgi.py`) opens its own connections, so each one is tuned the same way.
+#   -> `journal_mode=WAL` lets readers in any process proceed while another process writes.
+#   -> `busy_timeout` makes writers wait (in milliseconds) for a lock instead of failing with "database is locked".
+#   -> `mmap_size` (bytes) reads pages through the OS page cache, which every worker shares.
+#   -> `cache_size` sizes each connection's private page cache. (Negative values are in KiB.)
+app.config["SQLITE_PRAGMAS"] = {
+    "journal_mode": os.getenv("DIGDRAFT_SQLITE_JOURNAL_MODE", "WAL"),
+    "busy_timeout": int(os.getenv("DIGDRAFT_SQLITE_BUSY_TIMEOUT", 5000)),
+    "mmap_size": int(os.getenv("DIGDRAFT_SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    "cache_size": int(os.getenv("DIGDRAFT_SQLITE_CACHE_SIZE", -64 * 1024)),
+}
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma, value in app.config["SQLITE_PRAGMAS"].items():
+        cursor.execute(f"PRAGMA {pragma} = {value}")
+    cursor.close()
+
+with app.app_context():
+    if db.engine.dialect.name == "sqlite":
+        event.listen(db.engine, "connect", apply_sqlite_pragmas)
+
+app.config["SECRET_KEY"] = os.getenv("DIGDRAFT_AUTHENTICATION_TOKEN")
+
+# Bounds for the per-process cache of authenticated players. (See `middleware.py`.)
+app.config["PLAYER_CACHE_MAX_SIZE"] = int(os.getenv("DIGDRAFT_PLAYER_CACHE_MAX_SIZE", 1024))
+app.config["PLAYER_CACHE_TTL"] = float(os.getenv("DIGDRAFT_PLAYER_CACHE_TTL", 60))
+
+# Default strategy for eagerly loading spawn associations. (See `models.py`.)
+app.config["ASSOCIATION_LOADING_STRATEGY"] = os.getenv("DIGDRAFT_ASSOCIATION_LOADING_STRATEGY", "selectin")
+
+# Page sizes and cursor batch sizes for listing routes. (See `pagination.py`.)
+app.config["PAGINATION_DEFAULT_LIMIT"] = int(os.getenv("DIGDRAFT_PAGINATION_DEFAULT_LIMIT", 50))
+app.config["PAGINATION_MAX_LIMIT"] = int(os.getenv("DIGDRAFT_PAGINATION_MAX_LIMIT", 1000))
+app.config["STREAM_BATCH_SIZE"] = int(os.getenv("DIGDRAFT_STREAM_BATCH_SIZE", 500))
+
+# Upper bound on items accepted by batch routes. (See `bulk.py`.)
+app.config["BATCH_MAX_ITEMS"] = int(os.getenv("DIGDRAFT_BATCH_MAX_ITEMS", 50000))
+
+# Spawn simulation tuning and limits. (See `simulation.py`.)
+# NOTE: Candidates are (tick, biome, mob) combinations; each chunk holds about 9 bytes per candidate in memory.
+app.config["SIMULATION_BASE_CHANCE"] = float(os.getenv("DIGDRAFT_SIMULATION_BASE_CHANCE", 0.05))
+app.config["SIMULATION_MAX_CANDIDATES"] = int(os.getenv("DIGDRAFT_SIMULATION_MAX_CANDIDATES", 200_000_000))
+app.config["SIMULATION_CHUNK_CANDIDATES"] = int(os.getenv("DIGDRAFT_SIMULATION_CHUNK_CANDIDATES", 2_000_000))
+
+# In-memory snapshot of the mob and biome tables served by read routes. (See `replica.py`.)
+# NOTE: Tables with more rows than this are left to SQL.
+app.config["REFERENCE_REPLICA_ENABLED"] = os.getenv("DIGDRAFT_REFERENCE_REPLICA_ENABLED", "1") not in ("0", "false", "False")
+app.config["REFERENCE_REPLICA_MAX_ROWS"] = int(os.getenv("DIGDRAFT_REFERENCE_REPLICA_MAX_ROWS", 50000))
+
+# Leaderboard page sizes, and whether ranks come from in-memory order statistics or from SQL counts. (See `leaderboard.py`.)
+app.config["LEADERBOARD_DEFAULT_LIMIT"] = int(os.getenv("DIGDRAFT_LEADERBOARD_DEFAULT_LIMIT", 10))
+app.config["LEADERBOARD_IN_MEMORY_RANKS"] = os.getenv("DIGDRAFT_LEADERBOARD_IN_MEMORY_RANKS", "1") not in ("0", "false", "False")
+
+# Response cache for read routes, validated by per-table version counters. (See `caching.py`.)
+app.config["RESPONSE_CACHE_ENABLED"] = os.getenv("DIGDRAFT_RESPONSE_CACHE_ENABLED", "1") not in ("0", "false", "False")
+app.config["RESPONSE_CACHE_MAX_ENTRIES"] = int(os.getenv("DIGDRAFT_RESPONSE_CACHE_MAX_ENTRIES", 512))
+
+# Request timing histograms, SQL statement counts, and `Server-Timing` headers. (See `instrumentation.py`.)
+# NOTE: Imported here so that every module importing `app` from `config` gets an instrumented application.
+from instrumentation import Instrumentation
+app.config["INSTRUMENTATION_ENABLED"] = os.getenv("DIGDRAFT_INSTRUMENTATION_ENABLED", "1") not in ("0", "false", "False")
+app.config["INSTRUMENTATION_SERVER_TIMING"] = os.getenv("DIGDRAFT_SERVER_TIMING", "1") not in ("0", "false", "False")
+# NOTE: `/metrics` is unauthenticated, so it is only served when `DIGDRAFT_METRICS_PATH` is set.
+app.config["INSTRUMENTATION_METRICS_PATH"] = os.getenv("DIGDRAFT_METRICS_PATH") or None
+instrumentation = Instrumentation(app)
+
+# bcrypt cost factor and bounds for the password hashing worker pool. (See `credentials.py`.)
+# NOTE: Logins that find a hash with a different cost factor rehash the password transparently (unless the pool is full).
+from credentials import CredentialService
+app.config["BCRYPT_ROUNDS"] = int(os.getenv("DIGDRAFT_BCRYPT_ROUNDS", 12))
+app.config["CREDENTIAL_WORKERS"] = int(os.getenv("DIGDRAFT_CREDENTIAL_WORKERS", os.cpu_count() or 1))
+app.config["CREDENTIAL_QUEUE_SIZE"] = int(os.getenv("DIGDRAFT_CREDENTIAL_QUEUE_SIZE", 4 * app.config["CREDENTIAL_WORKERS"]))
+app.config["CREDENTIAL_TIMEOUT"] = float(os.getenv("DIGDRAFT_CREDENTIAL_TIMEOUT", 30))
+credentials = CredentialService(app)
 
-app.config["SECRET_KEY"] = os.getenv("DIGDRAFT_AUTHENTICATION_TOKEN")
\ No newline at end of file
+# Async engine for the ASGI entry point's read routes. (See `asgi.py`.)
+# NOTE: Left unset, the URI is derived from `SQLALCHEMY_DATABASE_URI` with the `aiosqlite` driver.
+app.config["ASYNC_DATABASE_URI"] = os.getenv("DIGDRAFT_ASYNC_DATABASE_URI")
+app.config["ASYNC_POOL_SIZE"] = int(os.getenv("DIGDRAFT_ASYNC_POOL_SIZE", 8))
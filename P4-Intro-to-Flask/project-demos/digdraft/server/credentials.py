@@ -0,0 +1,170 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from flask import jsonify, make_response
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from threading import BoundedSemaphore, Lock
+import bcrypt
+import os
+
+
+"""
+A self-contained Flask extension for hashing and verifying passwords.
+
+    from credentials import CredentialService
+    credentials = CredentialService(app)
+
+    hashed = credentials.hash_password("hunter2")
+    is_valid, upgraded_hash = credentials.verify_password("hunter2", hashed)
+
+bcrypt is deliberately slow (hundreds of milliseconds per call at the default
+cost). Calling it inline lets a burst of logins occupy every server thread.
+This service instead:
+
+    -> Runs every hash and check on a bounded pool of worker threads. (bcrypt
+       releases the GIL while hashing, so threads run in parallel.)
+    -> Admits at most `workers + queue size` operations at once. Beyond that it
+       raises `CredentialServiceBusy`, which the extension turns into a
+       `429 Too Many Requests` response with a `Retry-After` header.
+    -> Waits at most `CREDENTIAL_TIMEOUT` seconds for an admitted operation,
+       so a request thread is never parked behind a stalled pool. (The wait
+       itself releases the GIL; the slot is freed when the work finishes.)
+    -> Hashes with a configurable cost factor, and reports an upgraded hash
+       from `verify_password()` whenever a stored hash used a different cost,
+       so that passwords are transparently rehashed on the next login. The
+       rehash is skipped (and retried on a later login) while the pool is
+       saturated, so a verified password is never answered with a `429`.
+    -> Counts completed, rejected, timed-out, and rehashed operations in
+       `statistics()`.
+    -> Verifies unknown users against a dummy hash, so a missing account takes
+       as long to reject as a wrong password.
+
+Configuration (all optional; defaults are set by `init_app`):
+
+    BCRYPT_ROUNDS                 Cost factor for new hashes. (Default: 12.)
+    CREDENTIAL_WORKERS            Worker threads. (Default: one per CPU.)
+    CREDENTIAL_QUEUE_SIZE         Extra operations allowed to wait. (Default: 4 per worker.)
+    CREDENTIAL_RETRY_AFTER        Seconds suggested in `Retry-After`. (Default: 1.)
+    CREDENTIAL_TIMEOUT            Seconds to wait for an admitted operation. (Default: 30.)
+"""
+
+
+class CredentialServiceBusy(Exception):
+    pass
+
+
+def parse_cost_factor(hashed_password: str):
+    # NOTE: bcrypt hashes look like `$2b$12$<salt and digest>`, where `12` is the cost factor.
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+#######################################################
+############## EXPORTABLE FLASK EXTENSION #############
+#######################################################
+
+
+class CredentialService:
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.retry_after = 1
+        self.timeout = 30
+        self._executor = None
+        self._slots = None
+        self._dummy_hash = None
+        self._statistics_lock = Lock()
+        self._statistics = {"completed": 0, "rejected": 0, "timed_out": 0, "rehashed": 0, "rehash_skipped": 0, "in_flight": 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("BCRYPT_ROUNDS", 12)
+        app.config.setdefault("CREDENTIAL_WORKERS", os.cpu_count() or 1)
+        app.config.setdefault("CREDENTIAL_QUEUE_SIZE", 4 * app.config["CREDENTIAL_WORKERS"])
+        app.config.setdefault("CREDENTIAL_RETRY_AFTER", 1)
+        app.config.setdefault("CREDENTIAL_TIMEOUT", 30)
+
+        self.rounds = app.config["BCRYPT_ROUNDS"]
+        self.retry_after = app.config["CREDENTIAL_RETRY_AFTER"]
+        self.timeout = app.config["CREDENTIAL_TIMEOUT"]
+        workers = app.config["CREDENTIAL_WORKERS"]
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="credentials")
+        self._slots = BoundedSemaphore(workers + app.config["CREDENTIAL_QUEUE_SIZE"])
+
+        app.extensions["credentials"] = self
+        app.register_error_handler(CredentialServiceBusy, self.busy_response)
+
+    def busy_response(self, error):
+        response = make_response(jsonify({"error": str(error)}), 429)
+        response.headers["Retry-After"] = str(self.retry_after)
+        return response
+
+    def _count(self, key: str, amount: int = 1):
+        with self._statistics_lock:
+            self._statistics[key] += amount
+
+    def _finish(self, future):
+        self._count("in_flight", -1)
+        self._count("completed")
+        self._slots.release()
+
+    # Queues a bcrypt call on the pool, or fails fast when the pool is saturated.
+    # NOTE: The slot is released when the call finishes, even if its caller stopped waiting.
+    def _submit(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise CredentialServiceBusy("Too many sign-ups or logins in progress. Try again shortly.")
+        self._count("in_flight")
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._count("in_flight", -1)
+            self._slots.release()
+            raise
+        future.add_done_callback(self._finish)
+        return future
+
+    # Waits (up to `timeout` seconds) for a queued bcrypt call.
+    def _run(self, function, *args):
+        future = self._submit(function, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._count("timed_out")
+            raise CredentialServiceBusy("Password hashing is taking too long. Try again shortly.") from None
+
+    def hash_password(self, password: str):
+        hashed = self._run(bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt(rounds=self.rounds))
+        return hashed.decode("utf-8")
+
+    def needs_rehash(self, hashed_password: str):
+        return parse_cost_factor(hashed_password) != self.rounds
+
+    # Returns `(is_valid, upgraded_hash)`. `upgraded_hash` is None unless the stored hash should be replaced.
+    # NOTE: Pass `hashed_password=None` for unknown users; a dummy hash is still checked to keep timing uniform.
+    def verify_password(self, password: str, hashed_password: str = None):
+        if hashed_password is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = self.hash_password("not-a-real-password")
+            self._run(bcrypt.checkpw, password.encode("utf-8"), self._dummy_hash.encode("utf-8"))
+            return False, None
+        is_valid = self._run(bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8"))
+        if is_valid and self.needs_rehash(hashed_password):
+            # NOTE: The password is already verified, so a saturated pool defers the rehash instead of failing the login.
+            try:
+                upgraded_hash = self.hash_password(password)
+            except CredentialServiceBusy:
+                self._count("rehash_skipped")
+                return True, None
+            self._count("rehashed")
+            return True, upgraded_hash
+        return is_valid, None
+
+    def statistics(self):
+        with self._statistics_lock:
+            return dict(self._statistics, rounds=self.rounds)
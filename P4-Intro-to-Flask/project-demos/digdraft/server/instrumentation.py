@@ -0,0 +1,294 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from flask import Response, current_app, g, request
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+import math
+import time
+
+
+"""
+A self-contained Flask extension that shows where time goes inside a request.
+
+    from instrumentation import Instrumentation
+    Instrumentation(app)
+
+It needs nothing but Flask and SQLAlchemy. This is the only copy: the 6A,
+SP1A, and authentication apps put this directory on `sys.path` and attach
+it to their `app` unchanged. Once attached it:
+
+    -> Records a latency histogram per endpoint, method, and status code.
+    -> Counts and times every SQL statement a request runs (through the
+       `before_cursor_execute`/`after_cursor_execute` engine events).
+    -> Times `SerializerMixin.to_dict()`, the JSON encoder, and any function
+       wrapped with `@timed_function("<phase>")`.
+    -> Exposes everything in the Prometheus text format at the configured
+       metrics path (if any), and per request in a `Server-Timing` response
+       header, e.g.:
+
+       Server-Timing: total;dur=4.81, db;dur=1.20;desc="3 queries", serialize;dur=0.42, json;dur=0.31
+
+Configuration (all optional; defaults are set by `init_app`):
+
+    INSTRUMENTATION_ENABLED         Turns all recording off when False.
+    INSTRUMENTATION_METRICS_PATH    URL of the metrics route, e.g. `/metrics`. (Default `None`: no route.)
+    INSTRUMENTATION_SERVER_TIMING   Adds the `Server-Timing` header when True.
+    INSTRUMENTATION_SERIALIZER      Times `SerializerMixin.to_dict()` when True.
+
+NOTE: The metrics route is not authenticated and reveals every endpoint's
+      traffic, so it is off unless a path is configured. Serve it only where
+      the scraper (and nobody else) can reach it.
+NOTE: Metrics live in this process. Each worker of a multi-process server
+      reports its own series, so scrape every worker (or sum them).
+NOTE: Streamed bodies are produced after the response headers are sent, so
+      their queries and serialization are not part of these measurements.
+"""
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250, 1000)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+#######################################################
+########## PROMETHEUS HISTOGRAMS AND REGISTRY #########
+#######################################################
+
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_sample_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, label_names: tuple, buckets: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = Lock()
+
+    def observe(self, labels: tuple, value: float):
+        # NOTE: Buckets are inclusive upper bounds (`le`), so a value equal to a bound lands in that bucket.
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items())
+        for labels, (counts, total, count) in series:
+            label_text = ",".join(f'{name}="{escape_label_value(value)}"' for name, value in zip(self.label_names, labels))
+            bucket_prefix = label_text + "," if label_text else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{bucket_prefix}le="{format_sample_value(bound)}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {format_sample_value(total)}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, latency_buckets: tuple = DEFAULT_LATENCY_BUCKETS, query_count_buckets: tuple = DEFAULT_QUERY_COUNT_BUCKETS):
+        self.request_duration = Histogram(
+            "flask_request_duration_seconds", "Time spent handling a request (excluding streamed bodies).",
+            ("endpoint", "method", "status"), latency_buckets)
+        self.request_queries = Histogram(
+            "flask_request_sql_queries", "Number of SQL statements executed per request.",
+            ("endpoint", "method"), query_count_buckets)
+        self.request_query_duration = Histogram(
+            "flask_request_sql_duration_seconds", "Time spent executing SQL statements per request.",
+            ("endpoint", "method"), latency_buckets)
+        self.request_phase_duration = Histogram(
+            "flask_request_phase_duration_seconds", "Time spent per request in instrumented phases (auth, serialize, json, ...).",
+            ("endpoint", "phase"), latency_buckets)
+
+    def histograms(self):
+        return (self.request_duration, self.request_queries, self.request_query_duration, self.request_phase_duration)
+
+    def render(self):
+        lines = []
+        for histogram in self.histograms():
+            lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+
+#######################################################
+########### PER-REQUEST TIMING ACCUMULATORS ###########
+#######################################################
+
+
+class RequestTimings:
+    __slots__ = ("started_at", "query_count", "query_seconds", "phases", "active_phases")
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.phases = {}
+        self.active_phases = set()
+
+    def add_phase(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+# NOTE: A context variable (rather than `flask.g`) keeps lookups cheap enough for per-row hot paths.
+_current_timings = ContextVar("request_timings", default=None)
+
+def current_timings():
+    return _current_timings.get()
+
+
+# Times a block of code as a named phase of the current request. (No-op outside a request.)
+@contextmanager
+def timed_phase(phase: str):
+    timings = _current_timings.get()
+    if timings is None or phase in timings.active_phases:
+        yield
+        return
+    timings.active_phases.add(phase)
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_phase(phase, time.perf_counter() - started_at)
+        timings.active_phases.discard(phase)
+
+# Decorator form of `timed_phase()`.
+# NOTE: Nested calls within the same phase (e.g. a serializer that recurses) are only counted once.
+def timed_function(phase: str):
+    def decorator(func):
+        @wraps(func)
+        def timed(*args, **kwargs):
+            timings = _current_timings.get()
+            if timings is None or phase in timings.active_phases:
+                return func(*args, **kwargs)
+            timings.active_phases.add(phase)
+            started_at = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.add_phase(phase, time.perf_counter() - started_at)
+                timings.active_phases.discard(phase)
+        timed.__instrumented_phase__ = phase
+        return timed
+    return decorator
+
+
+#######################################################
+############ SQL STATEMENT TIMING (ENGINES) ###########
+#######################################################
+
+
+# NOTE: Listening on the `Engine` class covers every engine in the process, including ones
+#       Flask-SQLAlchemy creates lazily, so attaching the extension never needs a database handle.
+@event.listens_for(Engine, "before_cursor_execute")
+def start_statement_timer(connection, cursor, statement, parameters, context, executemany):
+    if _current_timings.get() is not None:
+        connection.info.setdefault("statement_started_at", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def stop_statement_timer(connection, cursor, statement, parameters, context, executemany):
+    timings = _current_timings.get()
+    started_at_stack = connection.info.get("statement_started_at")
+    if timings is None or not started_at_stack:
+        return
+    timings.query_count += 1
+    timings.query_seconds += time.perf_counter() - started_at_stack.pop()
+
+
+#######################################################
+############## EXPORTABLE FLASK EXTENSION #############
+#######################################################
+
+
+def instrument_serializer_mixin():
+    try:
+        from sqlalchemy_serializer import SerializerMixin
+    except ImportError:
+        return
+    if not hasattr(SerializerMixin.to_dict, "__instrumented_phase__"):
+        SerializerMixin.to_dict = timed_function("serialize")(SerializerMixin.to_dict)
+
+
+class Instrumentation:
+    def __init__(self, app=None):
+        self.metrics = MetricsRegistry()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("INSTRUMENTATION_ENABLED", True)
+        app.config.setdefault("INSTRUMENTATION_METRICS_PATH", None)
+        app.config.setdefault("INSTRUMENTATION_SERVER_TIMING", True)
+        app.config.setdefault("INSTRUMENTATION_SERIALIZER", True)
+        app.extensions["instrumentation"] = self
+
+        if app.config["INSTRUMENTATION_SERIALIZER"]:
+            instrument_serializer_mixin()
+        if not hasattr(app.json.dumps, "__instrumented_phase__"):
+            app.json.dumps = timed_function("json")(app.json.dumps)
+
+        app.before_request(self.start_request)
+        app.after_request(self.finish_request)
+        app.teardown_request(self.reset_request)
+
+        metrics_path = app.config["INSTRUMENTATION_METRICS_PATH"]
+        if metrics_path:
+            app.add_url_rule(metrics_path, "instrumentation_metrics", self.metrics_view, methods=["GET"])
+
+    def start_request(self):
+        if request.endpoint == "instrumentation_metrics" or not current_app.config["INSTRUMENTATION_ENABLED"]:
+            return
+        g.instrumentation_token = _current_timings.set(RequestTimings())
+
+    def finish_request(self, response):
+        timings = _current_timings.get()
+        if timings is None:
+            return response
+        total_seconds = time.perf_counter() - timings.started_at
+        endpoint = request.endpoint or "unmatched"
+        method = request.method
+
+        self.metrics.request_duration.observe((endpoint, method, str(response.status_code)), total_seconds)
+        self.metrics.request_queries.observe((endpoint, method), timings.query_count)
+        self.metrics.request_query_duration.observe((endpoint, method), timings.query_seconds)
+        for phase, seconds in timings.phases.items():
+            self.metrics.request_phase_duration.observe((endpoint, phase), seconds)
+
+        if current_app.config["INSTRUMENTATION_SERVER_TIMING"]:
+            entries = [f"total;dur={total_seconds * 1000:.2f}",
+                       f'db;dur={timings.query_seconds * 1000:.2f};desc="{timings.query_count} queries"']
+            entries.extend(f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in timings.phases.items())
+            response.headers["Server-Timing"] = ", ".join(entries)
+        return response
+
+    def reset_request(self, error=None):
+        token = g.pop("instrumentation_token", None)
+        if token is not None:
+            _current_timings.reset(token)
+
+    def metrics_view(self):
+        return Response(self.metrics.render(), mimetype=None, content_type=PROMETHEUS_CONTENT_TYPE)
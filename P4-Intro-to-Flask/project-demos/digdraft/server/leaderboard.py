@@ -0,0 +1,355 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from bisect import bisect_left, insort
+from threading import Lock
+import time
+
+from sqlalchemy import event, func, inspect as sql_inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from config import app, db
+
+from models import Player, LEADERBOARD_SCORES, leaderboard_score
+
+from caching import table_versions
+
+
+"""
+Player leaderboards by kills, kill/death ratio, and experience.
+
+    GET /api/leaderboard/kills?limit=10            -> top ten players by kills
+    GET /api/leaderboard/experience/players/42     -> player 42's rank by experience
+
+Players are ranked by score, highest first. Players with equal scores share a
+rank, so a rank is one more than the number of players with a higher score.
+
+    -> Top-N reads walk the leaderboard's index (see `LEADERBOARD_INDEXES` in
+       `models.py`) and stop after N rows.
+    -> Counting the players above a score would still be a range scan over up
+       to every player, so ranks come from an in-memory `RankedKeys` per
+       leaderboard instead. A rank is two binary searches and a Fenwick tree
+       prefix sum: O(log n) at any number of players.
+    -> `RankedKeys` are loaded lazily from the indexes (already in rank order,
+       so nothing is sorted in Python) and then updated incrementally: each
+       committed ORM insert, update, or delete of a player removes the
+       player's old keys and adds the new ones.
+    -> A version counter for player scores is bumped on every such commit.
+       Ranks are reloaded whenever it moves in a way this process did not
+       apply itself (a write by another worker forked by `wsgi.py`, or a bulk
+       statement whose rows are unknown).
+
+NOTE: Like the response cache, other multi-process servers never see writes
+      made by other processes, so they must disable in-memory ranks
+      (`DIGDRAFT_LEADERBOARD_IN_MEMORY_RANKS=0`) and count ranks in SQL.
+NOTE: Statements that bypass the ORM's mappers (Core statements run by
+      `seeding.py`, or raw `text()` SQL) are never seen; restart the server
+      after running them.
+"""
+
+# Version counter (kept alongside the response cache's table versions) for writes that change player scores.
+PLAYER_SCORES_VERSION = "player_table.scores"
+
+# Keys pack a score and a player ID into one integer that sorts in rank order: score descending, then ID.
+# NOTE: One int per player keeps a million-player leaderboard in tens of megabytes, where tuples would take hundreds.
+PLAYER_ID_SPAN = 1 << 40
+
+PLAYER_STATS = ("kills", "deaths", "experience")
+
+
+def rank_key(score: int, player_id: int):
+    return -score * PLAYER_ID_SPAN + player_id
+
+
+#######################################################
+######### ORDER STATISTICS OVER SORTED KEYS ###########
+#######################################################
+
+
+# Sorted integers that answer "how many keys are smaller than this one?" in O(log n).
+# NOTE: Keys live in sorted buckets of up to `2 * bucket_size` entries, and a Fenwick tree over the
+#       bucket lengths counts the keys in every earlier bucket. Adding or removing a key shifts at most
+#       one bucket and updates O(log n) tree nodes; only splitting or dropping a bucket rebuilds the tree.
+class RankedKeys:
+    def __init__(self, sorted_keys: list = (), bucket_size: int = 1000):
+        self.bucket_size = bucket_size
+        self._buckets = [list(sorted_keys[start:start + bucket_size]) for start in range(0, len(sorted_keys), bucket_size)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._length = len(sorted_keys)
+        self._rebuild_counts()
+
+    def __len__(self):
+        return self._length
+
+    def _rebuild_counts(self):
+        self._counts = [0] * (len(self._buckets) + 1)
+        for index, bucket in enumerate(self._buckets, start=1):
+            self._counts[index] += len(bucket)
+            parent = index + (index & -index)
+            if parent < len(self._counts):
+                self._counts[parent] += self._counts[index]
+
+    def _add_count(self, bucket_index: int, delta: int):
+        index = bucket_index + 1
+        while index < len(self._counts):
+            self._counts[index] += delta
+            index += index & -index
+
+    # Number of keys in the buckets before `bucket_index`.
+    def _count_before(self, bucket_index: int):
+        total, index = 0, bucket_index
+        while index > 0:
+            total += self._counts[index]
+            index -= index & -index
+        return total
+
+    def add(self, key: int):
+        if not self._buckets:
+            self._buckets, self._maxes, self._length = [[key]], [key], 1
+            self._rebuild_counts()
+            return
+        bucket_index = min(bisect_left(self._maxes, key), len(self._maxes) - 1)
+        bucket = self._buckets[bucket_index]
+        insort(bucket, key)
+        self._maxes[bucket_index] = bucket[-1]
+        self._length += 1
+        if len(bucket) > 2 * self.bucket_size:
+            half = len(bucket) // 2
+            self._buckets[bucket_index:bucket_index + 1] = [bucket[:half], bucket[half:]]
+            self._maxes[bucket_index:bucket_index + 1] = [bucket[half - 1], bucket[-1]]
+            self._rebuild_counts()
+        else:
+            self._add_count(bucket_index, 1)
+
+    # Raises KeyError if the key is not present.
+    def remove(self, key: int):
+        bucket_index = bisect_left(self._maxes, key)
+        if bucket_index == len(self._maxes):
+            raise KeyError(key)
+        bucket = self._buckets[bucket_index]
+        position = bisect_left(bucket, key)
+        if position == len(bucket) or bucket[position] != key:
+            raise KeyError(key)
+        del bucket[position]
+        self._length -= 1
+        if bucket:
+            self._maxes[bucket_index] = bucket[-1]
+            self._add_count(bucket_index, -1)
+        else:
+            del self._buckets[bucket_index]
+            del self._maxes[bucket_index]
+            self._rebuild_counts()
+
+    # Number of keys smaller than `key`.
+    def rank(self, key: int):
+        bucket_index = bisect_left(self._maxes, key)
+        if bucket_index == len(self._maxes):
+            return self._length
+        return self._count_before(bucket_index) + bisect_left(self._buckets[bucket_index], key)
+
+
+#######################################################
+######## INCREMENTALLY MAINTAINED PLAYER RANKS ########
+#######################################################
+
+
+class PlayerRankings:
+    def __init__(self):
+        self._boards = None
+        self._version = None
+        self.load_seconds = None
+        self._lock = Lock()
+
+    def enabled(self):
+        return app.config["LEADERBOARD_IN_MEMORY_RANKS"]
+
+    # Returns each leaderboard's `RankedKeys`, reloading them if scores changed in a way not applied here.
+    def boards(self):
+        version = table_versions.snapshot((PLAYER_SCORES_VERSION,))[0]
+        boards = self._boards
+        if boards is not None and self._version == version:
+            return boards
+        with self._lock:
+            if self._boards is None or self._version != version:
+                self.reload(version)
+            return self._boards
+
+    def reload(self, version: int):
+        started_at = time.perf_counter()
+        boards = {}
+        # NOTE: Each index yields its scores already in rank order, so the keys need no sorting.
+        with db.engine.connect() as connection:
+            for board, score in LEADERBOARD_SCORES.items():
+                rows = connection.execute(select(score, Player.id).order_by(score.desc(), Player.id))
+                boards[board] = RankedKeys([rank_key(player_score, player_id) for player_score, player_id in rows])
+        self._boards, self._version = boards, version
+        self.load_seconds = time.perf_counter() - started_at
+
+    # Drops every leaderboard's keys, so that the next rank lookup reloads them.
+    def clear(self):
+        with self._lock:
+            self._boards = None
+
+    # Players with a higher score, plus one, and the number of ranked players.
+    def rank(self, board: str, score: int):
+        ranked_keys = self.boards()[board]
+        # NOTE: `apply()` edits keys in place, so lookups take the same lock rather than see a half-moved key.
+        with self._lock:
+            return ranked_keys.rank(rank_key(score, 0)) + 1, len(ranked_keys)
+
+    # Applies one committed transaction's score changes: (player ID, old stats or None, new stats or None).
+    # NOTE: `complete` is False when the transaction also changed players that were not tracked (e.g. by bulk UPDATE).
+    def apply(self, changes: list, complete: bool):
+        with self._lock:
+            table_versions.bump(PLAYER_SCORES_VERSION)
+            version = table_versions.snapshot((PLAYER_SCORES_VERSION,))[0]
+            if self._boards is None:
+                return
+            if not complete or self._version != version - 1:
+                self._boards = None
+                return
+            try:
+                for player_id, old_stats, new_stats in changes:
+                    for board, ranked_keys in self._boards.items():
+                        if old_stats is not None:
+                            ranked_keys.remove(rank_key(leaderboard_score(board, *old_stats), player_id))
+                        if new_stats is not None:
+                            ranked_keys.add(rank_key(leaderboard_score(board, *new_stats), player_id))
+            except KeyError:
+                # NOTE: The keys no longer match the database (e.g. two commits applied out of order); reload them.
+                self._boards = None
+                return
+            self._version = version
+
+
+player_rankings = PlayerRankings()
+
+
+#######################################################
+######## TRACKING SCORE CHANGES FROM THE SESSION ######
+#######################################################
+
+
+# NOTE: Changes are recorded on the session and only applied once the transaction commits.
+def record_score_change(session, player_id, old_stats, new_stats):
+    if session is not None and player_rankings.enabled():
+        session.info.setdefault("player_score_changes", []).append((player_id, old_stats, new_stats))
+
+# The stats a player had before this flush, or None if any of them was never loaded.
+def previous_stats(target):
+    stats = []
+    for attribute in PLAYER_STATS:
+        history = sql_inspect(target).attrs[attribute].history
+        previous = history.deleted or history.unchanged
+        if not previous:
+            return None
+        stats.append(previous[0])
+    return tuple(stats)
+
+def current_stats(target):
+    return tuple(getattr(target, attribute) for attribute in PLAYER_STATS)
+
+@event.listens_for(Player, "after_insert")
+def record_inserted_player(mapper, connection, target):
+    record_score_change(object_session(target), target.id, None, current_stats(target))
+
+@event.listens_for(Player, "after_update")
+def record_updated_player(mapper, connection, target):
+    old_stats = previous_stats(target)
+    if old_stats is None:
+        record_untracked_scores(object_session(target))
+    elif old_stats != current_stats(target):
+        record_score_change(object_session(target), target.id, old_stats, current_stats(target))
+
+@event.listens_for(Player, "after_delete")
+def record_deleted_player(mapper, connection, target):
+    old_stats = previous_stats(target)
+    if old_stats is None:
+        record_untracked_scores(object_session(target))
+    else:
+        record_score_change(object_session(target), target.id, old_stats, None)
+
+def record_untracked_scores(session):
+    if session is not None and player_rankings.enabled():
+        session.info["player_scores_untracked"] = True
+
+# Bulk statements (e.g. `update(Player)` or `insert(Player)` with many rows) bypass mapper events.
+@event.listens_for(Session, "do_orm_execute")
+def record_bulk_player_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        if any(mapper.class_ is Player for mapper in orm_execute_state.all_mappers):
+            record_untracked_scores(orm_execute_state.session)
+
+@event.listens_for(Session, "after_commit")
+def apply_score_changes(session):
+    changes = session.info.pop("player_score_changes", None)
+    untracked = session.info.pop("player_scores_untracked", False)
+    if changes or untracked:
+        player_rankings.apply(changes or [], complete=not untracked)
+
+@event.listens_for(Session, "after_rollback")
+def forget_score_changes(session):
+    session.info.pop("player_score_changes", None)
+    session.info.pop("player_scores_untracked", None)
+
+
+#######################################################
+########### LEADERBOARD QUERIES FOR ROUTES ############
+#######################################################
+
+
+def serialize_ranked_player(board: str, rank: int, player_id: int, username: str, kills: int, deaths: int, experience: int):
+    return {
+        "rank": rank,
+        "id": player_id,
+        "username": username,
+        "score": leaderboard_score(board, kills, deaths, experience),
+        "kills": kills,
+        "deaths": deaths,
+        "experience": experience,
+        "kill_death_ratio": leaderboard_score("kill-death-ratio", kills, deaths, experience) / 1000,
+    }
+
+# The `limit` highest-ranked players on a leaderboard, with their ranks. (One index range scan.)
+def top_players(board: str, limit: int):
+    score = LEADERBOARD_SCORES[board]
+    rows = db.session.execute(
+        select(Player.id, Player.username, Player.kills, Player.deaths, Player.experience, score)
+        .order_by(score.desc(), Player.id)
+        .limit(limit)
+    ).all()
+    ranked_players, rank, previous_score = [], 0, None
+    for position, (player_id, username, kills, deaths, experience, player_score) in enumerate(rows, start=1):
+        # NOTE: The list starts at the top, so a player's rank is their position unless they tie the player above.
+        if player_score != previous_score:
+            rank, previous_score = position, player_score
+        ranked_players.append(serialize_ranked_player(board, rank, player_id, username, kills, deaths, experience))
+    return ranked_players
+
+# A player's rank on a leaderboard and the number of ranked players, or None if the player does not exist.
+def player_rank(board: str, player_id: int):
+    player = db.session.execute(
+        select(Player.id, Player.username, Player.kills, Player.deaths, Player.experience).where(Player.id == player_id)
+    ).first()
+    if player is None:
+        return None
+    _, username, kills, deaths, experience = player
+    player_score = leaderboard_score(board, kills, deaths, experience)
+    if player_rankings.enabled():
+        rank, player_count = player_rankings.rank(board, player_score)
+    else:
+        score = LEADERBOARD_SCORES[board]
+        rank = db.session.scalar(select(func.count()).where(score > player_score)) + 1
+        player_count = db.session.scalar(select(func.count(Player.id)))
+    ranked_player = serialize_ranked_player(board, rank, player_id, username, kills, deaths, experience)
+    ranked_player["players"] = player_count
+    return ranked_player
+
+
+# Loads every leaderboard's ranks ahead of the first rank lookup. (Used at startup.)
+def warm_player_rankings():
+    if player_rankings.enabled():
+        with app.app_context():
+            player_rankings.boards()
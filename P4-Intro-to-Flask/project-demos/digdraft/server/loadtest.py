@@ -0,0 +1,365 @@
+#######################################################
+############# IMPORTS AND INITIALIZATIONS #############
+#######################################################
+
+
+import os
+
+# NOTE: Load tests write to their own scratch database unless told otherwise, so real data is never touched.
+os.environ.setdefault("DIGDRAFT_DATABASE_URI", "sqlite:///digdraft_loadtest.db")
+
+# Get database instance and Flask application connection.
+from config import app, db
+# Register the API's routes on the application. (Imported under an alias so it does not shadow `app`.)
+import app as digdraft_routes
+# Get all physical models and the associator.
+from models import Player, Mob, Biome, Spawn
+# Shared benchmark reporting utilities.
+from benchmarks import print_table
+# Bulk seeding engine.
+from seeding import SeedPlan, seed_database, hash_password
+
+from sqlalchemy import func, insert, select
+from werkzeug.serving import make_server
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.client import HTTPConnection
+from threading import Lock, Thread, local
+from urllib.parse import urlsplit
+import argparse
+import json
+import logging
+import random
+import re
+import subprocess
+import time
+
+
+"""
+Seeds digdraft at scale, drives every route in `app.py` with concurrent HTTP
+clients, and reports latency percentiles, throughput, and SQL statements per
+request. (Statement counts are read from the `Server-Timing` header that
+`instrumentation.py` adds, so they work against any running server.)
+
+USAGE:
+    python loadtest.py --players 5000 --mobs 100000 --biomes 100000 --spawns 2000000
+    python loadtest.py --requests 100 --concurrency 16 --output results.json --baseline previous.json
+
+By default an in-process, threaded development server is started on a free
+port. Pass `--base-url http://127.0.0.1:5555` to load-test a server started
+separately. (It must use the same `DIGDRAFT_DATABASE_URI` as this script.)
+
+NOTE: Client and in-process server threads share one interpreter (and GIL),
+      so absolute numbers are pessimistic. Compare runs against each other.
+"""
+
+LOAD_TEST_USERNAME = "load_test_runner"
+LOAD_TEST_PASSWORD = "l04dt3st1ng"
+
+QUERY_COUNT_PATTERN = re.compile(r'db;dur=[0-9.]+;desc="(\d+) queries"')
+
+
+#######################################################
+############ BULK SEEDING AT CONFIGURABLE SCALE #######
+#######################################################
+
+
+def count_rows(model):
+    return db.session.scalar(select(func.count()).select_from(model))
+
+# Reseeds through the bulk seeding engine unless the tables already hold at least the requested rows.
+# NOTE: Generated players use a low bcrypt cost so that hashing thousands of passwords stays quick.
+def seed_at_scale(players: int, mobs: int, biomes: int, spawns: int, seed: int = 42, reseed: bool = False):
+    db.create_all()
+    requested = {Player: players, Mob: mobs, Biome: biomes, Spawn: spawns}
+    summary = None
+    if reseed or any(count_rows(model) < count for model, count in requested.items()):
+        summary = seed_database(SeedPlan(players=players, mobs=mobs, biomes=biomes, spawns=spawns), seed=seed, rounds=4)
+    if db.session.scalar(select(Player.id).where(Player.username == LOAD_TEST_USERNAME)) is None:
+        db.session.add(Player(username=LOAD_TEST_USERNAME, password=hash_password(LOAD_TEST_PASSWORD, rounds=4)))
+        db.session.commit()
+    counts = {model.__tablename__: count_rows(model) for model in requested}
+    counts["seconds"] = summary["seconds"] if summary else None
+    return counts
+
+
+#######################################################
+######### ROUTE SCENARIOS FOR EVERY API ROUTE #########
+#######################################################
+
+
+# Hands out IDs from a pool to concurrent workers. (Used for routes that consume rows, e.g. DELETE.)
+class IdentifierPool:
+    def __init__(self, identifiers: list):
+        self._identifiers = list(identifiers)
+        self._lock = Lock()
+
+    def take(self):
+        with self._lock:
+            return self._identifiers.pop() if self._identifiers else 0
+
+
+class Scenario:
+    __slots__ = ("name", "method", "build", "requests")
+
+    def __init__(self, name: str, method: str, build, requests: int):
+        self.name = name
+        self.method = method
+        # NOTE: `build(generator)` returns `(path, json_body_or_None)` for one request.
+        self.build = build
+        self.requests = requests
+
+
+# Creates rows that write-heavy scenarios (PATCH, DELETE) may consume without touching the seeded data.
+def create_scratch_rows(model, count: int, template: dict):
+    table = model.__table__
+    rows = [dict(template, name=f"Load Test {model.__name__} {index}") for index in range(count)]
+    return list(db.session.scalars(insert(table).returning(table.c.id), rows))
+
+def build_scenarios(requests: int, heavy_requests: int, auth_requests: int, seed: int = 42):
+    mob_ids = range(db.session.scalar(select(func.min(Mob.id))), db.session.scalar(select(func.max(Mob.id))) + 1)
+    biome_ids = range(db.session.scalar(select(func.min(Biome.id))), db.session.scalar(select(func.max(Biome.id))) + 1)
+    mob_template = {"hit_points": 10, "damage": 1, "speed": 1, "is_hostile": True, "can_spawn_during_daytime": False}
+    biome_template = {"elevation": "base", "rarity": "common", "is_in_overworld": True, "is_in_nether": False, "is_in_end": False}
+    deletable_mobs = IdentifierPool(create_scratch_rows(Mob, requests, mob_template))
+    deletable_biomes = IdentifierPool(create_scratch_rows(Biome, requests, biome_template))
+    editable_mobs = create_scratch_rows(Mob, requests, mob_template)
+    editable_biomes = create_scratch_rows(Biome, requests, biome_template)
+    db.session.commit()
+    run_id = f"{seed}-{int(time.time())}"
+    new_names = iter(range(10 ** 9))
+    names_lock = Lock()
+
+    def unique_suffix():
+        with names_lock:
+            return f"{run_id}-{next(new_names)}"
+
+    def spawn_body(generator, **fixed):
+        return dict({"mob_id": generator.choice(mob_ids), "biome_id": generator.choice(biome_ids),
+                     "hour_spawned": generator.randrange(24)}, **fixed)
+
+    return [
+        Scenario("GET /", "GET", lambda g: ("/", None), requests),
+        Scenario("GET /api", "GET", lambda g: ("/api", None), requests),
+        Scenario("GET /authorize", "GET", lambda g: ("/authorize", None), requests),
+        Scenario("GET /api/mobs", "GET", lambda g: ("/api/mobs", None), heavy_requests),
+        Scenario("GET /api/mobs?limit=50", "GET", lambda g: (f"/api/mobs?limit=50&after={g.choice(mob_ids)}", None), requests),
+        Scenario("GET /api/mobs/<id>", "GET", lambda g: (f"/api/mobs/{g.choice(mob_ids)}", None), requests),
+        Scenario("POST /api/mobs", "POST", lambda g: ("/api/mobs", dict(mob_template, name=f"Mob {unique_suffix()}")), requests),
+        Scenario("PATCH /api/mobs/<id>", "PATCH", lambda g: (f"/api/mobs/{g.choice(editable_mobs)}", {"hit_points": g.randrange(1, 300)}), requests),
+        Scenario("DELETE /api/mobs/<id>", "DELETE", lambda g: (f"/api/mobs/{deletable_mobs.take()}", None), requests),
+        Scenario("GET /api/biomes", "GET", lambda g: ("/api/biomes", None), heavy_requests),
+        Scenario("GET /api/biomes?limit=50", "GET", lambda g: (f"/api/biomes?limit=50&after={g.choice(biome_ids)}", None), requests),
+        Scenario("GET /api/biomes/<id>", "GET", lambda g: (f"/api/biomes/{g.choice(biome_ids)}", None), requests),
+        Scenario("POST /api/biomes", "POST", lambda g: ("/api/biomes", dict(biome_template, name=f"Biome {unique_suffix()}")), requests),
+        Scenario("PATCH /api/biomes/<id>", "PATCH", lambda g: (f"/api/biomes/{g.choice(editable_biomes)}", {"rarity": g.choice(("common", "rare"))}), requests),
+        Scenario("DELETE /api/biomes/<id>", "DELETE", lambda g: (f"/api/biomes/{deletable_biomes.take()}", None), requests),
+        Scenario("POST /api/mobs/<id>/spawns", "POST", lambda g: (lambda body: (f"/api/mobs/{body.pop('mob_id')}/spawns", body))(spawn_body(g)), requests),
+        Scenario("GET /api/mobs/<id>/biomes", "GET", lambda g: (f"/api/mobs/{g.choice(mob_ids)}/biomes", None), requests),
+        # NOTE: This route reads the spawn hour from `hours_spawned` (unlike every other spawn route).
+        Scenario("POST /api/biomes/<id>/spawns", "POST", lambda g: (f"/api/biomes/{g.choice(biome_ids)}/spawns", {"mob_id": g.choice(mob_ids), "hours_spawned": g.randrange(24)}), requests),
+        Scenario("GET /api/biomes/<id>/mobs", "GET", lambda g: (f"/api/biomes/{g.choice(biome_ids)}/mobs", None), requests),
+        Scenario("GET /api/spawns?biome_id=", "GET", lambda g: (f"/api/spawns?biome_id={g.choice(biome_ids)}&limit=50", None), requests),
+        Scenario("GET /api/spawns?dimension=&hours", "GET", lambda g: (f"/api/spawns?dimension={g.choice(('overworld', 'nether', 'end'))}&from_hour={g.randrange(24)}&to_hour={g.randrange(24)}&limit=50", None), requests),
+        Scenario("POST /api/spawns/batch", "POST", lambda g: ("/api/spawns/batch", [spawn_body(g) for _ in range(100)]), requests),
+        Scenario("GET /api/stats/biomes/average-hit-points", "GET", lambda g: ("/api/stats/biomes/average-hit-points", None), heavy_requests),
+        Scenario("GET /api/stats/mobs/hostile-by-dimension", "GET", lambda g: ("/api/stats/mobs/hostile-by-dimension", None), heavy_requests),
+        Scenario("GET /api/stats/spawns/by-hour", "GET", lambda g: (f"/api/stats/spawns/by-hour?biome_id={g.choice(biome_ids)}", None), requests),
+        Scenario("GET /api/stats/spawns/by-biome", "GET", lambda g: ("/api/stats/spawns/by-biome", None), heavy_requests),
+        Scenario("GET /api/simulate?biome_ids=", "GET", lambda g: (f"/api/simulate?biome_ids={','.join(str(g.choice(biome_ids)) for _ in range(10))}&seed={g.randrange(1000)}", None), heavy_requests),
+        Scenario("GET /api/cache/stats", "GET", lambda g: ("/api/cache/stats", None), requests),
+        Scenario("POST /players", "POST", lambda g: ("/players", {"username": f"load_test_{unique_suffix()}", "password": LOAD_TEST_PASSWORD}), auth_requests),
+        Scenario("POST /players/login", "POST", lambda g: ("/players/login", {"username": LOAD_TEST_USERNAME, "password": LOAD_TEST_PASSWORD}), auth_requests),
+        Scenario("DELETE /players/logout", "DELETE", lambda g: ("/players/logout", None), requests),
+    ]
+
+
+#######################################################
+########## CONCURRENT HTTP LOAD DRIVER ################
+#######################################################
+
+
+def start_local_server():
+    # NOTE: Per-request access logs would cost more than many of the routes being measured.
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+class LoadClient:
+    def __init__(self, base_url: str):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.cookie = None
+        self._local = local()
+
+    def connection(self):
+        if getattr(self._local, "connection", None) is None:
+            self._local.connection = HTTPConnection(self.host, self.port, timeout=300)
+        return self._local.connection
+
+    # Sends one request and returns `(status, seconds, statement_count, headers)`.
+    def send(self, method: str, path: str, body=None):
+        headers = {"Cookie": self.cookie} if self.cookie else {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        started_at = time.perf_counter()
+        try:
+            connection = self.connection()
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (ConnectionError, OSError):
+            # NOTE: Servers without keep-alive close the socket; retry once on a fresh connection.
+            self._local.connection = None
+            connection = self.connection()
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        seconds = time.perf_counter() - started_at
+        if response.getheader("Connection", "").lower() == "close" or response.version == 10:
+            connection.close()
+            self._local.connection = None
+        match = QUERY_COUNT_PATTERN.search(response.getheader("Server-Timing") or "")
+        return response.status, seconds, int(match.group(1)) if match else None, response.getheaders()
+
+    def log_in(self):
+        status, _, _, headers = self.send("POST", "/players/login", {"username": LOAD_TEST_USERNAME, "password": LOAD_TEST_PASSWORD})
+        if status != 200:
+            raise RuntimeError(f"Could not log in as `{LOAD_TEST_USERNAME}` (status {status}).")
+        self.cookie = "; ".join(value.split(";", 1)[0] for name, value in headers if name.lower() == "set-cookie")
+
+
+# Nearest-rank percentile of an already sorted list.
+def percentile(sorted_values: list, fraction: float):
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def run_scenario(client: LoadClient, scenario: Scenario, concurrency: int, seed: int):
+    generator_lock = Lock()
+    generator = random.Random(seed)
+
+    def send_one(_):
+        with generator_lock:
+            path, body = scenario.build(generator)
+        # NOTE: Sessions live in signed cookies, so logging out never invalidates the shared cookie.
+        return client.send(scenario.method, path, body)
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(send_one, range(scenario.requests)))
+    wall_seconds = time.perf_counter() - started_at
+
+    latencies = sorted(seconds * 1000 for _, seconds, _, _ in outcomes)
+    statement_counts = [count for _, _, count, _ in outcomes if count is not None]
+    status_codes = {}
+    for status, _, _, _ in outcomes:
+        status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+    return {
+        "route": scenario.name,
+        "requests": len(outcomes),
+        "errors": sum(count for status, count in status_codes.items() if int(status) >= 500),
+        "status_codes": status_codes,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "requests_per_second": round(len(outcomes) / wall_seconds, 2),
+        "queries_per_request": round(sum(statement_counts) / len(statement_counts), 2) if statement_counts else None,
+    }
+
+
+#######################################################
+######### RESULTS FILE AND BASELINE COMPARISON ########
+#######################################################
+
+
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_comparison(results: dict, baseline: dict):
+    previous = {route["route"]: route for route in baseline["routes"]}
+    rows = []
+    for route in results["routes"]:
+        before = previous.get(route["route"])
+        if before is None:
+            continue
+        rows.append([route["route"], f"{before['p95_ms']:.2f}", f"{route['p95_ms']:.2f}",
+                     f"{(route['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100:+.1f}%" if before["p95_ms"] else "n/a",
+                     f"{before['requests_per_second']:.1f}", f"{route['requests_per_second']:.1f}"])
+    print(f"\n>> Compared with {baseline.get('commit') or 'baseline'} ({baseline.get('started_at')})")
+    print_table(["Route", "p95 before", "p95 after", "Change", "req/s before", "req/s after"], rows)
+
+
+#######################################################
+######## COMMAND LINE INTERFACE FOR LOAD TESTS ########
+#######################################################
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test every route of the Digdraft API.")
+    parser.add_argument("--players", type=int, default=5000)
+    parser.add_argument("--mobs", type=int, default=100000)
+    parser.add_argument("--biomes", type=int, default=100000)
+    parser.add_argument("--spawns", type=int, default=2000000)
+    parser.add_argument("--seed", type=int, default=42, help="Seed for generated data and request parameters.")
+    parser.add_argument("--reseed", action="store_true", help="Reseed even if the tables are already large enough.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route.")
+    parser.add_argument("--heavy-requests", type=int, default=10, help="Requests per route that returns or scans whole tables.")
+    parser.add_argument("--auth-requests", type=int, default=20, help="Requests per route that hashes a password.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--base-url", default=None, help="Load test a separately started server instead of an in-process one.")
+    parser.add_argument("--output", default="loadtest_results.json")
+    parser.add_argument("--baseline", default=None, help="Previous results file to compare p95 latency and throughput with.")
+    arguments = parser.parse_args()
+
+    with app.app_context():
+        print(">> Seeding...")
+        seeded = seed_at_scale(arguments.players, arguments.mobs, arguments.biomes, arguments.spawns, seed=arguments.seed, reseed=arguments.reseed)
+        print(f"\t{seeded}")
+        scenarios = build_scenarios(arguments.requests, arguments.heavy_requests, arguments.auth_requests, seed=arguments.seed)
+        db.session.remove()
+
+    server, base_url = (None, arguments.base_url) if arguments.base_url else start_local_server()
+    client = LoadClient(base_url)
+    client.log_in()
+
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    routes = []
+    for position, scenario in enumerate(scenarios):
+        print(f">> {scenario.name} ({scenario.requests} requests)")
+        routes.append(run_scenario(client, scenario, arguments.concurrency, seed=arguments.seed + position))
+    if server is not None:
+        server.shutdown()
+
+    results = {
+        "commit": current_commit(),
+        "started_at": started_at,
+        "base_url": arguments.base_url or "in-process",
+        "concurrency": arguments.concurrency,
+        "seeded": seeded,
+        "config": {key: app.config.get(key) for key in ("RESPONSE_CACHE_ENABLED", "ASSOCIATION_LOADING_STRATEGY", "INSTRUMENTATION_ENABLED")},
+        "routes": routes,
+    }
+    with open(arguments.output, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+
+    print()
+    print_table(["Route", "Requests", "5xx", "p50 (ms)", "p95 (ms)", "p99 (ms)", "req/s", "Queries/req"], [
+        [route["route"], route["requests"], route["errors"], f"{route['p50_ms']:.2f}", f"{route['p95_ms']:.2f}",
+         f"{route['p99_ms']:.2f}", f"{route['requests_per_second']:.1f}", route["queries_per_request"]]
+        for route in routes
+    ])
+    print(f"\nResults written to `{arguments.output}`.")
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            print_comparison(results, json.load(baseline_file))
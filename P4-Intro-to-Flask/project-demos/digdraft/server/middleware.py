@@ -1,11 +1,166 @@
 from flask import make_response, session
 
 from functools import wraps
+from collections import OrderedDict
+from threading import Lock
+from dataclasses import dataclass
+from datetime import datetime
+import time
 
-from config import app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from config import app, db
 
 from models import Player
 
+from instrumentation import timed_function
+
+
+#######################################################
+######### CACHED IDENTITIES FOR AUTHORIZATION #########
+#######################################################
+
+
+# Lightweight, read-only snapshot of an authenticated player.
+# NOTE: Views receive this instead of a freshly serialized `Player` dictionary.
+#       Subscript access (`current_player["id"]`) is kept for existing views.
+@dataclass(frozen=True, slots=True)
+class PlayerPrincipal:
+    id: int
+    username: str
+    kills: int
+    deaths: int
+    experience: int
+    created_at: datetime | None
+
+    @classmethod
+    def from_player(cls, player: Player):
+        return cls(
+            id=player.id,
+            username=player.username,
+            kills=player.kills,
+            deaths=player.deaths,
+            experience=player.experience,
+            created_at=player.created_at
+        )
+
+    def __getitem__(self, attribute: str):
+        try:
+            return getattr(self, attribute)
+        except AttributeError:
+            raise KeyError(attribute) from None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "username": self.username,
+            "kills": self.kills,
+            "deaths": self.deaths,
+            "experience": self.experience,
+            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else None
+        }
+
+
+# Bounded, per-process LRU cache of principals keyed by player ID.
+# NOTE: Entries expire after `ttl` seconds so that writes made by other
+#       worker processes become visible without cross-process invalidation.
+class PlayerIdentityCache:
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, player_id: int):
+        with self._lock:
+            entry = self._entries.get(player_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[player_id]
+                return None
+            self._entries.move_to_end(player_id)
+            return principal
+
+    def put(self, principal: PlayerPrincipal):
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, player_id: int):
+        with self._lock:
+            self._entries.pop(player_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+player_identity_cache = PlayerIdentityCache(
+    max_size=app.config["PLAYER_CACHE_MAX_SIZE"],
+    ttl=app.config["PLAYER_CACHE_TTL"]
+)
+
+
+# Invalidate cached identities whenever a player row is written through the ORM.
+# NOTE: Writes are recorded on the session and only evicted once the transaction commits
+#       (as `caching.py` does for table versions), so a concurrent request that loads the
+#       player between the flush and the commit cannot cache the old row until the TTL.
+@event.listens_for(Player, "after_update")
+@event.listens_for(Player, "after_delete")
+def record_written_player(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("written_players", set()).add(target.id)
+
+# Bulk statements (e.g. `Player.query.delete()`) bypass mapper events, so drop everything.
+@event.listens_for(Session, "do_orm_execute")
+def record_bulk_player_write(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mappers = orm_execute_state.all_mappers
+        if any(mapper.class_ is Player for mapper in mappers):
+            orm_execute_state.session.info["players_bulk_written"] = True
+
+@event.listens_for(Session, "after_commit")
+def invalidate_cached_players(session):
+    written_players = session.info.pop("written_players", None)
+    if session.info.pop("players_bulk_written", False):
+        player_identity_cache.clear()
+    elif written_players:
+        for player_id in written_players:
+            player_identity_cache.invalidate(player_id)
+
+@event.listens_for(Session, "after_rollback")
+def forget_written_players(session):
+    session.info.pop("written_players", None)
+    session.info.pop("players_bulk_written", None)
+
+
+@timed_function("auth")
+def load_player_principal(player_id: int):
+    principal = player_identity_cache.get(player_id)
+    if principal is None:
+        authorized_player = db.session.get(Player, player_id)
+        if authorized_player is None:
+            return None
+        principal = PlayerPrincipal.from_player(authorized_player)
+        player_identity_cache.put(principal)
+    return principal
+
+
+#######################################################
+###### EXPORTABLE MIDDLEWARE UTILITY FUNCTION(S) ######
+#######################################################
+
+
 def authorization_required(func):
     @wraps(func)
     def decorated_authorizer(*args, **kwargs):
@@ -13,11 +168,11 @@ def authorization_required(func):
         if not player_id:
             return make_response({"error": "Player account not authenticated. Please log in or sign up to continue using the application."}, 401)
         try:
-            authorized_player = Player.query.filter(Player.id == player_id).first()
+            authorized_player = load_player_principal(player_id)
             if authorized_player is None:
                 return make_response({"error": "Invalid username or password. Try again."}, 401)
         except Exception as error:
             return make_response({"error": f"Something went wrong. EXCEPTION: {str(error)}."}, 500)
 
-        return func(authorized_player.to_dict(), *args, **kwargs)
-    return decorated_authorizer
\ No newline at end of file
+        return func(authorized_player, *args, **kwargs)
+    return decorated_authorizer
@@ -5,7 +5,17 @@
 
 from config import db
 
-from sqlalchemy.orm import validates
+from contextlib import contextmanager
+from functools import cache
+from itertools import chain
+import json
+
+from sqlalchemy import DDL, bindparam, delete, event, func, insert, literal_column, select, text, update
+from sqlalchemy import inspect as sql_inspect
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.orm import validates, selectinload, joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 from sqlalchemy_serializer import SerializerMixin
 from sqlalchemy.ext.associationproxy import association_proxy
 
@@ -130,14 +140,448 @@ class Spawn(db.Model, SerializerMixin):
     # 3d. Creates serialization rules to avoid cascading when accessing spawn data from a biome.
     serialize_rules = ("-mob.spawns", "-biome.spawns")
 
+    # Composite indexes for looking up spawns by biome or by mob (optionally within an hour range),
+    # plus a standalone index for hour-only lookups.
+    # NOTE: SQLite does not index foreign keys automatically, so without these every association
+    #       lookup scans the entire spawn table.
+    __table_args__ = (
+        db.Index("ix_spawn_table_biome_id_hour_spawned", "biome_id", "hour_spawned"),
+        db.Index("ix_spawn_table_mob_id_hour_spawned", "mob_id", "hour_spawned"),
+        db.Index("ix_spawn_table_hour_spawned", "hour_spawned"),
+    )
+
+
+# Canonical form of a username for lookups. (`"  DJProfessorKash "` and `"djprofessorkash"` are the same player.)
+def normalize_username(username: str):
+    return username.strip().casefold()
+
+# NOTE: Fills `username_normalized` for Core inserts (e.g. the bulk seeding engine) that bypass `@validates`.
+def default_normalized_username(context):
+    return normalize_username(context.get_current_parameters()["username"])
+
 
 class Player(db.Model, SerializerMixin):
     __tablename__ = "player_table"
+    # NOTE: Logins look players up by `username_normalized` with an exact match on this unique
+    #       index, so their cost no longer grows with the number of players.
+    __table_args__ = (
+        db.Index("ux_player_table_username_normalized", "username_normalized", unique=True),
+    )
+    serialize_rules = ("-username_normalized",)
 
     id = db.Column(db.Integer, primary_key=True)
     kills = db.Column(db.Integer, default=0, nullable=False)
     deaths = db.Column(db.Integer, default=0, nullable=False)
     experience = db.Column(db.Integer, default=1, nullable=False)
     username = db.Column(db.String, unique=True, nullable=False)
+    username_normalized = db.Column(db.String, nullable=False, default=default_normalized_username)
     password = db.Column(db.String, nullable=False)
-    created_at = db.Column(db.DateTime, server_default=db.func.now())
\ No newline at end of file
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    @validates("username")
+    def validate_username(self, key, username):
+        self.username_normalized = normalize_username(username)
+        return username
+
+
+# Materialized summary of spawn counts per biome and hour for dashboard statistics.
+# NOTE: Rows are maintained incrementally by SQLite triggers on `spawn_table` (see below),
+#       so ORM writes, bulk inserts, and raw SQL all keep the summary current.
+class SpawnSummary(db.Model, SerializerMixin):
+    __tablename__ = "spawn_summary_table"
+
+    biome_id = db.Column(db.Integer, db.ForeignKey("biome_table.id"), primary_key=True)
+    hour_spawned = db.Column(db.Integer, primary_key=True)
+    spawn_count = db.Column(db.Integer, default=0, nullable=False)
+
+
+# Triggers that add or remove one from the matching summary row whenever a spawn changes.
+SPAWN_SUMMARY_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS spawn_summary_after_insert AFTER INSERT ON spawn_table
+    WHEN NEW.biome_id IS NOT NULL AND NEW.hour_spawned IS NOT NULL
+    BEGIN
+        INSERT INTO spawn_summary_table (biome_id, hour_spawned, spawn_count) VALUES (NEW.biome_id, NEW.hour_spawned, 1)
+        ON CONFLICT (biome_id, hour_spawned) DO UPDATE SET spawn_count = spawn_count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS spawn_summary_after_delete AFTER DELETE ON spawn_table
+    WHEN OLD.biome_id IS NOT NULL AND OLD.hour_spawned IS NOT NULL
+    BEGIN
+        UPDATE spawn_summary_table SET spawn_count = spawn_count - 1
+        WHERE biome_id = OLD.biome_id AND hour_spawned = OLD.hour_spawned;
+        DELETE FROM spawn_summary_table
+        WHERE biome_id = OLD.biome_id AND hour_spawned = OLD.hour_spawned AND spawn_count <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS spawn_summary_after_update AFTER UPDATE OF biome_id, hour_spawned ON spawn_table
+    BEGIN
+        UPDATE spawn_summary_table SET spawn_count = spawn_count - 1
+        WHERE biome_id = OLD.biome_id AND hour_spawned = OLD.hour_spawned;
+        DELETE FROM spawn_summary_table
+        WHERE biome_id = OLD.biome_id AND hour_spawned = OLD.hour_spawned AND spawn_count <= 0;
+        INSERT INTO spawn_summary_table (biome_id, hour_spawned, spawn_count)
+        SELECT NEW.biome_id, NEW.hour_spawned, 1 WHERE NEW.biome_id IS NOT NULL AND NEW.hour_spawned IS NOT NULL
+        ON CONFLICT (biome_id, hour_spawned) DO UPDATE SET spawn_count = spawn_count + 1;
+    END
+    """,
+]
+
+for trigger in SPAWN_SUMMARY_TRIGGERS:
+    event.listen(Spawn.__table__, "after_create", DDL(trigger).execute_if(dialect="sqlite"))
+
+# Recreates the summary triggers and recomputes every summary row from `spawn_table`.
+# NOTE: Needed once for databases whose tables were created before the summary existed.
+#       (Flask-Migrate does not generate triggers.)
+def rebuild_spawn_summary():
+    SpawnSummary.__table__.create(bind=db.session.connection(), checkfirst=True)
+    for trigger in SPAWN_SUMMARY_TRIGGERS:
+        db.session.execute(text(trigger))
+    db.session.execute(delete(SpawnSummary))
+    db.session.execute(insert(SpawnSummary).from_select(
+        ["biome_id", "hour_spawned", "spawn_count"],
+        select(Spawn.biome_id, Spawn.hour_spawned, func.count(Spawn.id))
+        .where(Spawn.biome_id.is_not(None), Spawn.hour_spawned.is_not(None))
+        .group_by(Spawn.biome_id, Spawn.hour_spawned)
+    ))
+    db.session.commit()
+
+
+#######################################################
+############ PLAYER LOOKUPS BY USERNAME ###############
+#######################################################
+
+
+# Finds the player whose username matches exactly, ignoring case and surrounding whitespace.
+def find_player_by_username(username: str):
+    query = select(Player).where(Player.username_normalized == normalize_username(username))
+    return db.session.scalars(query).first()
+
+# Adds and backfills `username_normalized` (and its unique index) on databases created before it existed.
+# NOTE: Safe to rerun. Raises ValueError before creating the unique index if two usernames differ only by case.
+def migrate_normalized_usernames():
+    connection = db.session.connection()
+    columns = {column["name"] for column in sql_inspect(connection).get_columns(Player.__tablename__)}
+    if "username_normalized" not in columns:
+        connection.execute(text(f"ALTER TABLE {Player.__tablename__} ADD COLUMN username_normalized VARCHAR NOT NULL DEFAULT ''"))
+    player_table = Player.__table__
+    rows = [{"player_id": identifier, "normalized": normalize_username(username)}
+            for identifier, username in connection.execute(select(player_table.c.id, player_table.c.username))]
+    if rows:
+        connection.execute(
+            update(player_table).where(player_table.c.id == bindparam("player_id")).values(username_normalized=bindparam("normalized")),
+            rows
+        )
+    conflicts = connection.execute(
+        select(player_table.c.username_normalized).group_by(player_table.c.username_normalized).having(func.count() > 1)
+    ).scalars().all()
+    if conflicts:
+        db.session.rollback()
+        raise ValueError(f"Usernames that differ only by case must be renamed first: {', '.join(conflicts)}.")
+    for index in player_table.indexes:
+        index.create(bind=connection, checkfirst=True)
+    db.session.commit()
+    return len(rows)
+
+
+#######################################################
+########### LEADERBOARD SCORES AND INDEXES ############
+#######################################################
+
+
+# Score expressions for each leaderboard, highest first. (See `leaderboard.py`.)
+# NOTE: The kill/death ratio is kept in integer thousandths so that SQL and the in-memory ranks agree exactly.
+#       Its constants are literals rather than bound parameters, since SQLite only uses an expression
+#       index when the query's expression is textually identical to the index's.
+LEADERBOARD_SCORES = {
+    "kills": Player.kills,
+    "kill-death-ratio": Player.kills * literal_column("1000") // func.max(Player.deaths, literal_column("1")),
+    "experience": Player.experience,
+}
+
+# One index per leaderboard in rank order (score descending, then ID), so that top-N reads stop after N entries
+# and counting the players above a score is an index range scan.
+LEADERBOARD_INDEXES = [
+    db.Index(f"ix_player_table_{board.replace('-', '_')}_rank", score.desc(), Player.id)
+    for board, score in LEADERBOARD_SCORES.items()
+]
+
+# Same as `LEADERBOARD_SCORES[board]`, computed in Python from a player's stats.
+def leaderboard_score(board: str, kills: int, deaths: int, experience: int):
+    if board == "kill-death-ratio":
+        return kills * 1000 // max(deaths, 1)
+    return kills if board == "kills" else experience
+
+# Creates the leaderboard indexes on databases created before they existed. (Safe to rerun.)
+def create_leaderboard_indexes():
+    # NOTE: `checkfirst` cannot see expression indexes (SQLite reflection skips them), so SQLite checks instead.
+    for index in LEADERBOARD_INDEXES:
+        db.session.execute(CreateIndex(index, if_not_exists=True))
+    db.session.commit()
+    return len(LEADERBOARD_INDEXES)
+
+
+#######################################################
+######## LOADING STRATEGIES FOR ASSOCIATIONS ##########
+#######################################################
+
+
+# Strategies for loading a model's spawns together with the OTHER side of each spawn.
+# NOTE: Walking `Mob.biomes` / `Biome.mobs` lazily costs one SELECT for the spawns
+#       plus one SELECT per spawn. Eager strategies bound this to a constant:
+#   -> "selectin" issues three queries (parent, spawns, other side) regardless of size.
+#   -> "joined" issues a single query with LEFT OUTER JOINs.
+#   -> "lazy" keeps the original per-spawn behavior.
+ASSOCIATION_LOADING_STRATEGIES = {
+    "selectin": selectinload,
+    "joined": joinedload,
+    "lazy": None,
+}
+
+def spawn_loading_options(spawns_relationship, other_side_relationship, strategy: str):
+    if strategy not in ASSOCIATION_LOADING_STRATEGIES:
+        raise ValueError(f"Unknown loading strategy `{strategy}`. Expected one of: {', '.join(ASSOCIATION_LOADING_STRATEGIES)}.")
+    loader = ASSOCIATION_LOADING_STRATEGIES[strategy]
+    if loader is None:
+        return []
+    return [getattr(loader(spawns_relationship), loader.__name__)(other_side_relationship)]
+
+def mob_with_biomes_query(mob_id: int, strategy: str = "selectin"):
+    return select(Mob).where(Mob.id == mob_id).options(*spawn_loading_options(Mob.spawns, Spawn.biome, strategy))
+
+def biome_with_mobs_query(biome_id: int, strategy: str = "selectin"):
+    return select(Biome).where(Biome.id == biome_id).options(*spawn_loading_options(Biome.spawns, Spawn.mob, strategy))
+
+# Finds a mob by ID with its spawned biomes loaded using the given strategy.
+def find_mob_with_biomes(mob_id: int, strategy: str = "selectin"):
+    return db.session.execute(mob_with_biomes_query(mob_id, strategy)).unique().scalars().first()
+
+# Finds a biome by ID with its spawned mobs loaded using the given strategy.
+def find_biome_with_mobs(biome_id: int, strategy: str = "selectin"):
+    return db.session.execute(biome_with_mobs_query(biome_id, strategy)).unique().scalars().first()
+
+
+#######################################################
+####### SINGLE-ROW READS AND WRITES BY PRIMARY KEY ####
+#######################################################
+
+
+"""
+Routes that view, edit, or delete one mob or biome use these helpers instead
+of loading the row with `Model.query.filter(Model.id == id).first()` first:
+
+    -> Each helper reads the row AND all of its spawns (together with each
+       spawn's other side) in ONE statement. A correlated subquery gathers
+       the spawns into a JSON array next to the row's own columns, and the
+       spawns are built from it without further SQL.
+    -> `find_with_spawns()` is a single SELECT.
+    -> `update_returning()` is a single `UPDATE ... RETURNING`, which writes
+       the row, reads it back, and reveals a missing ID (no row returned).
+    -> `delete_returning()` is a single `DELETE ... RETURNING`, followed by
+       one `UPDATE` that detaches the spawns only if the row had any.
+    -> `row_exists()` probes for an ID alone when the row itself is unused.
+
+NOTE: The JSON functions (and `RETURNING`) are SQLite's. Other dialects load
+      the spawns with one more joined query, as `load_spawns()` does.
+
+None of them commit. Serialize the returned row BEFORE committing, since the
+commit expires it (and a deleted row can no longer be refreshed).
+"""
+
+# For each model: the spawn column that references it, and the relationship to each spawn's OTHER side.
+SPAWN_SIDES = {
+    Mob: (Spawn.mob_id, Spawn.biome),
+    Biome: (Spawn.biome_id, Spawn.mob),
+}
+
+def row_exists(model, row_id: int):
+    return db.session.scalar(select(model.id).where(model.id == row_id)) is not None
+
+def embeds_spawns():
+    dialect = db.engine.dialect
+    return dialect.name == "sqlite" and dialect.update_returning and dialect.delete_returning
+
+# Builds `json_object('column', value, ...)` over every column of a model.
+def json_object_of(model):
+    return func.json_object(*chain.from_iterable((literal_column(f"'{column.key}'"), column) for column in model.__table__.columns))
+
+# A correlated subquery that returns a row's spawns, each with its other side under "other", as one JSON array.
+# NOTE: SQLite's compiler renders every column in a RETURNING clause without its table, which would make `id` ambiguous
+#       in the subquery. It is therefore compiled on its own (with full names), once per model, and embedded as literal SQL.
+@cache
+def compile_spawns_json(model, dialect):
+    foreign_key, other_side = SPAWN_SIDES[model]
+    spawn_object = func.json_insert(json_object_of(Spawn), "$.other", json_object_of(other_side.property.mapper.class_))
+    subquery = (select(func.json_group_array(spawn_object)).select_from(Spawn).outerjoin(other_side)
+                .where(foreign_key == literal_column(f"{model.__tablename__}.id")))
+    return f"({subquery.compile(dialect=dialect, compile_kwargs={'literal_binds': True})})"
+
+def spawns_json(model):
+    return literal_column(compile_spawns_json(model, db.engine.dialect))
+
+# Returns the session's instance for a row decoded from JSON, creating a persistent one (without SQL) if it has none.
+# NOTE: Column types convert SQLite's values back (e.g. 0/1 to booleans), as they would for a query's results.
+def persistent_from_json(model, values: dict):
+    instance = db.session.identity_map.get(identity_key(model, values["id"]))
+    if instance is not None:
+        return instance
+    instance = sql_inspect(model).class_manager.new_instance()
+    for column in model.__table__.columns:
+        processor = column.type.result_processor(db.engine.dialect, None)
+        set_committed_value(instance, column.key, processor(values[column.key]) if processor else values[column.key])
+    make_transient_to_detached(instance)
+    db.session.add(instance)
+    return instance
+
+# Sets the spawns decoded from `spawns_json()` as the row's `spawns`, with each spawn's other side.
+def attach_spawns(row, document: str):
+    _, other_side = SPAWN_SIDES[type(row)]
+    spawns = []
+    for values in json.loads(document):
+        spawn = persistent_from_json(Spawn, values)
+        other_values = values["other"]
+        other = persistent_from_json(other_side.property.mapper.class_, other_values) if other_values["id"] is not None else None
+        set_committed_value(spawn, other_side.key, other)
+        spawns.append(spawn)
+    set_committed_value(row, "spawns", spawns)
+    return row
+
+# Loads a row's spawns (each with its other side) in one query and sets them as the row's `spawns`.
+def load_spawns(row):
+    foreign_key, other_side = SPAWN_SIDES[type(row)]
+    spawns = db.session.scalars(select(Spawn).where(foreign_key == row.id).options(joinedload(other_side))).all()
+    set_committed_value(row, "spawns", spawns)
+    return row
+
+def find_with_spawns(model, row_id: int):
+    if embeds_spawns():
+        result = db.session.execute(select(model, spawns_json(model)).where(model.id == row_id)).first()
+        return attach_spawns(*result) if result is not None else None
+    row = db.session.get(model, row_id)
+    return load_spawns(row) if row is not None else None
+
+# Applies already validated column changes to one row. Returns the row with its spawns, or None if the ID does not exist.
+def update_returning(model, row_id: int, changes: dict):
+    statement = update(model).where(model.id == row_id).values(**changes)
+    if embeds_spawns():
+        result = db.session.execute(statement.returning(model, spawns_json(model))).first()
+        return attach_spawns(*result) if result is not None else None
+    if db.engine.dialect.update_returning:
+        row = db.session.scalars(statement.returning(model)).first()
+    else:
+        db.session.execute(statement)
+        row = db.session.get(model, row_id, populate_existing=True)
+    return load_spawns(row) if row is not None else None
+
+# Detaches a row's spawns (as `db.session.delete()` does) and deletes the row.
+# Returns the deleted row with its detached spawns, or None (with nothing left written) if the ID does not exist.
+def delete_returning(model, row_id: int):
+    foreign_key, other_side = SPAWN_SIDES[model]
+    detach = update(Spawn).where(foreign_key == row_id).values({foreign_key.key: None})
+    if embeds_spawns():
+        # NOTE: SQLite does not enforce foreign keys here, so the row can go before its spawns are detached.
+        result = db.session.execute(delete(model).where(model.id == row_id).returning(model, spawns_json(model))).first()
+        if result is None:
+            return None
+        row = attach_spawns(*result)
+        if row.spawns:
+            db.session.execute(detach)
+        return row
+    spawns = db.session.scalars(select(Spawn).where(foreign_key == row_id).options(joinedload(other_side))).all()
+    if spawns:
+        db.session.execute(detach)
+    statement = delete(model).where(model.id == row_id)
+    if db.engine.dialect.delete_returning:
+        row = db.session.scalars(statement.returning(model)).first()
+    else:
+        row = db.session.get(model, row_id)
+        db.session.execute(statement)
+    if row is None:
+        db.session.rollback()
+        return None
+    set_committed_value(row, "spawns", spawns)
+    return row
+
+
+#######################################################
+############ FILTERED QUERIES FOR SPAWNS ##############
+#######################################################
+
+
+DIMENSION_COLUMNS = {
+    "overworld": Biome.is_in_overworld,
+    "nether": Biome.is_in_nether,
+    "end": Biome.is_in_end,
+}
+
+# Builds a query for spawns filtered by mob, biome, dimension and/or an hour range.
+# NOTE: Hour ranges are inclusive and may wrap past midnight. (e.g. `18` to `6` means 18:00-06:59.)
+def find_spawns(mob_id: int = None, biome_id: int = None, dimension: str = None,
+                from_hour: int = None, to_hour: int = None):
+    query = select(Spawn)
+    if mob_id is not None:
+        query = query.where(Spawn.mob_id == mob_id)
+    if biome_id is not None:
+        query = query.where(Spawn.biome_id == biome_id)
+    if dimension is not None:
+        if dimension not in DIMENSION_COLUMNS:
+            raise ValueError(f"Unknown dimension `{dimension}`. Expected one of: {', '.join(DIMENSION_COLUMNS)}.")
+        query = query.join(Biome, Spawn.biome_id == Biome.id).where(DIMENSION_COLUMNS[dimension].is_(True))
+    if from_hour is not None or to_hour is not None:
+        from_hour = 0 if from_hour is None else from_hour
+        to_hour = 23 if to_hour is None else to_hour
+        if not (0 <= from_hour <= 23 and 0 <= to_hour <= 23):
+            raise ValueError("Hours must be between 0 and 23.")
+        if from_hour <= to_hour:
+            query = query.where(Spawn.hour_spawned.between(from_hour, to_hour))
+        else:
+            query = query.where((Spawn.hour_spawned >= from_hour) | (Spawn.hour_spawned <= to_hour))
+    return query
+
+# Creates the spawn search indexes on databases created before they existed. (Safe to rerun.)
+def create_spawn_indexes():
+    spawn_indexes = sorted(Spawn.__table__.indexes, key=lambda index: index.name)
+    for index in spawn_indexes:
+        db.session.execute(CreateIndex(index, if_not_exists=True))
+    db.session.commit()
+    return len(spawn_indexes)
+
+
+#######################################################
+########### QUERY COUNTING FOR VERIFICATION ###########
+#######################################################
+
+
+# Counts SQL statements sent to the database engine within a `with` block.
+# USAGE:
+#   with count_queries() as queries:
+#       find_mob_with_biomes(1)
+#   print(queries.count, queries.statements)
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+@contextmanager
+def count_queries(engine=None):
+    engine = engine or db.engine
+    counter = QueryCounter()
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record_statement)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+# Fails loudly if a block of code issues more SQL statements than expected.
+@contextmanager
+def assert_max_queries(maximum: int, engine=None):
+    with count_queries(engine) as counter:
+        yield counter
+    assert counter.count <= maximum, f"Expected at most {maximum} queries, but {counter.count} were executed:\n" + "\n".join(counter.statements)
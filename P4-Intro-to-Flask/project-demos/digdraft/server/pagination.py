@@ -0,0 +1,169 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from flask import Response, make_response, jsonify, request, stream_with_context, url_for
+
+from sqlalchemy import select
+
+from bisect import bisect_right
+
+from config import app, db
+
+
+#######################################################
+############ KEYSET (CURSOR) PAGINATION ###############
+#######################################################
+
+
+"""
+Keyset pagination walks a table in primary key order using the last ID seen
+as a cursor, rather than an OFFSET that forces SQLite to skip rows. Every page
+therefore costs the same index range scan no matter how deep the client reads.
+
+    GET /api/mobs?limit=50            -> first fifty mobs
+    GET /api/mobs?limit=50&after=50   -> mobs with IDs greater than fifty
+
+Each page carries the next cursor in the `X-Next-Cursor` header and a
+`Link: <...>; rel="next"` header. Both are omitted on the last page.
+"""
+
+def wants_pagination():
+    return "limit" in request.args or "after" in request.args
+
+def parse_integer_argument(name: str, default: int):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+def parse_page_arguments():
+    limit = parse_integer_argument("limit", app.config["PAGINATION_DEFAULT_LIMIT"])
+    after = parse_integer_argument("after", 0)
+    if limit is None or not 0 < limit <= app.config["PAGINATION_MAX_LIMIT"]:
+        raise ValueError(f"`limit` must be an integer between 1 and {app.config['PAGINATION_MAX_LIMIT']}.")
+    if after is None or after < 0:
+        raise ValueError("`after` must be a non-negative integer ID.")
+    return limit, after
+
+# NOTE: One extra row is fetched to learn whether a next page exists.
+def keyset_query(model, limit: int, after: int = 0, query=None):
+    return (select(model) if query is None else query).where(model.id > after).order_by(model.id).limit(limit + 1)
+
+# Serializes a page of rows fetched with `keyset_query()` and returns it with the next cursor (or None).
+def keyset_result(rows: list, serialize, limit: int):
+    has_next_page = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = rows[-1].id if has_next_page else None
+    return [serialize(row) for row in rows], next_cursor
+
+# Narrows a listing to rows with exactly this name, or returns None to list every row. (For `?name=`.)
+def named_query(model, name: str = None):
+    return select(model).where(model.name == name) if name is not None else None
+
+def full_list_query(model, query=None):
+    return (select(model) if query is None else query).order_by(model.id)
+
+def keyset_page(model, serialize, limit: int, after: int = 0, query=None):
+    rows = db.session.scalars(keyset_query(model, limit, after, query)).all()
+    return keyset_result(rows, serialize, limit)
+
+def paginated_response(items: list, next_cursor, limit: int):
+    response = make_response(jsonify(items), 200)
+    if next_cursor is not None:
+        # NOTE: Other query arguments (e.g. filters) carry over to the next page.
+        arguments = {**request.args.to_dict(), **request.view_args, "limit": limit, "after": next_cursor}
+        next_url = url_for(request.endpoint, **arguments, _external=True)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return response
+
+
+#######################################################
+############### STREAMED JSON RESPONSES ###############
+#######################################################
+
+
+"""
+Streaming serializes rows as they come off a server-side cursor instead of
+building the whole list first, so response memory stays flat however large
+the table grows.
+
+    GET /api/mobs?stream=ndjson   -> one JSON object per line
+    GET /api/mobs?stream=json     -> a chunked JSON array
+"""
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+def iterate_rows(model, batch_size: int, query=None):
+    query = (select(model) if query is None else query).order_by(model.id).execution_options(yield_per=batch_size)
+    for row in db.session.scalars(query):
+        yield row
+
+def stream_rows(model, serialize, stream_format: str, query=None):
+    return stream_iterable(lambda: iterate_rows(model, app.config["STREAM_BATCH_SIZE"], query), serialize, stream_format)
+
+# Streams whatever `make_rows()` yields. (Called once the response body is first read.)
+def stream_iterable(make_rows, serialize, stream_format: str):
+    if stream_format not in STREAM_FORMATS:
+        return make_response(jsonify({"error": f"Unknown stream format `{stream_format}`. Expected one of: {', '.join(STREAM_FORMATS)}."}), 400)
+
+    def generate_ndjson():
+        for row in make_rows():
+            yield app.json.dumps(serialize(row)) + "\n"
+
+    def generate_json_array():
+        yield "["
+        separator = ""
+        for row in make_rows():
+            yield separator + app.json.dumps(serialize(row))
+            separator = ","
+        yield "]"
+
+    generator = generate_ndjson if stream_format == "ndjson" else generate_json_array
+    return Response(stream_with_context(generator()), status=200, mimetype=STREAM_FORMATS[stream_format])
+
+
+#######################################################
+###### EXPORTABLE LISTING UTILITY FUNCTION(S) #########
+#######################################################
+
+
+# Builds a listing response for a model, honoring `stream`, `limit` and `after` arguments.
+# NOTE: Without any of those arguments, the full list is returned as before.
+#       An optional `query` (a `select()` of the model) narrows the rows being listed.
+def list_response(model, serialize, query=None):
+    stream_format = request.args.get("stream")
+    if stream_format is not None:
+        return stream_rows(model, serialize, stream_format, query)
+    if wants_pagination():
+        try:
+            limit, after = parse_page_arguments()
+        except ValueError as error:
+            return make_response(jsonify({"error": str(error)}), 400)
+        items, next_cursor = keyset_page(model, serialize, limit, after, query)
+        return paginated_response(items, next_cursor, limit)
+    all_rows = db.session.scalars(full_list_query(model, query))
+    return make_response(jsonify([serialize(row) for row in all_rows]), 200)
+
+# Same as `list_response()`, for records already held in memory and sorted by ID. (See `replica.py`.)
+def list_records_response(records: tuple, serialize):
+    stream_format = request.args.get("stream")
+    if stream_format is not None:
+        return stream_iterable(lambda: iter(records), serialize, stream_format)
+    if wants_pagination():
+        try:
+            limit, after = parse_page_arguments()
+        except ValueError as error:
+            return make_response(jsonify({"error": str(error)}), 400)
+        start = bisect_right(records, after, key=lambda record: record.id)
+        items, next_cursor = keyset_result(records[start:start + limit + 1], serialize, limit)
+        return paginated_response(items, next_cursor, limit)
+    return make_response(jsonify([serialize(record) for record in records]), 200)
@@ -0,0 +1,180 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from werkzeug.serving import make_server
+
+import argparse
+import importlib
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+
+"""
+A self-contained pre-forking launcher that serves a WSGI app from several
+worker processes.
+
+    python prefork.py wsgi:application --workers 4 --bind 127.0.0.1:5555
+
+    from prefork import PreforkServer
+    PreforkServer(application, workers=4).serve_forever()
+
+It needs nothing but the standard library and Werkzeug, so this same file can
+be copied next to any of the repo's Flask apps. Flask's `app.run()` serves
+every request from one process, so one GIL caps throughput at one core. Here:
+
+    -> The master process binds ONE listening socket, runs `before_fork()`
+       (e.g. to compile or load read-only state that every worker then shares
+       copy-on-write), and forks the workers.
+    -> Each worker runs `after_fork()` BEFORE it accepts its first connection
+       (e.g. to open its own database connections and warm per-process
+       caches), then serves the shared socket with a threaded Werkzeug server.
+       The kernel spreads incoming connections across workers.
+    -> Workers share nothing but the socket (and any memory explicitly shared
+       before forking), so throughput grows with the number of cores.
+    -> The master restarts workers that exit unexpectedly and, on SIGINT or
+       SIGTERM, stops every worker and waits for them.
+
+When launched from the command line, `before_fork()` and `after_fork()` are
+looked up on the module that holds the application, if it defines them.
+
+NOTE: Requires `os.fork()`, so it runs on Linux and macOS but not Windows.
+NOTE: Never let a database connection opened before forking be used by a
+      worker; dispose of connection pools in `before_fork()`.
+"""
+
+# Workers that die within this many seconds of starting are restarted with a delay, so that
+# a crash at import or warm-up time does not turn into a tight fork loop.
+RESTART_BACKOFF_SECONDS = 1.0
+
+
+#######################################################
+######### PRE-FORKING MASTER AND WORKER PROCESSES #####
+#######################################################
+
+
+class PreforkServer:
+    def __init__(self, application, host: str = "127.0.0.1", port: int = 5555, workers: int = None,
+                 before_fork=None, after_fork=None, backlog: int = 2048):
+        self.application = application
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.before_fork = before_fork
+        self.after_fork = after_fork
+        self.backlog = backlog
+        self.listener = None
+        self.stopping = False
+        self._worker_started_at = {}
+
+    def bind(self):
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((self.host, self.port))
+        self.listener.listen(self.backlog)
+        self.listener.set_inheritable(True)
+        # NOTE: Binding to port 0 picks a free port; report the real one.
+        self.port = self.listener.getsockname()[1]
+
+    def spawn_worker(self):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                self.run_worker()
+            finally:
+                os._exit(0)
+        self._worker_started_at[pid] = time.monotonic()
+        return pid
+
+    def run_worker(self):
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        if self.after_fork is not None:
+            self.after_fork()
+        server = make_server(self.host, self.port, self.application, threaded=True, fd=self.listener.fileno())
+
+        # NOTE: `shutdown()` blocks until `serve_forever()` returns, so it must run on another thread.
+        def stop_worker(signum, frame):
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop_worker)
+        server.serve_forever()
+        server.server_close()
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+        for pid in list(self._worker_started_at):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def serve_forever(self):
+        self.bind()
+        if self.before_fork is not None:
+            self.before_fork()
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        for _ in range(self.workers):
+            self.spawn_worker()
+        print(f" * Serving on http://{self.host}:{self.port} with {self.workers} worker process(es). (Master PID {os.getpid()}.)",
+              file=sys.stderr)
+
+        while self._worker_started_at:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            started_at = self._worker_started_at.pop(pid, None)
+            if started_at is None or self.stopping:
+                continue
+            print(f" * Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting it.", file=sys.stderr)
+            if time.monotonic() - started_at < RESTART_BACKOFF_SECONDS:
+                time.sleep(RESTART_BACKOFF_SECONDS)
+            if not self.stopping:
+                self.spawn_worker()
+        self.listener.close()
+
+
+#######################################################
+######## COMMAND LINE INTERFACE FOR THE LAUNCHER ######
+#######################################################
+
+
+def parse_bind_address(bind: str):
+    host, _, port = bind.rpartition(":")
+    return host.strip("[]") or "127.0.0.1", int(port)
+
+def build_argument_parser(description: str = "Serve a WSGI application from pre-forked worker processes."):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--bind", default="127.0.0.1:5555", help="Address to listen on, as `host:port`.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes. (Default: one per CPU.)")
+    parser.add_argument("--backlog", type=int, default=2048, help="Pending connections the socket may queue.")
+    return parser
+
+# Serves an application with options from the command line. (Used by each app's `wsgi.py`.)
+def serve_from_command_line(application, before_fork=None, after_fork=None, argv=None):
+    arguments = build_argument_parser().parse_args(argv)
+    host, port = parse_bind_address(arguments.bind)
+    PreforkServer(application, host=host, port=port, workers=arguments.workers, before_fork=before_fork,
+                  after_fork=after_fork, backlog=arguments.backlog).serve_forever()
+
+
+if __name__ == "__main__":
+    parser = build_argument_parser()
+    parser.add_argument("target", help="Application to serve, as `module:attribute`. (e.g. `wsgi:application`)")
+    arguments = parser.parse_args()
+    module_name, _, attribute = arguments.target.partition(":")
+    sys.path.insert(0, os.getcwd())
+    module = importlib.import_module(module_name)
+    host, port = parse_bind_address(arguments.bind)
+    PreforkServer(getattr(module, attribute or "application"), host=host, port=port, workers=arguments.workers,
+                  before_fork=getattr(module, "before_fork", None), after_fork=getattr(module, "after_fork", None),
+                  backlog=arguments.backlog).serve_forever()
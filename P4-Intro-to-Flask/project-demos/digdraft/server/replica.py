@@ -0,0 +1,307 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from dataclasses import dataclass
+from threading import Lock, Thread
+import sys
+import time
+
+from sqlalchemy import event, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from config import app, db
+
+from models import Mob, Biome, Spawn
+
+from caching import table_versions
+
+
+"""
+An in-process, read-only snapshot of the reference tables (mobs and biomes).
+
+    from replica import reference_replica
+    mobs = reference_replica.table(Mob)      # None while disabled
+    mobs.get(3), mobs.named("Zombie"), mobs.records
+
+Each table is loaded with one query into immutable, `__slots__`-backed records
+that are indexed by ID and by name. Readers never lock and never reload; they
+hold whichever `RecordTable` was current when they asked for it.
+
+    -> A committed write to a table bumps its version counter (see
+       `caching.py`), which marks its snapshot stale. The `after_commit`
+       session event below then starts a background thread that rebuilds the
+       stale tables on a separate connection and swaps each new `RecordTable`
+       in with a single assignment, so readers see either the old or the new
+       snapshot. The commit never waits on the reload, and writes committed
+       while one runs are folded into the next.
+    -> Until its rebuild is swapped in, a stale table is not served: readers
+       get None and fall back to SQL, so a read never returns data older than
+       the last commit and never waits on a reload. (This includes the event
+       loop of `asgi.py`.)
+    -> Versions are compared on every read, so a write made by another worker
+       forked by `wsgi.py` (whose counters live in shared memory) starts a
+       rebuild the same way.
+    -> Only the first load of a table runs on the reading request, and app
+       startup (see `warm_reference_replica()`) normally makes it.
+    -> Tables larger than `REFERENCE_REPLICA_MAX_ROWS` are not replicated, and
+       routes fall back to SQL for them.
+
+NOTE: Like the response cache, other multi-process servers never see writes
+      made by other processes, so they must disable the replica
+      (`DIGDRAFT_REFERENCE_REPLICA_ENABLED=0`).
+"""
+
+
+#######################################################
+######### IMMUTABLE RECORDS FOR REFERENCE ROWS ########
+#######################################################
+
+
+@dataclass(frozen=True, slots=True)
+class MobRecord:
+    id: int
+    name: str
+    hit_points: int
+    damage: int
+    speed: int
+    is_hostile: bool
+    can_spawn_during_daytime: bool
+
+    # Same output as `serialize(mob, rules=("-spawns",))`.
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+@dataclass(frozen=True, slots=True)
+class BiomeRecord:
+    id: int
+    name: str
+    elevation: str
+    rarity: str
+    is_in_overworld: bool
+    is_in_nether: bool
+    is_in_end: bool
+
+    # Same output as `serialize(biome, rules=("-spawns",))`.
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+REPLICATED_RECORDS = {
+    Mob: MobRecord,
+    Biome: BiomeRecord,
+}
+
+
+# One table's records, sorted by ID and indexed by ID and by name.
+@dataclass(frozen=True, slots=True)
+class RecordTable:
+    records: tuple
+    by_id: dict
+    by_name: dict
+    version: int
+    load_seconds: float
+
+    def get(self, record_id: int):
+        return self.by_id.get(record_id)
+
+    # Every record with exactly this name, in ID order. (Names are not unique.)
+    def named(self, name: str):
+        return self.by_name.get(name, ())
+
+    # Records in ID order, optionally only those with exactly this name.
+    def listed(self, name: str = None):
+        return self.records if name is None else self.named(name)
+
+    # Approximate bytes held by the records, their values, and both indexes.
+    def memory_bytes(self):
+        total = sys.getsizeof(self.records) + sys.getsizeof(self.by_id) + sys.getsizeof(self.by_name)
+        total += sum(sys.getsizeof(matches) for matches in self.by_name.values())
+        for record in self.records:
+            total += sys.getsizeof(record)
+            total += sum(sys.getsizeof(getattr(record, field)) for field in record.__slots__
+                         if not isinstance(getattr(record, field), bool) and getattr(record, field) is not None)
+        return total
+
+
+def build_record_table(record_class, rows, version: int, load_seconds: float):
+    records = tuple(record_class(*row) for row in rows)
+    by_name = {}
+    for record in records:
+        by_name.setdefault(record.name, []).append(record)
+    return RecordTable(
+        records=records,
+        by_id={record.id: record for record in records},
+        by_name={name: tuple(matches) for name, matches in by_name.items()},
+        version=version,
+        load_seconds=load_seconds,
+    )
+
+
+#######################################################
+######### ATOMICALLY SWAPPED REFERENCE SNAPSHOT #######
+#######################################################
+
+
+class ReferenceReplica:
+    def __init__(self):
+        self._tables = {}
+        self._skipped = {}
+        self._lock = Lock()
+        self._refresh_lock = Lock()
+        self._refresh_requested = False
+        self._refresher = None
+
+    def enabled(self):
+        return app.config["REFERENCE_REPLICA_ENABLED"]
+
+    # Returns the current records for a model, or None when it is not replicated or a write has committed since.
+    # NOTE: A stale table is rebuilt in the background (see `refresh_in_background()`) while the caller uses SQL.
+    def table(self, model):
+        if not self.enabled():
+            return None
+        version = table_versions.snapshot((model.__tablename__,))[0]
+        loaded = self._tables.get(model)
+        if loaded is not None and loaded.version == version:
+            return loaded
+        if self._skipped.get(model) == version:
+            return None
+        if loaded is not None:
+            self.refresh_in_background()
+            return None
+        return self.reload(model, version)
+
+    def reload(self, model, version: int):
+        with self._lock:
+            loaded = self._tables.get(model)
+            if loaded is not None and loaded.version == version:
+                return loaded
+            started_at = time.perf_counter()
+            # NOTE: A separate connection keeps this out of any session's transaction (including one that just committed).
+            with db.engine.connect() as connection:
+                columns = [model.__table__.columns[field] for field in REPLICATED_RECORDS[model].__slots__]
+                rows = connection.execute(select(*columns).order_by(model.id).limit(app.config["REFERENCE_REPLICA_MAX_ROWS"] + 1)).all()
+            if len(rows) > app.config["REFERENCE_REPLICA_MAX_ROWS"]:
+                self._tables.pop(model, None)
+                self._skipped[model] = version
+                return None
+            table = build_record_table(REPLICATED_RECORDS[model], rows, version, time.perf_counter() - started_at)
+            self._tables[model] = table
+            self._skipped.pop(model, None)
+            return table
+
+    # Loaded tables whose version has moved on since they were loaded.
+    def stale_models(self):
+        return [model for model, table in list(self._tables.items())
+                if table.version != table_versions.snapshot((model.__tablename__,))[0]]
+
+    # Rebuilds every stale table.
+    def refresh(self):
+        for model in self.stale_models():
+            self.reload(model, table_versions.snapshot((model.__tablename__,))[0])
+
+    # Runs `refresh()` on a background thread, or asks the running one to go again once it is done.
+    def refresh_in_background(self):
+        with self._refresh_lock:
+            self._refresh_requested = True
+            if self._refresher is None:
+                self._refresher = Thread(target=self._run_refreshes, name="reference-replica-refresh", daemon=True)
+                self._refresher.start()
+
+    def _run_refreshes(self):
+        while True:
+            with self._refresh_lock:
+                if not self._refresh_requested:
+                    self._refresher = None
+                    return
+                self._refresh_requested = False
+            try:
+                with app.app_context():
+                    self.refresh()
+            except Exception:
+                # NOTE: Readers use SQL while a table is stale, so a failed rebuild only costs speed until the next write.
+                app.logger.exception("Rebuilding the reference replica failed.")
+
+    # Waits for a background rebuild, if one is running. (For tests and benchmarks.)
+    def wait_for_refresh(self, timeout: float = None):
+        refresher = self._refresher
+        if refresher is not None:
+            refresher.join(timeout)
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+            self._skipped.clear()
+
+    def report(self):
+        tables = {}
+        for model in REPLICATED_RECORDS:
+            table = self._tables.get(model)
+            if table is not None:
+                tables[model.__tablename__] = {
+                    "rows": len(table.records),
+                    "version": table.version,
+                    "load_milliseconds": round(table.load_seconds * 1000, 3),
+                    "memory_bytes": table.memory_bytes(),
+                }
+            elif model in self._skipped:
+                tables[model.__tablename__] = {"skipped": f"More than {app.config['REFERENCE_REPLICA_MAX_ROWS']:,} rows."}
+        return {"enabled": self.enabled(), "max_rows": app.config["REFERENCE_REPLICA_MAX_ROWS"], "tables": tables}
+
+
+reference_replica = ReferenceReplica()
+
+
+# NOTE: Registered after (and therefore runs after) the listener in `caching.py` that bumps table versions.
+@event.listens_for(Session, "after_commit")
+def refresh_reference_replica(session):
+    if reference_replica.enabled() and reference_replica.stale_models():
+        reference_replica.refresh_in_background()
+
+
+# Each record type's spawn foreign key, and the key under which a spawn shows the row on its other side.
+SPAWN_SIDES = {
+    MobRecord: (Spawn.mob_id, "biome_id", "biome"),
+    BiomeRecord: (Spawn.biome_id, "mob_id", "mob"),
+}
+
+# The columns of a record's spawns; the only query needed to show a replicated mob or biome.
+def replicated_spawns_query(record):
+    foreign_key, _, _ = SPAWN_SIDES[type(record)]
+    return select(Spawn.id, Spawn.mob_id, Spawn.biome_id, Spawn.hour_spawned).where(foreign_key == record.id)
+
+# Same output as `serialize(row)` for a mob or biome with its spawns (rows of `replicated_spawns_query()`),
+# with the other side of each spawn taken from `other_table`.
+def replicated_with_spawns(record, spawns, other_table: RecordTable):
+    _, other_key, other_side = SPAWN_SIDES[type(record)]
+    serialized = record.to_dict()
+    serialized["spawns"] = []
+    for spawn in spawns:
+        other_record = other_table.get(spawn[other_key])
+        serialized["spawns"].append({**spawn, other_side: other_record.to_dict() if other_record is not None else None})
+    return serialized
+
+
+# Loads every reference table and prints how long it took and how much memory it holds. (Used at startup.)
+def warm_reference_replica():
+    if not reference_replica.enabled():
+        return
+    started_at = time.perf_counter()
+    try:
+        with app.app_context():
+            for model in REPLICATED_RECORDS:
+                reference_replica.table(model)
+    except OperationalError as error:
+        # NOTE: e.g. before `flask db upgrade` has created the tables. Reads load the replica once they exist.
+        print(f" * Reference replica not loaded: {error.orig}", file=sys.stderr)
+        return
+    report = reference_replica.report()
+    loaded = ", ".join(
+        f"{details['rows']:,} {table_name} rows ({details['memory_bytes'] / 1024:,.1f} KiB)" if "rows" in details
+        else f"{table_name} skipped ({details['skipped']})"
+        for table_name, details in report["tables"].items()
+    )
+    print(f" * Reference replica loaded {loaded} in {(time.perf_counter() - started_at) * 1000:.1f}ms.", file=sys.stderr)
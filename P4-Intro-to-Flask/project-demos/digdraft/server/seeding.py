@@ -0,0 +1,231 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from sqlalchemy import delete, insert, text
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import repeat
+import bcrypt
+import os
+import random
+import time
+
+from config import db
+
+from models import Player, Mob, Biome, Spawn, SpawnSummary, rebuild_spawn_summary
+
+
+"""
+A bulk seeding engine for Digdraft.
+
+A `SeedPlan` declares how many rows each table gets: the curated samples from
+`seed.py`, plus synthetic rows whose count grows with a scale factor. The
+plan is loaded by `seed_database()`, which:
+
+    -> Hashes every player's password with bcrypt in a process pool, while
+       mobs, biomes, and spawns are inserted in parallel.
+    -> Inserts rows with Core `executemany` in large batches on ONE connection,
+       with SQLite pragmas tuned for bulk loads (no fsync, in-memory journal).
+    -> Drops the spawn indexes and summary triggers during the load and
+       rebuilds them (and `spawn_summary_table`) once at the end, which is far
+       cheaper than maintaining them row by row.
+    -> Derives every generated value from `seed`, so the same plan and seed
+       always produce the same rows. (bcrypt salts are still random, so
+       password HASHES differ between runs while passwords do not.)
+
+Synthetic players log in with `synthetic_password(index)`, e.g. `player_0000042`
+uses `p4ssw0rd-42`.
+"""
+
+# Synthetic rows generated per unit of scale factor, on top of the curated samples.
+ROWS_PER_SCALE = {"players": 50, "mobs": 1000, "biomes": 1000, "spawns": 20000}
+
+INSERT_BATCH_SIZE = 50000
+
+# NOTE: Durability is traded for speed ONLY while seeding; previous values are restored afterwards.
+BULK_LOAD_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": "-262144",
+}
+
+SPAWN_SUMMARY_TRIGGER_NAMES = ("spawn_summary_after_insert", "spawn_summary_after_delete", "spawn_summary_after_update")
+
+
+#######################################################
+############ DECLARATIVE SEED PLANS AND ROWS ##########
+#######################################################
+
+
+@dataclass(frozen=True)
+class SeedPlan:
+    players: int
+    mobs: int
+    biomes: int
+    spawns: int
+    curated_players: tuple = ()
+    curated_mobs: tuple = ()
+    curated_biomes: tuple = ()
+    curated_spawns: tuple = ()
+
+    @classmethod
+    def from_scale(cls, scale: float, curated_players=(), curated_mobs=(), curated_biomes=(), curated_spawns=()):
+        counts = {table: len(curated) + round(per_scale * scale) for (table, per_scale), curated in zip(
+            ROWS_PER_SCALE.items(), (curated_players, curated_mobs, curated_biomes, curated_spawns))}
+        return cls(**counts, curated_players=tuple(curated_players), curated_mobs=tuple(curated_mobs),
+                   curated_biomes=tuple(curated_biomes), curated_spawns=tuple(curated_spawns))
+
+
+def synthetic_password(index: int):
+    return f"p4ssw0rd-{index}"
+
+# NOTE: Each table draws from its own generator, so changing one table's size never reshuffles another's rows.
+def table_generator(seed: int, table_name: str):
+    return random.Random(f"{seed}:{table_name}")
+
+# Yields `(row_without_password, password)` pairs; passwords are hashed separately.
+def generate_players(plan: SeedPlan, seed: int):
+    generator = table_generator(seed, "players")
+    for identifier, player in enumerate(plan.curated_players, start=1):
+        row = {key: value for key, value in player.items() if key != "password"}
+        yield dict(row, id=identifier), player["password"]
+    for index in range(len(plan.curated_players), plan.players):
+        yield {"id": index + 1, "username": f"player_{index:07d}", "kills": generator.randrange(1000),
+               "deaths": generator.randrange(1000), "experience": generator.randrange(100000)}, synthetic_password(index)
+
+def generate_mobs(plan: SeedPlan, seed: int):
+    generator = table_generator(seed, "mobs")
+    for identifier, mob in enumerate(plan.curated_mobs, start=1):
+        yield dict(mob, id=identifier)
+    for index in range(len(plan.curated_mobs), plan.mobs):
+        yield {"id": index + 1, "name": f"Mob {index:07d}", "hit_points": generator.randrange(1, 300),
+               "damage": generator.randrange(10), "speed": generator.randrange(1, 6),
+               "is_hostile": generator.random() < 0.5, "can_spawn_during_daytime": generator.random() < 0.5}
+
+def generate_biomes(plan: SeedPlan, seed: int):
+    generator = table_generator(seed, "biomes")
+    for identifier, biome in enumerate(plan.curated_biomes, start=1):
+        yield dict(biome, id=identifier)
+    for index in range(len(plan.curated_biomes), plan.biomes):
+        dimension = generator.randrange(3)
+        yield {"id": index + 1, "name": f"Biome {index:07d}", "elevation": generator.choice(("low", "base", "high")),
+               "rarity": generator.choice(("common", "uncommon", "rare", "very rare")),
+               "is_in_overworld": dimension == 0, "is_in_nether": dimension == 1, "is_in_end": dimension == 2}
+
+# NOTE: Curated spawns reference curated mobs and biomes by their position (starting at 1).
+def generate_spawns(plan: SeedPlan, seed: int):
+    generator = table_generator(seed, "spawns")
+    for identifier, spawn in enumerate(plan.curated_spawns, start=1):
+        yield dict(spawn, id=identifier)
+    if not plan.mobs or not plan.biomes:
+        return
+    for index in range(len(plan.curated_spawns), plan.spawns):
+        yield {"id": index + 1, "mob_id": generator.randint(1, plan.mobs), "biome_id": generator.randint(1, plan.biomes),
+               "hour_spawned": generator.randrange(24)}
+
+
+#######################################################
+######### PARALLEL HASHING AND BATCHED INSERTS ########
+#######################################################
+
+
+def hash_password(password: str, rounds: int):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+@contextmanager
+def bulk_load_pragmas(connection):
+    if connection.dialect.name != "sqlite":
+        yield
+        return
+    previous = {pragma: connection.exec_driver_sql(f"PRAGMA {pragma}").scalar() for pragma in BULK_LOAD_PRAGMAS}
+    for pragma, value in BULK_LOAD_PRAGMAS.items():
+        connection.exec_driver_sql(f"PRAGMA {pragma} = {value}")
+    try:
+        yield
+    finally:
+        for pragma, value in previous.items():
+            connection.exec_driver_sql(f"PRAGMA {pragma} = {value}")
+
+# Inserts rows from an iterable in `executemany` batches, committing after each batch.
+def insert_in_batches(connection, table, rows, batch_size: int = INSERT_BATCH_SIZE):
+    batch, inserted = [], 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            connection.execute(insert(table), batch)
+            connection.commit()
+            inserted += len(batch)
+            batch = []
+    if batch:
+        connection.execute(insert(table), batch)
+        connection.commit()
+        inserted += len(batch)
+    return inserted
+
+
+#######################################################
+########### EXPORTABLE SEEDING ENGINE FUNCTION ########
+#######################################################
+
+
+# Loads a seed plan into the database and returns per-table row counts and timings.
+# NOTE: Existing players, mobs, biomes, and spawns are deleted first.
+def seed_database(plan: SeedPlan, seed: int = 42, rounds: int = 12, workers: int = None, report=print):
+    workers = workers or os.cpu_count() or 1
+    timings = {}
+    db.create_all()
+    db.session.remove()
+    spawn_indexes = list(Spawn.__table__.indexes)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor, db.engine.connect() as connection:
+        with bulk_load_pragmas(connection):
+            started_at = time.perf_counter()
+            for trigger_name in SPAWN_SUMMARY_TRIGGER_NAMES:
+                connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger_name}"))
+            for index in spawn_indexes:
+                index.drop(bind=connection, checkfirst=True)
+            for model in (SpawnSummary, Spawn, Player, Mob, Biome):
+                connection.execute(delete(model))
+            connection.commit()
+            timings["reset"] = time.perf_counter() - started_at
+
+            # NOTE: Hashing starts first so that it overlaps with every other table's inserts.
+            player_rows, passwords = [], []
+            for row, password in generate_players(plan, seed):
+                player_rows.append(row)
+                passwords.append(password)
+            chunk_size = max(1, len(passwords) // (workers * 4))
+            hashed_passwords = executor.map(hash_password, passwords, repeat(rounds), chunksize=chunk_size)
+
+            for name, model, rows in (("mobs", Mob, generate_mobs(plan, seed)),
+                                      ("biomes", Biome, generate_biomes(plan, seed)),
+                                      ("spawns", Spawn, generate_spawns(plan, seed))):
+                started_at = time.perf_counter()
+                inserted = insert_in_batches(connection, model.__table__, rows)
+                timings[name] = time.perf_counter() - started_at
+                report(f"\t>> Inserted {inserted:,} {name} in {timings[name]:.2f}s.")
+
+            started_at = time.perf_counter()
+            inserted = insert_in_batches(connection, Player.__table__, (
+                dict(row, password=hashed) for row, hashed in zip(player_rows, hashed_passwords)))
+            timings["players"] = time.perf_counter() - started_at
+            report(f"\t>> Inserted {inserted:,} players in {timings['players']:.2f}s. (Includes waiting on {workers} bcrypt worker(s).)")
+
+            started_at = time.perf_counter()
+            for index in spawn_indexes:
+                index.create(bind=connection, checkfirst=True)
+            connection.commit()
+            timings["indexes"] = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    rebuild_spawn_summary()
+    timings["spawn_summary"] = time.perf_counter() - started_at
+    report(f"\t>> Rebuilt spawn indexes and summary in {timings['indexes'] + timings['spawn_summary']:.2f}s.")
+    return {"players": plan.players, "mobs": plan.mobs, "biomes": plan.biomes, "spawns": plan.spawns,
+            "seconds": {name: round(seconds, 3) for name, seconds in timings.items()}}
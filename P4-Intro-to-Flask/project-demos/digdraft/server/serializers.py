@@ -0,0 +1,203 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from datetime import datetime
+from operator import attrgetter
+from threading import Lock
+
+from sqlalchemy import inspect as sql_inspect
+from sqlalchemy.orm import ColumnProperty, RelationshipProperty
+from sqlalchemy_serializer import SerializerMixin
+from sqlalchemy_serializer.serializer import Serializer
+from sqlalchemy_serializer.lib.schema import Schema
+
+from instrumentation import timed_function
+
+
+#######################################################
+######### COMPILED SERIALIZATION FOR MODELS ###########
+#######################################################
+
+
+"""
+`SerializerMixin.to_dict(rules=...)` rebuilds its rule tree, re-inspects the
+model's columns and relationships, and dispatches on every value's type for
+every row it serializes. For a given model class and set of rules, however,
+the shape of the output never changes.
+
+This module walks that shape ONCE (using `sqlalchemy_serializer`'s own rule
+engine, so the result matches `to_dict()` exactly) and builds a closure over
+the included keys that creates the dictionary directly. It reads every value
+with one `operator.attrgetter`, and only converts the few that need it (e.g.
+datetimes and nested relationships).
+
+Compiled functions are cached per (model, only, rules), so every call after
+the first costs only attribute lookups.
+
+USAGE:
+    serialize(mob, rules=("-spawns",))          # same output as mob.to_dict(rules=("-spawns",))
+    serialize_many(mobs, rules=("-spawns",))
+"""
+
+# Column types whose values SQLAlchemy already returns as JSON-compatible atomics.
+ATOMIC_PYTHON_TYPES = (int, str, float, bool)
+
+# Guards against rule sets that would recurse forever. (`to_dict()` would hit a RecursionError.)
+MAX_COMPILED_DEPTH = 16
+
+# Options that change `to_dict()` output per model; compiled serializers only handle the defaults.
+SERIALIZER_DEFAULTS = {
+    "date_format": SerializerMixin.date_format,
+    "datetime_format": SerializerMixin.datetime_format,
+    "time_format": SerializerMixin.time_format,
+    "decimal_format": SerializerMixin.decimal_format,
+    "serialize_types": SerializerMixin.serialize_types,
+    "exclude_values": SerializerMixin.exclude_values,
+    "serialize_columns": SerializerMixin.serialize_columns,
+    "serialize_only": SerializerMixin.serialize_only,
+    "serializable_keys": SerializerMixin.serializable_keys,
+    "auto_serialize_properties": SerializerMixin.auto_serialize_properties,
+}
+
+
+class NotCompilable(Exception):
+    pass
+
+
+def format_datetime(value):
+    return None if value is None else value.strftime(SerializerMixin.datetime_format)
+
+# Fallback for column types without a dedicated fast path. (Dates, decimals, UUIDs, etc.)
+_generic_serializer = Serializer()
+
+def format_generic(value):
+    return _generic_serializer.apply_callback(value)
+
+
+def check_compilable(model):
+    for option, default in SERIALIZER_DEFAULTS.items():
+        if getattr(model, option) != default:
+            raise NotCompilable(f"`{model.__name__}.{option}` is customized.")
+    if model.get_tzinfo is not SerializerMixin.get_tzinfo or model.max_serialization_depth != SerializerMixin.max_serialization_depth:
+        raise NotCompilable(f"`{model.__name__}` customizes time zones or serialization depth.")
+
+
+# Mirrors `Serializer.serialize_model()`, returning a function that builds the dictionary instead of values.
+def plan_model(model, schema: Schema, depth: int):
+    if depth > MAX_COMPILED_DEPTH:
+        raise NotCompilable(f"Serialization rules for `{model.__name__}` recurse too deeply.")
+    check_compilable(model)
+    mapper = sql_inspect(model)
+
+    schema.update(only=model.serialize_only, extend=model.serialize_rules)
+    keys = schema.keys
+    if schema.is_greedy:
+        keys.update(attribute.key for attribute in mapper.attrs)
+
+    included_keys, conversions = [], []
+    for key in sorted(keys):
+        if not schema.is_included(key=key):
+            continue
+        attribute = mapper.attrs.get(key)
+        if isinstance(attribute, ColumnProperty):
+            convert = plan_column(attribute)
+        elif isinstance(attribute, RelationshipProperty):
+            nested = plan_model(attribute.mapper.class_, schema.fork(key=key), depth + 1)
+            convert = plan_collection(nested) if attribute.uselist else plan_optional(nested)
+        else:
+            raise NotCompilable(f"`{model.__name__}.{key}` is neither a column nor a relationship.")
+        included_keys.append(key)
+        if convert is not None:
+            conversions.append((key, convert))
+    return build_model_serializer(tuple(included_keys), tuple(conversions))
+
+# Returns how to convert a column's value, or None when it is already JSON-compatible.
+def plan_column(attribute: ColumnProperty):
+    try:
+        python_type = attribute.columns[0].type.python_type
+    except NotImplementedError:
+        python_type = None
+    if python_type in ATOMIC_PYTHON_TYPES:
+        return None
+    if python_type is datetime:
+        return format_datetime
+    return plan_optional(format_generic)
+
+def plan_collection(serialize_item):
+    return lambda items: [serialize_item(item) for item in items]
+
+def plan_optional(convert):
+    return lambda value: None if value is None else convert(value)
+
+# Reads every included attribute with one `attrgetter`, then converts the few values that need it.
+def build_model_serializer(keys: tuple, conversions: tuple):
+    if not keys:
+        return lambda obj: {}
+    get_values = attrgetter(*keys) if len(keys) > 1 else (lambda obj, key=keys[0]: (getattr(obj, key),))
+    if not conversions:
+        return lambda obj: dict(zip(keys, get_values(obj)))
+
+    def serialize_model(obj):
+        serialized = dict(zip(keys, get_values(obj)))
+        for key, convert in conversions:
+            serialized[key] = convert(serialized[key])
+        return serialized
+    return serialize_model
+
+
+def compile_serializer(model, only=(), rules=()):
+    schema = Schema()
+    schema.update(only=only, extend=rules)
+    return plan_model(model, schema, 0)
+
+
+#######################################################
+############# CACHED SERIALIZER REGISTRY ##############
+#######################################################
+
+
+_compiled_serializers = {}
+_compiled_serializers_lock = Lock()
+
+def get_serializer(model, only=(), rules=()):
+    cache_key = (model, tuple(only), tuple(rules))
+    compiled = _compiled_serializers.get(cache_key)
+    if compiled is None:
+        with _compiled_serializers_lock:
+            compiled = _compiled_serializers.get(cache_key)
+            if compiled is None:
+                try:
+                    compiled = compile_serializer(model, only=only, rules=rules)
+                except NotCompilable:
+                    # NOTE: Fall back to the original serializer for unsupported configurations.
+                    compiled = lambda obj: obj.to_dict(only=only, rules=rules)
+                _compiled_serializers[cache_key] = compiled
+    return compiled
+
+
+#######################################################
+###### EXPORTABLE SERIALIZATION UTILITY FUNCTIONS #####
+#######################################################
+
+
+# Drop-in replacement for `obj.to_dict(only=..., rules=...)`.
+@timed_function("serialize")
+def serialize(obj, only=(), rules=()):
+    return get_serializer(type(obj), only=only, rules=rules)(obj)
+
+# Serializes an iterable of same-typed model instances.
+@timed_function("serialize")
+def serialize_many(objects, only=(), rules=()):
+    compiled = None
+    serialized = []
+    for obj in objects:
+        if compiled is None:
+            compiled = get_serializer(type(obj), only=only, rules=rules)
+        serialized.append(compiled(obj))
+    return serialized
+
+# Returns objects whose compiled output differs from `to_dict()`. (Empty when in parity.)
+def find_parity_mismatches(objects, only=(), rules=()):
+    return [obj for obj in objects if serialize(obj, only=only, rules=rules) != obj.to_dict(only=only, rules=rules)]
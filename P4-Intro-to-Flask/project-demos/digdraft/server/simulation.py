@@ -0,0 +1,332 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from dataclasses import dataclass
+from threading import Lock
+import time
+
+import numpy as np
+from sqlalchemy import func, select
+
+from config import app, db
+
+from models import Mob, Biome, Spawn
+
+from caching import table_versions
+
+
+"""
+Simulates which mobs spawn in which biomes over a range of ticks (one tick is
+one in-game hour, so tick `t` falls at hour `t % 24`).
+
+Every (tick, biome, mob) combination is a candidate. Its chance to spawn is
+
+    SIMULATION_BASE_CHANCE x rarity weight of the biome
+                           x the mob's activity at that hour
+                           x 0 if the mob cannot live in the biome's dimensions
+                           x 0 if it is daytime and the mob cannot spawn by day
+
+    -> Rarity weights come from `RARITY_WEIGHTS` (`common` = 1.0 ... `very rare` = 0.05).
+    -> A mob's activity is read from the hours of its recorded spawns, smoothed
+       so that an hour with no recorded spawns keeps a small chance. (A mob with
+       no spawns at all is equally active at every hour.) Activity averages 1.
+    -> A mob lives in every dimension it has a recorded spawn in, or only in the
+       overworld when it has none.
+
+Mobs and biomes are loaded ONCE into columnar NumPy arrays (a `SpawnWorld`).
+Candidates are then evaluated a chunk of ticks at a time as one `(ticks,
+biomes, mobs)` array operation, rather than one Python loop iteration each.
+Every `SEED_TICKS` consecutive ticks (aligned to tick 0) share one generator
+seeded with `(seed, tick // SEED_TICKS)`. Its draws are laid out tick by tick,
+then biome, then mob, and a chunk skips straight to its first draw with
+`advance()`. So a tick's spawns are the same whichever tick range or chunk
+size it is simulated in, while generators are created per block of ticks
+rather than per tick. (That Python work would otherwise dominate small worlds.)
+"""
+
+# Hours of the day (inclusive start, exclusive end) during which only daytime mobs spawn.
+DAYTIME_HOURS = (6, 18)
+
+# Relative chance of spawning in a biome of each rarity. (Unknown rarities count as `common`.)
+RARITY_WEIGHTS = {
+    "common": 1.0,
+    "uncommon": 0.5,
+    "rare": 0.2,
+    "very rare": 0.05,
+}
+
+# Consecutive ticks drawing from one generator. (See `draw_uniforms()`.)
+SEED_TICKS = 4096
+
+# One bit per dimension, in the order of the biome flags.
+DIMENSION_BITS = {"overworld": 1, "nether": 2, "end": 4}
+
+# Tables the loaded world depends on. (It is reloaded when any of their versions change.)
+WORLD_MODELS = (Mob, Biome, Spawn)
+
+
+#######################################################
+######### COLUMNAR WORLD LOADED FROM THE DATABASE #####
+#######################################################
+
+
+# Positions of `values` in the sorted array `ids`, and whether each value was found there.
+def locate(ids: np.ndarray, values: np.ndarray):
+    if not len(ids):
+        return np.zeros(len(values), dtype=np.int64), np.zeros(len(values), dtype=bool)
+    positions = np.minimum(np.searchsorted(ids, values), len(ids) - 1)
+    return positions, ids[positions] == values
+
+
+# Columnar arrays for every mob and biome, ordered by ID.
+@dataclass(frozen=True)
+class SpawnWorld:
+    mob_ids: np.ndarray
+    mob_names: np.ndarray
+    mob_spawns_by_day: np.ndarray
+    mob_dimensions: np.ndarray
+    mob_activity: np.ndarray
+    biome_ids: np.ndarray
+    biome_names: np.ndarray
+    biome_weights: np.ndarray
+    biome_dimensions: np.ndarray
+
+    # Positions of the given IDs in `ids`. Raises ValueError for IDs that do not exist.
+    @staticmethod
+    def positions(ids: np.ndarray, requested_ids, label: str):
+        if requested_ids is None:
+            return np.arange(len(ids))
+        requested_ids = np.unique(np.asarray(requested_ids, dtype=np.int64))
+        positions, found = locate(ids, requested_ids)
+        if not found.all():
+            missing = ", ".join(str(identifier) for identifier in requested_ids[~found])
+            raise ValueError(f"{label} ID(s) not found in database: {missing}.")
+        return positions
+
+    # Positions of the biomes in the given dimension.
+    def biomes_in(self, dimension: str):
+        if dimension not in DIMENSION_BITS:
+            raise ValueError(f"Unknown dimension `{dimension}`. Expected one of: {', '.join(DIMENSION_BITS)}.")
+        return np.flatnonzero(self.biome_dimensions & DIMENSION_BITS[dimension])
+
+
+def load_spawn_world():
+    mobs = db.session.execute(select(Mob.id, Mob.name, Mob.can_spawn_during_daytime).order_by(Mob.id)).all()
+    biomes = db.session.execute(
+        select(Biome.id, Biome.name, Biome.rarity, Biome.is_in_overworld, Biome.is_in_nether, Biome.is_in_end).order_by(Biome.id)
+    ).all()
+    mob_ids = np.array([row[0] for row in mobs], dtype=np.int64)
+    biome_ids = np.array([row[0] for row in biomes], dtype=np.int64)
+    biome_dimensions = np.array(
+        [DIMENSION_BITS["overworld"] * bool(overworld) | DIMENSION_BITS["nether"] * bool(nether) | DIMENSION_BITS["end"] * bool(end)
+         for _, _, _, overworld, nether, end in biomes],
+        dtype=np.uint8
+    )
+
+    # Recorded spawns per mob and hour. (Read from the `(mob_id, hour_spawned)` index alone.)
+    hour_counts = np.zeros((len(mob_ids), 24), dtype=np.float64)
+    rows = db.session.execute(
+        select(Spawn.mob_id, Spawn.hour_spawned, func.count())
+        .where(Spawn.mob_id.is_not(None), Spawn.hour_spawned.between(0, 23))
+        .group_by(Spawn.mob_id, Spawn.hour_spawned)
+    ).all()
+    if rows:
+        spawn_mob_ids, hours, counts = (np.array(column, dtype=np.int64) for column in zip(*rows))
+        positions, known = locate(mob_ids, spawn_mob_ids)
+        np.add.at(hour_counts, (positions[known], hours[known]), counts[known])
+    # NOTE: Add-one smoothing keeps every hour possible and makes a mob without spawns uniformly active.
+    mob_activity = 24 * (hour_counts + 1) / (hour_counts.sum(axis=1, keepdims=True) + 24)
+
+    # Dimensions each mob has spawned in.
+    mob_dimensions = np.zeros(len(mob_ids), dtype=np.uint8)
+    spawned_biomes = select(Spawn.mob_id, Spawn.biome_id).where(Spawn.mob_id.is_not(None)).distinct().subquery()
+    rows = db.session.execute(select(spawned_biomes.c.mob_id, spawned_biomes.c.biome_id)).all()
+    if rows:
+        spawn_mob_ids, spawn_biome_ids = (np.array([-1 if value is None else value for value in column], dtype=np.int64)
+                                          for column in zip(*rows))
+        mob_positions, known_mobs = locate(mob_ids, spawn_mob_ids)
+        biome_positions, known_biomes = locate(biome_ids, spawn_biome_ids)
+        known = known_mobs & known_biomes
+        np.bitwise_or.at(mob_dimensions, mob_positions[known], biome_dimensions[biome_positions[known]])
+    mob_dimensions[mob_dimensions == 0] = DIMENSION_BITS["overworld"]
+
+    return SpawnWorld(
+        mob_ids=mob_ids,
+        mob_names=np.array([row[1] for row in mobs], dtype=object),
+        mob_spawns_by_day=np.array([bool(row[2]) for row in mobs], dtype=bool),
+        mob_dimensions=mob_dimensions,
+        mob_activity=mob_activity.astype(np.float32),
+        biome_ids=biome_ids,
+        biome_names=np.array([row[1] for row in biomes], dtype=object),
+        biome_weights=np.array([RARITY_WEIGHTS.get(row[2], RARITY_WEIGHTS["common"]) for row in biomes], dtype=np.float32),
+        biome_dimensions=biome_dimensions,
+    )
+
+
+_world_lock = Lock()
+_loaded_world = (None, None)
+
+# Returns the loaded world, reloading it only after a committed write to mobs, biomes, or spawns.
+# NOTE: Relies on the response cache's version counters, so it is only reused while that cache is enabled.
+def current_spawn_world():
+    global _loaded_world
+    if not app.config["RESPONSE_CACHE_ENABLED"]:
+        return load_spawn_world()
+    versions = table_versions.snapshot(tuple(model.__tablename__ for model in WORLD_MODELS))
+    with _world_lock:
+        loaded_versions, world = _loaded_world
+        if world is None or loaded_versions != versions:
+            world = load_spawn_world()
+            _loaded_world = (versions, world)
+        return world
+
+
+#######################################################
+########### VECTORIZED SPAWN SIMULATION ###############
+#######################################################
+
+
+# Fills `out` (shaped `(ticks, biomes in block, mobs)`) with the uniform draws of those candidates.
+# NOTE: Each 64-bit output of the generator yields two 32-bit draws, while `advance()` counts outputs.
+#       An odd number of draws to skip is therefore finished by drawing (and dropping) one.
+#       A block narrower than all `biome_count` biomes is only ever used within a single tick.
+def draw_uniforms(seed: int, ticks: range, block: slice, biome_count: int, mob_count: int, out: np.ndarray):
+    block_start, block_stop, _ = block.indices(biome_count)
+    if (block_start, block_stop) != (0, biome_count) and len(ticks) != 1:
+        raise ValueError("Partial biome blocks must cover a single tick.")
+    tick = ticks.start
+    while tick < ticks.stop:
+        group = tick // SEED_TICKS
+        group_stop = min(ticks.stop, (group + 1) * SEED_TICKS)
+        generator = np.random.default_rng((seed, group))
+        skipped = ((tick - group * SEED_TICKS) * biome_count + block_start) * mob_count
+        generator.bit_generator.advance(skipped // 2)
+        if skipped % 2:
+            generator.random(dtype=np.float32)
+        generator.random(dtype=np.float32, out=out[tick - ticks.start:group_stop - ticks.start].reshape(-1))
+        tick = group_stop
+
+
+@dataclass(frozen=True)
+class SpawnSimulation:
+    seed: int
+    from_tick: int
+    to_tick: int
+    biome_ids: np.ndarray
+    biome_names: np.ndarray
+    mob_ids: np.ndarray
+    mob_names: np.ndarray
+    candidates: int
+    eligible_candidates: int
+    spawns_by_hour: np.ndarray
+    spawns_by_biome: np.ndarray
+    spawns_by_mob: np.ndarray
+    events: list
+    seconds: float
+
+    @property
+    def spawns(self):
+        return int(self.spawns_by_hour.sum())
+
+
+# Simulates ticks `from_tick` (inclusive) to `to_tick` (exclusive) for the given biomes and mobs. (Default: all.)
+# NOTE: Keeps the first `event_limit` spawns as `(tick, biome_id, mob_id)`, ordered by tick, biome, and mob.
+def simulate_spawns(world: SpawnWorld, from_tick: int = 0, to_tick: int = 24, biome_ids=None, mob_ids=None,
+                    dimension: str = None, seed: int = 0, event_limit: int = 0, base_chance: float = None,
+                    max_candidates: int = None, chunk_candidates: int = None):
+    base_chance = app.config["SIMULATION_BASE_CHANCE"] if base_chance is None else base_chance
+    chunk_candidates = chunk_candidates or app.config["SIMULATION_CHUNK_CANDIDATES"]
+    if not 0 <= from_tick < to_tick:
+        raise ValueError("Ticks must satisfy `0 <= from_tick < to_tick`.")
+    biome_positions = SpawnWorld.positions(world.biome_ids, biome_ids, "Biome")
+    if dimension is not None:
+        biome_positions = np.intersect1d(biome_positions, world.biomes_in(dimension))
+    mob_positions = SpawnWorld.positions(world.mob_ids, mob_ids, "Mob")
+    biome_count, mob_count, tick_count = len(biome_positions), len(mob_positions), to_tick - from_tick
+    candidates = tick_count * biome_count * mob_count
+    if max_candidates is not None and candidates > max_candidates:
+        raise ValueError(f"{candidates:,} candidate (tick, biome, mob) combinations requested. (Maximum: {max_candidates:,}.) "
+                         "Narrow the tick range, biomes, or mobs.")
+
+    started_at = time.perf_counter()
+    # Chance per (hour, mob) and per biome; their product is the chance per candidate.
+    hour_chances = base_chance * world.mob_activity[mob_positions].T
+    daytime = np.zeros(24, dtype=bool)
+    daytime[DAYTIME_HOURS[0]:DAYTIME_HOURS[1]] = True
+    hour_chances[np.ix_(daytime, ~world.mob_spawns_by_day[mob_positions])] = 0
+    hour_chances = np.ascontiguousarray(hour_chances, dtype=np.float32)
+    biome_weights = world.biome_weights[biome_positions]
+    habitable = (world.biome_dimensions[biome_positions, None] & world.mob_dimensions[None, mob_positions]) != 0
+    habitable_per_mob = habitable.sum(axis=0)
+
+    spawns_by_hour = np.zeros(24, dtype=np.int64)
+    spawns_by_biome = np.zeros(biome_count, dtype=np.int64)
+    spawns_by_mob = np.zeros(mob_count, dtype=np.int64)
+    eligible_candidates = 0
+    events = []
+
+    if candidates:
+        # NOTE: Chunks span several ticks of the whole world, or a block of biomes within one tick.
+        biome_block = max(1, min(biome_count, chunk_candidates // mob_count))
+        tick_block = max(1, chunk_candidates // (biome_block * mob_count)) if biome_block == biome_count else 1
+        for chunk_start in range(from_tick, to_tick, tick_block):
+            tick_range = range(chunk_start, min(chunk_start + tick_block, to_tick))
+            ticks = np.arange(tick_range.start, tick_range.stop)
+            hours = ticks % 24
+            eligible_candidates += int(((hour_chances[hours] > 0) @ habitable_per_mob).sum())
+            for block_start in range(0, biome_count, biome_block):
+                block = slice(block_start, block_start + biome_block)
+                # (ticks, biomes, mobs) chance of each candidate, zeroed outside each mob's dimensions.
+                chances = biome_weights[None, block, None] * hour_chances[hours][:, None, :]
+                chances *= habitable[None, block, :]
+                draws = np.empty_like(chances)
+                draw_uniforms(seed, tick_range, block, biome_count, mob_count, draws)
+                spawned = draws < chances
+
+                per_tick = np.count_nonzero(spawned, axis=(1, 2))
+                spawns_by_hour += np.bincount(hours, weights=per_tick, minlength=24).astype(np.int64)
+                spawns_by_biome[block] += np.count_nonzero(spawned, axis=(0, 2))
+                spawns_by_mob += np.count_nonzero(spawned, axis=(0, 1))
+                if len(events) < event_limit and per_tick.any():
+                    tick_indexes, biome_indexes, mob_indexes = np.nonzero(spawned)
+                    needed = event_limit - len(events)
+                    events.extend(zip(
+                        ticks[tick_indexes[:needed]].tolist(),
+                        world.biome_ids[biome_positions[block][biome_indexes[:needed]]].tolist(),
+                        world.mob_ids[mob_positions[mob_indexes[:needed]]].tolist()
+                    ))
+
+    return SpawnSimulation(
+        seed=seed, from_tick=from_tick, to_tick=to_tick,
+        biome_ids=world.biome_ids[biome_positions], biome_names=world.biome_names[biome_positions],
+        mob_ids=world.mob_ids[mob_positions], mob_names=world.mob_names[mob_positions],
+        candidates=candidates, eligible_candidates=eligible_candidates,
+        spawns_by_hour=spawns_by_hour, spawns_by_biome=spawns_by_biome, spawns_by_mob=spawns_by_mob,
+        events=events, seconds=time.perf_counter() - started_at,
+    )
+
+
+# JSON-ready summary of a simulation. (Timing is left out, so that equal inputs give equal payloads.)
+def simulation_summary(simulation: SpawnSimulation):
+    return {
+        "seed": simulation.seed,
+        "from_tick": simulation.from_tick,
+        "to_tick": simulation.to_tick,
+        "biome_count": len(simulation.biome_ids),
+        "mob_count": len(simulation.mob_ids),
+        "candidates": simulation.candidates,
+        "eligible_candidates": simulation.eligible_candidates,
+        "spawns": simulation.spawns,
+        "spawns_by_hour": [{"hour": hour, "spawn_count": int(count)} for hour, count in enumerate(simulation.spawns_by_hour)],
+        "spawns_by_biome": [
+            {"biome_id": int(biome_id), "biome_name": name, "spawn_count": int(count)}
+            for biome_id, name, count in zip(simulation.biome_ids, simulation.biome_names, simulation.spawns_by_biome)
+        ],
+        "spawns_by_mob": [
+            {"mob_id": int(mob_id), "mob_name": name, "spawn_count": int(count)}
+            for mob_id, name, count in zip(simulation.mob_ids, simulation.mob_names, simulation.spawns_by_mob)
+        ],
+        "events": [{"tick": tick, "hour": tick % 24, "biome_id": biome_id, "mob_id": mob_id} for tick, biome_id, mob_id in simulation.events],
+    }
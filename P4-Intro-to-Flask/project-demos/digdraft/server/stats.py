@@ -0,0 +1,81 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+from sqlalchemy import case, distinct, func, select
+
+from config import db
+
+from models import Mob, Biome, Spawn, SpawnSummary
+
+
+#######################################################
+######### AGGREGATE STATISTICS COMPUTED IN SQL ########
+#######################################################
+
+
+"""
+Each function below pushes its aggregation into a single GROUP BY query, so
+only the summarized rows (never every mob, biome, or spawn) leave SQLite.
+
+Spawn distributions can be read either `live` (grouped over `spawn_table`) or
+from the trigger-maintained `summary` table, whose size depends only on the
+number of biomes and hours rather than on the number of spawns.
+"""
+
+STAT_SOURCES = ("summary", "live")
+
+
+# Average hit points of the distinct mobs that spawn in each biome.
+# NOTE: `AVG()` skips NULL hit points, and is NULL (so `None`) when no mob in the biome has any.
+def average_hit_points_per_biome():
+    spawned_pairs = select(Spawn.biome_id, Spawn.mob_id).distinct().subquery()
+    query = (
+        select(Biome.id, Biome.name, func.avg(Mob.hit_points), func.count(Mob.id))
+        .join(spawned_pairs, spawned_pairs.c.biome_id == Biome.id)
+        .join(Mob, Mob.id == spawned_pairs.c.mob_id)
+        .group_by(Biome.id, Biome.name)
+        .order_by(Biome.id)
+    )
+    return [
+        {"biome_id": biome_id, "biome_name": name, "average_hit_points": round(average, 2) if average is not None else None, "mob_count": mob_count}
+        for biome_id, name, average, mob_count in db.session.execute(query)
+    ]
+
+# Number of distinct hostile mobs that spawn in each dimension.
+def hostile_mob_counts_by_dimension():
+    dimensions = {"overworld": Biome.is_in_overworld, "nether": Biome.is_in_nether, "end": Biome.is_in_end}
+    query = (
+        select(*[func.count(distinct(case((flag.is_(True), Mob.id)))).label(name) for name, flag in dimensions.items()])
+        .select_from(Spawn)
+        .join(Mob, Mob.id == Spawn.mob_id)
+        .join(Biome, Biome.id == Spawn.biome_id)
+        .where(Mob.is_hostile.is_(True))
+    )
+    return dict(db.session.execute(query).one()._mapping)
+
+# Number of spawns per hour of the day, optionally within a single biome.
+def spawn_counts_by_hour(biome_id: int = None, source: str = "summary"):
+    if source == "summary":
+        hour, count, biome_column = SpawnSummary.hour_spawned, func.sum(SpawnSummary.spawn_count), SpawnSummary.biome_id
+    else:
+        hour, count, biome_column = Spawn.hour_spawned, func.count(Spawn.id), Spawn.biome_id
+    query = select(hour, count).where(hour.is_not(None)).group_by(hour).order_by(hour)
+    if biome_id is not None:
+        query = query.where(biome_column == biome_id)
+    return [{"hour_spawned": hour_spawned, "spawn_count": spawn_count} for hour_spawned, spawn_count in db.session.execute(query)]
+
+# Number of spawns per biome.
+def spawn_counts_by_biome(source: str = "summary"):
+    if source == "summary":
+        biome_column, count = SpawnSummary.biome_id, func.sum(SpawnSummary.spawn_count)
+    else:
+        biome_column, count = Spawn.biome_id, func.count(Spawn.id)
+    counts = select(biome_column.label("biome_id"), count.label("spawn_count")).group_by(biome_column).subquery()
+    query = (
+        select(Biome.id, Biome.name, func.coalesce(counts.c.spawn_count, 0))
+        .outerjoin(counts, counts.c.biome_id == Biome.id)
+        .order_by(Biome.id)
+    )
+    return [{"biome_id": biome_id, "biome_name": name, "spawn_count": spawn_count} for biome_id, name, spawn_count in db.session.execute(query)]
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("asgiref")
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+from config import app, db
+from models import Mob, Biome, Spawn, count_queries
+from replica import reference_replica
+import asgi
+
+# Read routes and the arguments that pick each of their branches. (`{mob_id}` and `{biome_id}` are filled in per test.)
+READ_ROUTES = [
+    "/api/mobs", "/api/mobs?limit=1", "/api/mobs?limit=1&after={mob_id}", "/api/mobs?limit=0",
+    "/api/mobs/{mob_id}", "/api/mobs/999",
+    "/api/mobs/{mob_id}/biomes", "/api/mobs/{mob_id}/biomes?loading=joined", "/api/mobs/{mob_id}/biomes?loading=lazy",
+    "/api/mobs/{mob_id}/biomes?loading=eventually", "/api/mobs/999/biomes",
+    "/api/biomes", "/api/biomes?limit=1", "/api/biomes/{biome_id}", "/api/biomes/999",
+    "/api/biomes/{biome_id}/mobs", "/api/biomes/{biome_id}/mobs?loading=lazy",
+    "/api/spawns", "/api/spawns?mob_id={mob_id}", "/api/spawns?biome_id={biome_id}&from_hour=20&to_hour=2",
+    "/api/spawns?dimension=nether", "/api/spawns?dimension=moon", "/api/spawns?mob_id=zombie", "/api/spawns?limit=1",
+]
+
+@pytest.fixture
+def world(database):
+    ''' Two mobs spawning across two biomes, with the replica emptied so that it loads from this test's database. '''
+    reference_replica.clear()
+    zombie = Mob(name="Zombie", hit_points=20, damage=3, speed=23, is_hostile=True, can_spawn_during_daytime=False)
+    strider = Mob(name="Strider", hit_points=20, damage=0, speed=16, is_hostile=False, can_spawn_during_daytime=True)
+    plains = Biome(name="Plains", is_in_overworld=True)
+    wastes = Biome(name="Nether Wastes", is_in_nether=True)
+    db.session.add_all([Spawn(mob=zombie, biome=plains, hour_spawned=22), Spawn(mob=zombie, biome=wastes, hour_spawned=1),
+                        Spawn(mob=strider, biome=wastes, hour_spawned=12)])
+    db.session.commit()
+    yield {"mob_id": zombie.id, "biome_id": wastes.id}
+    reference_replica.clear()
+
+def session_cookie(client):
+    return f"{app.config['SESSION_COOKIE_NAME']}={client.get_cookie(app.config['SESSION_COOKIE_NAME']).value}"
+
+# Sends GET requests straight to the ASGI application (on one event loop) and returns `(status, headers, body)` for each.
+def fetch_from_asgi(urls: list, cookie: str = None):
+    async def fetch(url: str):
+        path, _, query = url.partition("?")
+        headers = [(b"host", b"localhost")] + ([(b"cookie", cookie.encode("latin-1"))] if cookie else [])
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+                 "path": path, "raw_path": path.encode("latin-1"), "query_string": query.encode("latin-1"), "root_path": "",
+                 "headers": headers, "server": ("localhost", 80), "client": ("127.0.0.1", 50000)}
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        await asgi.application(scope, receive, send)
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in messages[0]["headers"]}
+        return messages[0]["status"], headers, b"".join(message.get("body", b"") for message in messages[1:])
+
+    async def fetch_all():
+        try:
+            return [await fetch(url) for url in urls]
+        finally:
+            await asgi.async_engine.dispose()
+
+    return asyncio.run(fetch_all())
+
+def fetch_from_wsgi(client, url: str):
+    response = client.get(url)
+    return response.status_code, {name.lower(): value for name, value in response.headers.items()}, response.get_data()
+
+# NOTE: `Server-Timing` holds durations, which differ from one request to the next.
+def comparable(result: tuple):
+    status, headers, body = result
+    return status, {name: value for name, value in headers.items() if name != "server-timing"}, body
+
+@pytest.fixture
+def native_only(monkeypatch):
+    ''' Makes handing a request to the thread pool fail, so that only natively served requests succeed. '''
+    async def thread_pool(scope, receive, send):
+        raise AssertionError(f"`{scope['path']}` was not served natively.")
+    monkeypatch.setattr(asgi, "flask_application", thread_pool)
+
+class TestAsgiParity:
+    '''  Testing class for assessing that the ASGI entry point answers read routes exactly as the WSGI app does. '''
+
+    @pytest.mark.parametrize("replicated", [True, False], ids=["replica", "sql"])
+    def test_read_routes_match_wsgi(self, client, world, native_only, monkeypatch, replicated):
+        ''' Tests that every read route (and its error branches) gets the same status, headers, and body natively. '''
+        monkeypatch.setitem(app.config, "REFERENCE_REPLICA_ENABLED", replicated)
+        urls = [route.format(**world) for route in READ_ROUTES]
+        expected = [comparable(fetch_from_wsgi(client, url)) for url in urls]
+        actual = [comparable(result) for result in fetch_from_asgi(urls, session_cookie(client))]
+        for url, expected_result, actual_result in zip(urls, expected, actual):
+            assert (actual_result == expected_result), url
+
+    def test_native_reads_use_async_engine(self, client, world, native_only):
+        ''' Tests that a native read runs its statements on the async engine, and none on the synchronous one. '''
+        with count_queries(asgi.async_engine.sync_engine) as async_queries, count_queries(db.engine) as sync_queries:
+            status, _, _ = fetch_from_asgi([f"/api/mobs/{world['mob_id']}/biomes?loading=lazy"], session_cookie(client))[0]
+        assert (status == 200)
+        assert ((async_queries.count > 0, sync_queries.count) == (True, 0))
+
+    def test_unauthenticated_read_matches_wsgi(self, world, native_only):
+        ''' Tests that a native read without a session gets the same `401` as the WSGI app. '''
+        with app.test_client() as anonymous_client:
+            expected = comparable(fetch_from_wsgi(anonymous_client, "/api/mobs"))
+        assert (comparable(fetch_from_asgi(["/api/mobs"])[0]) == expected)
+        assert (expected[0] == 401)
+
+    def test_streamed_listing_falls_back_to_flask(self, client, world):
+        ''' Tests that a streamed listing is handed to the thread pool and streams the same rows. '''
+        expected = comparable(fetch_from_wsgi(client, "/api/mobs?stream=json"))
+        assert (comparable(fetch_from_asgi(["/api/mobs?stream=json"], session_cookie(client))[0]) == expected)
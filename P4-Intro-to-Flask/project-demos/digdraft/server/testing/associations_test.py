@@ -0,0 +1,111 @@
+import pytest
+
+from config import app, db
+from models import Mob, Biome, Spawn, count_queries, assert_max_queries
+
+SPAWNS_PER_ROW = 40
+
+@pytest.fixture
+def spawned_world(database):
+    ''' One mob spawning in many biomes, and one biome spawning many mobs. '''
+    mob, biome = Mob(name="Zombie"), Biome(name="Plains")
+    db.session.add_all([mob, biome])
+    for index in range(SPAWNS_PER_ROW):
+        db.session.add(Spawn(mob=mob, biome=Biome(name=f"Biome {index}"), hour_spawned=index % 24))
+        db.session.add(Spawn(mob=Mob(name=f"Mob {index}"), biome=biome, hour_spawned=index % 24))
+    db.session.commit()
+    return mob.id, biome.id
+
+def count_route_queries(client, path: str):
+    # NOTE: The first request caches the logged-in player, so only the route's own statements are counted.
+    client.get("/api")
+    with count_queries() as queries:
+        response = client.get(path)
+    assert (response.status_code == 200)
+    return queries.count, response.get_json()
+
+class TestAssociationLoading:
+    '''  Testing class for assessing query counts of the spawn association routes. '''
+
+    @pytest.mark.parametrize("path", ["/api/mobs/{mob_id}/biomes", "/api/biomes/{biome_id}/mobs"])
+    def test_selectin_loading_takes_at_most_three_queries(self, client, spawned_world, path):
+        ''' Tests that `selectin` loading takes at most three queries however many spawns exist. '''
+        mob_id, biome_id = spawned_world
+        count, payload = count_route_queries(client, path.format(mob_id=mob_id, biome_id=biome_id) + "?loading=selectin")
+        assert (count <= 3)
+        assert (len(payload) == SPAWNS_PER_ROW)
+
+    @pytest.mark.parametrize("path", ["/api/mobs/{mob_id}/biomes", "/api/biomes/{biome_id}/mobs"])
+    def test_joined_loading_takes_one_query(self, client, spawned_world, path):
+        ''' Tests that `joined` loading takes a single query however many spawns exist. '''
+        mob_id, biome_id = spawned_world
+        count, payload = count_route_queries(client, path.format(mob_id=mob_id, biome_id=biome_id) + "?loading=joined")
+        assert (count == 1)
+        assert (len(payload) == SPAWNS_PER_ROW)
+
+    @pytest.mark.parametrize("strategy", ["selectin", "joined", "lazy"])
+    def test_strategies_return_the_same_associations(self, client, spawned_world, strategy):
+        ''' Tests that every strategy returns the same biomes for a mob. '''
+        mob_id, _ = spawned_world
+        _, payload = count_route_queries(client, f"/api/mobs/{mob_id}/biomes?loading={strategy}")
+        assert (sorted(biome["name"] for biome in payload) == sorted(f"Biome {index}" for index in range(SPAWNS_PER_ROW)))
+
+    def test_lazy_loading_exceeds_the_bound(self, client, spawned_world):
+        ''' Tests that `assert_max_queries()` fails for lazy loading, which takes one query per spawn. '''
+        mob_id, _ = spawned_world
+        client.get("/api")
+        with pytest.raises(AssertionError):
+            with assert_max_queries(3):
+                client.get(f"/api/mobs/{mob_id}/biomes?loading=lazy")
+
+class TestSingleRowStatements:
+    '''  Testing class for assessing that single-row reads and writes load a row and its spawns in one statement. '''
+
+    @pytest.fixture(autouse=True)
+    def without_replica(self, monkeypatch):
+        monkeypatch.setitem(app.config, "REFERENCE_REPLICA_ENABLED", False)
+
+    @pytest.mark.parametrize("path, changes", [("/api/mobs/{mob_id}", {"damage": 7}), ("/api/biomes/{biome_id}", {"rarity": "rare"})])
+    def test_patch_takes_one_statement(self, client, spawned_world, path, changes):
+        ''' Tests that a PATCH writes the row and returns it with every spawn in one statement, as a GET would show it. '''
+        mob_id, biome_id = spawned_world
+        path = path.format(mob_id=mob_id, biome_id=biome_id)
+        client.get("/api")
+        with assert_max_queries(1):
+            response = client.patch(path, json=changes)
+        assert (response.status_code == 200)
+        assert (len(response.get_json()["spawns"]) == SPAWNS_PER_ROW)
+        assert (response.get_json() == client.get(path).get_json())
+
+    @pytest.mark.parametrize("method", ["PATCH", "DELETE"])
+    def test_missing_row_takes_one_statement(self, client, spawned_world, method):
+        ''' Tests that a PATCH or DELETE of a missing ID learns that from its own statement and returns 404. '''
+        client.get("/api")
+        with assert_max_queries(1):
+            response = client.open("/api/mobs/999999", method=method, json={"damage": 7} if method == "PATCH" else None)
+        assert (response.status_code == 404)
+
+    def test_delete_takes_two_statements(self, client, spawned_world):
+        ''' Tests that a DELETE removes the row and then detaches its spawns, returning them as detached. '''
+        mob_id, _ = spawned_world
+        client.get("/api")
+        with assert_max_queries(2):
+            response = client.delete(f"/api/mobs/{mob_id}")
+        assert (response.status_code == 200)
+        spawns = response.get_json()["spawns"]
+        assert (len(spawns) == SPAWNS_PER_ROW)
+        assert (all(spawn["mob_id"] is None and spawn["biome"]["name"].startswith("Biome ") for spawn in spawns))
+        db.session.expire_all()
+        assert (db.session.query(Spawn).filter(Spawn.mob_id == mob_id).count() == 0)
+        assert (db.session.query(Spawn).filter(Spawn.mob_id.is_(None)).count() == SPAWNS_PER_ROW)
+
+    def test_delete_without_spawns_takes_one_statement(self, client, database):
+        ''' Tests that deleting a row without spawns takes only its `DELETE ... RETURNING`. '''
+        mob = Mob(name="Lone")
+        db.session.add(mob)
+        db.session.commit()
+        mob_id = mob.id
+        client.get("/api")
+        with assert_max_queries(1):
+            response = client.delete(f"/api/mobs/{mob_id}")
+        assert ((response.status_code, response.get_json()["spawns"]) == (200, []))
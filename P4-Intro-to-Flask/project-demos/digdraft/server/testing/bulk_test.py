@@ -0,0 +1,197 @@
+import sqlite3
+
+import pytest
+
+from config import app, db
+from models import Mob, Biome, Spawn, count_queries
+
+@pytest.fixture
+def spawn_world(database):
+    ''' Two mobs and two biomes for spawns to reference. '''
+    db.session.add_all([Mob(id=1, name="Zombie"), Mob(id=2, name="Blaze"), Biome(id=1, name="Plains"), Biome(id=2, name="Nether Wastes")])
+    db.session.commit()
+
+class TestSpawnIngestion:
+    '''  Testing class for assessing `POST /api/spawns/batch` validation, statuses, and reference lookups. '''
+
+    def test_valid_batch_is_created_in_order(self, client, spawn_world):
+        ''' Tests that a fully valid batch returns 201 with increasing IDs that match the stored rows. '''
+        items = [{"mob_id": 1, "biome_id": 2, "hour_spawned": 18}, {"mob_id": 2, "biome_id": 1, "hour_spawned": 3}, {"mob_id": 1, "biome_id": 1, "hour_spawned": 0}]
+        response = client.post("/api/spawns/batch", json=items)
+        assert (response.status_code == 201)
+        body = response.get_json()
+        assert ((body["created"], body["failed"]) == (3, 0))
+        for item, status in zip(items, body["results"]):
+            spawn = db.session.get(Spawn, status["id"])
+            assert ((spawn.mob_id, spawn.biome_id, spawn.hour_spawned) == (item["mob_id"], item["biome_id"], item["hour_spawned"]))
+
+    def test_ndjson_body_is_accepted(self, client, spawn_world):
+        ''' Tests that an NDJSON body (blank lines skipped) is ingested like a JSON array. '''
+        body = '{"mob_id": 1, "biome_id": 1, "hour_spawned": 1}\n\n{"mob_id": 2, "biome_id": 2, "hour_spawned": 2}\n'
+        response = client.post("/api/spawns/batch", data=body, content_type="application/x-ndjson")
+        assert (response.status_code == 201)
+        assert (db.session.query(Spawn).count() == 2)
+
+    def test_invalid_items_get_their_own_errors(self, client, spawn_world):
+        ''' Tests that invalid items are reported by index with 207, while the valid ones are still created. '''
+        items = [
+            {"mob_id": 1, "biome_id": 1, "hour_spawned": 5},
+            {"mob_id": 1, "biome_id": 1},
+            {"mob_id": 1, "biome_id": 1, "hour_spawned": 24},
+            {"mob_id": True, "biome_id": 1, "hour_spawned": 5},
+            "not an object",
+            {"mob_id": 99, "biome_id": 1, "hour_spawned": 5},
+            {"mob_id": 1, "biome_id": 99, "hour_spawned": 5},
+        ]
+        response = client.post("/api/spawns/batch", json=items)
+        assert (response.status_code == 207)
+        statuses = response.get_json()["results"]
+        assert ([status["index"] for status in statuses] == list(range(len(items))))
+        assert ([status["status"] for status in statuses] == ["created"] + ["error"] * 6)
+        assert (statuses[1]["error"] == "Missing field(s): hour_spawned.")
+        assert ("between 0 and 23" in statuses[2]["error"])
+        assert (statuses[3]["error"] == "`mob_id` must be an integer.")
+        assert ("Mob ID `99`" in statuses[5]["error"] and "Biome ID `99`" in statuses[6]["error"])
+        assert (db.session.query(Spawn).count() == 1)
+
+    def test_batch_without_valid_items_is_rejected(self, client, spawn_world):
+        ''' Tests that a batch in which no item is valid returns 400 and writes nothing. '''
+        response = client.post("/api/spawns/batch", json=[{"mob_id": 99, "biome_id": 1, "hour_spawned": 1}])
+        assert (response.status_code == 400)
+        assert (db.session.query(Spawn).count() == 0)
+
+    @pytest.mark.parametrize("body, content_type", [
+        ("{}", "application/json"),
+        ("[]", "application/json"),
+        ('{"mob_id": 1}\nnot json\n', "application/x-ndjson"),
+    ], ids=["not-an-array", "empty", "bad-ndjson-line"])
+    def test_malformed_payloads_are_rejected(self, client, spawn_world, body, content_type):
+        ''' Tests that a body that is not a non-empty array of items returns 400. '''
+        assert (client.post("/api/spawns/batch", data=body, content_type=content_type).status_code == 400)
+
+    def test_oversized_batch_is_rejected(self, client, spawn_world, monkeypatch):
+        ''' Tests that a batch over `BATCH_MAX_ITEMS` returns 400 before anything is looked up. '''
+        monkeypatch.setitem(app.config, "BATCH_MAX_ITEMS", 2)
+        items = [{"mob_id": 1, "biome_id": 1, "hour_spawned": hour} for hour in range(3)]
+        assert (client.post("/api/spawns/batch", json=items).status_code == 400)
+
+    def test_references_are_checked_in_one_query(self, client, spawn_world):
+        ''' Tests that a small batch looks up every referenced mob and biome with one query before one insert. '''
+        items = [{"mob_id": mob_id, "biome_id": biome_id, "hour_spawned": 12} for mob_id in (1, 2) for biome_id in (1, 2)]
+        client.get("/api")
+        with count_queries() as queries:
+            assert (client.post("/api/spawns/batch", json=items).status_code == 201)
+        statements = [statement.lstrip().split()[0].upper() for statement in queries.statements]
+        assert (statements.count("SELECT") == 1)
+        assert (statements.count("INSERT") == 1)
+
+    def test_large_batches_fit_old_sqlite_parameter_limits(self, client):
+        ''' Tests that a batch referencing thousands of IDs works with a 999-parameter SQLite limit. '''
+        db.session.add_all([Mob(id=1, name="Zombie"), Biome(id=1, name="Plains")])
+        db.session.commit()
+        # NOTE: The limit applies to this connection, which the session (and the route) reuses.
+        db.session.connection().connection.dbapi_connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+
+        items = [{"mob_id": 1, "biome_id": 1, "hour_spawned": 12}]
+        items += [{"mob_id": index, "biome_id": index + 1, "hour_spawned": index % 24} for index in range(2, 3002)]
+        response = client.post("/api/spawns/batch", json=items)
+
+        statuses = response.get_json()["results"]
+        assert (response.status_code == 207)
+        assert (statuses[0]["status"] == "created")
+        assert (all(status["status"] == "error" for status in statuses[1:]))
+        assert (db.session.query(Spawn).count() == 1)
+
+@pytest.fixture
+def mob_roster(database):
+    ''' Three mobs, the first of which spawns in a biome. '''
+    db.session.add_all([Mob(id=1, name="Zombie", damage=3, is_hostile=True), Mob(id=2, name="Blaze", damage=6, is_hostile=True),
+                        Mob(id=3, name="Cow", damage=0, is_hostile=False), Biome(id=1, name="Plains")])
+    db.session.add(Spawn(id=1, mob_id=1, biome_id=1, hour_spawned=22))
+    db.session.commit()
+
+def mob_damages():
+    return dict(db.session.query(Mob.id, Mob.damage).order_by(Mob.id).all())
+
+class TestBatchEdits:
+    '''  Testing class for assessing column whitelisting, validation, and statuses of batch PATCH and DELETE routes. '''
+
+    def test_whitelisted_changes_are_applied(self, client, mob_roster):
+        ''' Tests that editable columns change on every listed mob, with results in request order. '''
+        response = client.patch("/api/mobs/batch", json={"ids": [3, 1, 3], "changes": {"damage": 9, "name": "Brute"}})
+        assert (response.status_code == 200)
+        body = response.get_json()
+        assert ((body["updated"], body["missing_ids"]) == (2, []))
+        assert ([result["id"] for result in body["results"]] == [3, 1])
+        assert (mob_damages() == {1: 9, 2: 6, 3: 9})
+
+    @pytest.mark.parametrize("changes", [
+        {"id": 7}, {"spawns": []}, {"biomes": []}, {"password": "hunter2"}, {"damage": 9, "id": 7},
+    ], ids=["primary-key", "relationship", "association-proxy", "unknown-column", "mixed"])
+    def test_columns_outside_whitelist_are_rejected(self, client, mob_roster, changes):
+        ''' Tests that changing a column outside the whitelist returns 400 and changes nothing. '''
+        response = client.patch("/api/mobs/batch", json={"ids": [1, 2], "changes": changes})
+        assert (response.status_code == 400)
+        assert ("cannot be changed" in response.get_json()["error"])
+        assert (mob_damages() == {1: 3, 2: 6, 3: 0})
+        assert (db.session.query(Mob.id).order_by(Mob.id).all() == [(1,), (2,), (3,)])
+
+    @pytest.mark.parametrize("changes, error", [
+        ({"damage": "lots"}, "`damage` must be an integer."),
+        ({"damage": True}, "`damage` must be an integer."),
+        ({"is_hostile": 1}, "`is_hostile` must be a boolean."),
+        ({"name": 5}, "`name` must be a string."),
+        ({"name": "A" * 21}, "`name` must be at most 20 characters."),
+    ])
+    def test_mistyped_changes_are_rejected(self, client, mob_roster, changes, error):
+        ''' Tests that a whitelisted column given a value of the wrong type or length returns 400. '''
+        response = client.patch("/api/mobs/batch", json={"ids": [1], "changes": changes})
+        assert ((response.status_code, response.get_json()["error"]) == (400, error))
+
+    def test_null_clears_a_column(self, client, mob_roster):
+        ''' Tests that `null` is accepted for any editable column. '''
+        assert (client.patch("/api/mobs/batch", json={"ids": [2], "changes": {"damage": None}}).status_code == 200)
+        assert (mob_damages()[2] is None)
+
+    def test_biome_whitelist_differs_from_mobs(self, client, mob_roster):
+        ''' Tests that biomes accept their own columns and reject mob columns. '''
+        assert (client.patch("/api/biomes/batch", json={"ids": [1], "changes": {"rarity": "rare"}}).status_code == 200)
+        assert (client.patch("/api/biomes/batch", json={"ids": [1], "changes": {"damage": 1}}).status_code == 400)
+        assert (db.session.get(Biome, 1).rarity == "rare")
+
+    @pytest.mark.parametrize("payload", [
+        [1, 2], {"changes": {"damage": 1}}, {"ids": [], "changes": {"damage": 1}}, {"ids": [1, "2"], "changes": {"damage": 1}},
+        {"ids": [True], "changes": {"damage": 1}}, {"ids": [1]}, {"ids": [1], "changes": {}},
+    ], ids=["not-an-object", "no-ids", "empty-ids", "string-id", "boolean-id", "no-changes", "empty-changes"])
+    def test_malformed_edits_are_rejected(self, client, mob_roster, payload):
+        ''' Tests that a PATCH without a non-empty integer `ids` array and `changes` object returns 400. '''
+        assert (client.patch("/api/mobs/batch", json=payload).status_code == 400)
+        assert (mob_damages() == {1: 3, 2: 6, 3: 0})
+
+    def test_oversized_edit_is_rejected(self, client, mob_roster, monkeypatch):
+        ''' Tests that more IDs than `BATCH_MAX_ITEMS` return 400. '''
+        monkeypatch.setitem(app.config, "BATCH_MAX_ITEMS", 2)
+        assert (client.patch("/api/mobs/batch", json={"ids": [1, 2, 3], "changes": {"damage": 1}}).status_code == 400)
+        assert (client.delete("/api/mobs/batch", json={"ids": [1, 2, 3]}).status_code == 400)
+
+    @pytest.mark.parametrize("method", ["patch", "delete"])
+    def test_missing_ids_are_reported(self, client, mob_roster, method):
+        ''' Tests that some unknown IDs give 207 with `missing_ids`, and only unknown IDs give 404. '''
+        send = getattr(client, method)
+        partial = send("/api/mobs/batch", json={"ids": [2, 98], "changes": {"damage": 1}})
+        assert ((partial.status_code, partial.get_json()["missing_ids"]) == (207, [98]))
+        assert (send("/api/mobs/batch", json={"ids": [98, 99], "changes": {"damage": 1}}).status_code == 404)
+
+    def test_delete_detaches_spawns(self, client, mob_roster):
+        ''' Tests that a batch DELETE removes the mobs and keeps their spawns with no mob. '''
+        response = client.delete("/api/mobs/batch", json={"ids": [1, 3]})
+        assert ((response.status_code, response.get_json()["deleted"]) == (200, 2))
+        assert ([result["name"] for result in response.get_json()["results"]] == ["Zombie", "Cow"])
+        assert (db.session.query(Mob.id).all() == [(2,)])
+        assert (db.session.get(Spawn, 1).mob_id is None)
+
+    def test_single_patch_uses_same_whitelist(self, client, mob_roster):
+        ''' Tests that `PATCH /api/mobs/<id>` rejects the columns the batch route rejects. '''
+        assert (client.patch("/api/mobs/1", json={"id": 5}).status_code == 400)
+        assert (client.patch("/api/mobs/1", json={"damage": "lots"}).status_code == 400)
+        assert (mob_damages()[1] == 3)
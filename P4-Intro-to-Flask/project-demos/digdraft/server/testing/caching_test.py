@@ -0,0 +1,90 @@
+import pytest
+
+from config import app, db
+from models import Mob, Biome, Spawn, count_queries
+from caching import response_cache
+from replica import reference_replica
+
+@pytest.fixture
+def cached_client(client, monkeypatch):
+    ''' A logged-in client with the response cache (disabled for the rest of the suite) turned on and empty. '''
+    monkeypatch.setitem(app.config, "RESPONSE_CACHE_ENABLED", True)
+    response_cache.clear()
+    reference_replica.clear()
+    yield client
+    response_cache.clear()
+
+@pytest.fixture
+def zombie(database):
+    ''' One mob that spawns in one biome. '''
+    mob = Mob(name="Zombie", hit_points=20, damage=3, speed=23, is_hostile=True, can_spawn_during_daytime=False)
+    db.session.add(Spawn(mob=mob, biome=Biome(name="Plains"), hour_spawned=22))
+    db.session.commit()
+    return mob.id
+
+def revalidate(client, path: str, etag: str):
+    return client.get(path, headers={"If-None-Match": etag})
+
+class TestResponseCache:
+    '''  Testing class for assessing ETags, `304 Not Modified`, and invalidation of cached read routes. '''
+
+    @pytest.mark.parametrize("path", ["/api/mobs", "/api/mobs/{mob_id}", "/api/mobs/{mob_id}/biomes"])
+    def test_repeat_request_is_not_modified(self, cached_client, zombie, path):
+        ''' Tests that a repeat GET with the ETag gets 304 from the cache without any SQL. '''
+        path = path.format(mob_id=zombie)
+        first = cached_client.get(path)
+        assert ((first.status_code, first.headers["X-Cache"]) == (200, "MISS"))
+        etag = first.headers["ETag"]
+        assert (etag.startswith('"') and etag.endswith('"'))
+
+        with count_queries() as queries:
+            repeat = revalidate(cached_client, path, etag)
+        assert ((repeat.status_code, repeat.headers["X-Cache"], repeat.headers["ETag"]) == (304, "HIT", etag))
+        assert (repeat.get_data() == b"")
+        assert (queries.count == 0)
+
+    def test_cached_body_is_replayed_without_etag(self, cached_client, zombie):
+        ''' Tests that a repeat GET without `If-None-Match` gets the same body and ETag from the cache. '''
+        first = cached_client.get(f"/api/mobs/{zombie}")
+        repeat = cached_client.get(f"/api/mobs/{zombie}")
+        assert ((repeat.status_code, repeat.headers["X-Cache"]) == (200, "HIT"))
+        assert ((repeat.get_data(), repeat.headers["ETag"]) == (first.get_data(), first.headers["ETag"]))
+
+    @pytest.mark.parametrize("path", ["/api/mobs", "/api/mobs/{mob_id}"])
+    def test_patch_invalidates(self, cached_client, zombie, path):
+        ''' Tests that a PATCH of the mob makes the next GET a fresh 200 with a new ETag. '''
+        path = path.format(mob_id=zombie)
+        etag = cached_client.get(path).headers["ETag"]
+        assert (cached_client.patch(f"/api/mobs/{zombie}", json={"damage": 5}).status_code == 200)
+
+        fresh = revalidate(cached_client, path, etag)
+        assert ((fresh.status_code, fresh.headers["X-Cache"]) == (200, "MISS"))
+        assert (fresh.headers["ETag"] != etag)
+        assert ("5" in fresh.get_data(as_text=True))
+
+    def test_delete_invalidates(self, cached_client, zombie):
+        ''' Tests that a DELETE of a mob makes the next listing a fresh 200 with a new ETag. '''
+        etag = cached_client.get("/api/mobs").headers["ETag"]
+        assert (cached_client.delete(f"/api/mobs/{zombie}").status_code == 200)
+
+        fresh = revalidate(cached_client, "/api/mobs", etag)
+        assert ((fresh.status_code, fresh.get_json()) == (200, []))
+        assert (fresh.headers["ETag"] != etag)
+        assert (cached_client.get(f"/api/mobs/{zombie}").status_code == 404)
+
+    def test_write_to_other_table_keeps_entry(self, cached_client, zombie):
+        ''' Tests that writing a table the route does not depend on leaves its entry cached. '''
+        etag = cached_client.get("/api/mobs").headers["ETag"]
+        biome_id = db.session.query(Biome.id).scalar()
+        assert (cached_client.patch(f"/api/biomes/{biome_id}", json={"rarity": "rare"}).status_code == 200)
+        assert (revalidate(cached_client, "/api/mobs", etag).status_code == 304)
+
+    def test_statistics_count_hits_and_misses(self, cached_client, zombie):
+        ''' Tests that `GET /api/cache/stats` reports the hits, misses, and 304s served. '''
+        before = cached_client.get("/api/cache/stats").get_json()
+        etag = cached_client.get("/api/mobs").headers["ETag"]
+        revalidate(cached_client, "/api/mobs", etag)
+        cached_client.get("/api/mobs")
+        after = cached_client.get("/api/cache/stats").get_json()
+        assert (tuple(after[counter] - before[counter] for counter in ("hits", "misses", "not_modified")) == (2, 1, 1))
+        assert (after["entries"] == 1)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+
+import pytest
+
+# NOTE: Set before `config` is imported, so the tests never touch `digdraft.db`.
+SCRATCH_DIRECTORY = tempfile.mkdtemp(prefix="digdraft-tests-")
+os.environ["DIGDRAFT_DATABASE_URI"] = f"sqlite:///{os.path.join(SCRATCH_DIRECTORY, 'digdraft_tests.db')}"
+os.environ["DIGDRAFT_AUTHENTICATION_TOKEN"] = "digdraft-tests"
+os.environ["DIGDRAFT_BCRYPT_ROUNDS"] = "4"
+os.environ["DIGDRAFT_RESPONSE_CACHE_ENABLED"] = "0"
+
+from config import app, db
+import app as digdraft_routes
+from models import Player
+
+@pytest.fixture
+def database():
+    ''' Recreates every table in the scratch database for one test. '''
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield db
+        db.session.remove()
+
+def log_in(client, username: str):
+    ''' Signs up a player through the API, which also logs the client in. '''
+    response = client.post("/players", json={"username": username, "password": "password"})
+    assert (response.status_code == 201)
+    return response.get_json()
+
+@pytest.fixture
+def client(database):
+    ''' A test client logged in as a freshly created player. '''
+    with app.test_client() as client:
+        log_in(client, "Steve")
+        yield client
@@ -0,0 +1,53 @@
+import time
+
+import bcrypt
+import pytest
+from flask import Flask
+
+from credentials import CredentialService, CredentialServiceBusy
+
+@pytest.fixture
+def service():
+    ''' A credential service with one worker, no queue, and a cheap cost factor. '''
+    credential_app = Flask(__name__)
+    credential_app.config.update(BCRYPT_ROUNDS=5, CREDENTIAL_WORKERS=1, CREDENTIAL_QUEUE_SIZE=0, CREDENTIAL_TIMEOUT=0.05)
+    return CredentialService(credential_app)
+
+def hash_with_rounds(password: str, rounds: int):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+class TestCredentialService:
+    '''  Testing class for assessing the bounded password hashing pool. '''
+
+    def test_outdated_hash_is_upgraded(self, service):
+        ''' Tests that a verified password stored with another cost factor comes back rehashed at the configured cost. '''
+        is_valid, upgraded_hash = service.verify_password("hunter2", hash_with_rounds("hunter2", 4))
+        assert (is_valid and upgraded_hash.startswith("$2b$05$"))
+        assert (bcrypt.checkpw(b"hunter2", upgraded_hash.encode("utf-8")))
+        assert (service.statistics()["rehashed"] == 1)
+
+    def test_busy_pool_skips_rehash(self, service, monkeypatch):
+        ''' Tests that a saturated pool skips the rehash of a verified password instead of raising. '''
+        def saturated(password):
+            raise CredentialServiceBusy("busy")
+        monkeypatch.setattr(service, "hash_password", saturated)
+        assert (service.verify_password("hunter2", hash_with_rounds("hunter2", 4)) == (True, None))
+        assert ((service.statistics()["rehashed"], service.statistics()["rehash_skipped"]) == (0, 1))
+
+    def test_saturated_pool_rejects(self, service):
+        ''' Tests that a slow call past the timeout raises, keeps its slot until done, and rejects callers meanwhile. '''
+        with pytest.raises(CredentialServiceBusy):
+            service._run(time.sleep, 0.3)
+        with pytest.raises(CredentialServiceBusy):
+            service.hash_password("hunter2")
+        time.sleep(0.4)
+        assert (service.hash_password("hunter2").startswith("$2b$05$"))
+        statistics = service.statistics()
+        assert ((statistics["timed_out"], statistics["rejected"], statistics["in_flight"]) == (1, 1, 0))
+
+    def test_statistics_route(self, client):
+        ''' Tests that `GET /api/credentials/stats` reports the pool counters and cost factor. '''
+        response = client.get("/api/credentials/stats")
+        assert (response.status_code == 200)
+        assert ({"completed", "rejected", "timed_out", "rehashed", "rehash_skipped", "in_flight", "rounds"} <= set(response.get_json()))
+        assert (response.get_json()["completed"] >= 1)
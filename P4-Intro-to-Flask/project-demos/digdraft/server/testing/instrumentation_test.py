@@ -0,0 +1,34 @@
+from flask import Flask
+
+from config import app
+from instrumentation import Instrumentation, PROMETHEUS_CONTENT_TYPE
+
+def build_instrumented_app(**config):
+    instrumented_app = Flask(__name__)
+    instrumented_app.config.update(config)
+    Instrumentation(instrumented_app)
+    instrumented_app.add_url_rule("/ping", "ping", lambda: {"pong": True})
+    return instrumented_app
+
+class TestInstrumentation:
+    '''  Testing class for assessing request timing headers and the opt-in metrics route. '''
+
+    def test_server_timing_header(self, client):
+        ''' Tests that responses carry a `Server-Timing` header with the total and database time. '''
+        timing = client.get("/api/mobs").headers["Server-Timing"]
+        assert (timing.startswith("total;dur=") and 'db;dur=' in timing and 'queries"' in timing)
+
+    def test_metrics_route_is_off_by_default(self, client):
+        ''' Tests that neither DigDraft nor a freshly attached app serves metrics unless a path is configured. '''
+        assert (app.config["INSTRUMENTATION_METRICS_PATH"] is None)
+        assert (client.get("/metrics").status_code == 404)
+        assert (build_instrumented_app().test_client().get("/metrics").status_code == 404)
+
+    def test_configured_metrics_route(self):
+        ''' Tests that a configured path serves the recorded histograms in the Prometheus text format. '''
+        instrumented_client = build_instrumented_app(INSTRUMENTATION_METRICS_PATH="/metrics").test_client()
+        instrumented_client.get("/ping")
+        response = instrumented_client.get("/metrics")
+        assert ((response.status_code, response.content_type) == (200, PROMETHEUS_CONTENT_TYPE))
+        assert ('flask_request_duration_seconds_count{endpoint="ping",method="GET",status="200"} 1'
+                in response.get_data(as_text=True))
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import pytest
+
+from config import db
+from models import Player
+import middleware
+from middleware import PlayerIdentityCache, PlayerPrincipal, player_identity_cache
+
+def make_principal(player_id: int):
+    return PlayerPrincipal(id=player_id, username=f"Player {player_id}", kills=0, deaths=0, experience=0, created_at=None)
+
+@pytest.fixture
+def clock(monkeypatch):
+    ''' A fake `time.monotonic()` for the identity cache that only moves when told to. '''
+    now = [1000.0]
+    monkeypatch.setattr(middleware, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+@pytest.fixture
+def steve(client):
+    ''' The logged-in player's ID, with their identity freshly cached by one request. '''
+    player_identity_cache.clear()
+    player_id = client.get("/api").get_json()["player_id"]
+    assert (player_identity_cache.get(player_id) is not None)
+    return player_id
+
+class TestPlayerIdentityCache:
+    '''  Testing class for assessing the bounded, expiring LRU cache of player principals. '''
+
+    def test_hit_returns_cached_principal(self, clock):
+        ''' Tests that a cached principal is returned as-is until it expires. '''
+        cache = PlayerIdentityCache(max_size=4, ttl=60)
+        principal = make_principal(1)
+        cache.put(principal)
+        assert (cache.get(1) is principal)
+        assert (cache.get(2) is None)
+
+    def test_entries_expire_after_ttl(self, clock):
+        ''' Tests that an entry is dropped once its TTL has passed. '''
+        cache = PlayerIdentityCache(max_size=4, ttl=60)
+        cache.put(make_principal(1))
+        clock[0] += 59.9
+        assert (cache.get(1) is not None)
+        clock[0] += 0.1
+        assert (cache.get(1) is None)
+        assert (len(cache) == 0)
+
+    def test_least_recently_used_entry_is_evicted(self, clock):
+        ''' Tests that a full cache evicts the entry read least recently. '''
+        cache = PlayerIdentityCache(max_size=2, ttl=60)
+        cache.put(make_principal(1))
+        cache.put(make_principal(2))
+        cache.get(1)
+        cache.put(make_principal(3))
+        assert (len(cache) == 2)
+        assert (cache.get(2) is None)
+        assert (cache.get(1) is not None and cache.get(3) is not None)
+
+class TestPlayerIdentityInvalidation:
+    '''  Testing class for assessing when written players are evicted from the identity cache. '''
+
+    def test_patching_stats_evicts_player(self, client, steve):
+        ''' Tests that `PATCH /api/players/<id>/stats` evicts the player, so the next request sees new stats. '''
+        assert (client.patch(f"/api/players/{steve}/stats", json={"kills": 7}).status_code == 200)
+        assert (player_identity_cache.get(steve) is None)
+        client.get("/api")
+        assert (player_identity_cache.get(steve).kills == 7)
+
+    def test_eviction_waits_for_commit(self, steve):
+        ''' Tests that a flushed but uncommitted write keeps the cached player, and the commit evicts it. '''
+        db.session.get(Player, steve).kills = 3
+        db.session.flush()
+        assert (player_identity_cache.get(steve) is not None)
+        db.session.commit()
+        assert (player_identity_cache.get(steve) is None)
+
+    def test_rolled_back_write_keeps_player(self, steve):
+        ''' Tests that a write that is rolled back leaves the cached player in place. '''
+        db.session.get(Player, steve).kills = 3
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+        assert (player_identity_cache.get(steve) is not None)
+
+    def test_deleting_player_logs_them_out(self, client, steve):
+        ''' Tests that a deleted player is evicted and their session is no longer authorized. '''
+        db.session.delete(db.session.get(Player, steve))
+        db.session.commit()
+        assert (player_identity_cache.get(steve) is None)
+        assert (client.get("/api").status_code == 401)
+
+    def test_bulk_update_clears_cache(self, steve):
+        ''' Tests that a bulk `UPDATE` of players clears every cached identity once committed. '''
+        db.session.query(Player).update({Player.experience: 100})
+        assert (player_identity_cache.get(steve) is not None)
+        db.session.commit()
+        assert (len(player_identity_cache) == 0)
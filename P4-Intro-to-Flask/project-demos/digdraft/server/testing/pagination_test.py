@@ -0,0 +1,100 @@
+from urllib.parse import parse_qs, urlsplit
+import json
+
+import pytest
+
+from config import app, db
+from models import Mob, Biome, Spawn
+from replica import reference_replica
+
+def follow_pages(client, path: str):
+    ''' Reads every page of a listing by following its `Link: <...>; rel="next"` headers. '''
+    pages = []
+    while path is not None:
+        response = client.get(path)
+        assert (response.status_code == 200)
+        pages.append(response.get_json())
+        link = response.headers.get("Link")
+        path = link[1:link.index(">")] if link else None
+    return pages
+
+class TestKeysetPagination:
+    '''  Testing class for assessing next-page links of paginated spawn searches. '''
+
+    def test_next_link_keeps_filters(self, client):
+        ''' Tests that the next-page link carries the search filters along with `limit` and `after`. '''
+        mobs, biomes = [Mob(name="Zombie"), Mob(name="Blaze")], [Biome(name="Plains"), Biome(name="Desert")]
+        db.session.add_all(mobs + biomes)
+        for hour in range(24):
+            for mob in mobs:
+                for biome in biomes:
+                    db.session.add(Spawn(mob=mob, biome=biome, hour_spawned=hour))
+        db.session.commit()
+
+        path = f"/api/spawns?mob_id={mobs[0].id}&biome_id={biomes[1].id}&from_hour=18&to_hour=6&limit=5"
+        first_page = client.get(path)
+        next_arguments = parse_qs(urlsplit(first_page.headers["Link"][1:first_page.headers["Link"].index(">")]).query)
+        assert ({key: values[0] for key, values in next_arguments.items()} == {
+            "mob_id": str(mobs[0].id), "biome_id": str(biomes[1].id), "from_hour": "18", "to_hour": "6",
+            "limit": "5", "after": first_page.headers["X-Next-Cursor"],
+        })
+
+        spawns = [spawn for page in follow_pages(client, path) for spawn in page]
+        assert (len(spawns) == 13)
+        assert (all(spawn["mob_id"] == mobs[0].id and spawn["biome_id"] == biomes[1].id for spawn in spawns))
+        assert (all(spawn["hour_spawned"] >= 18 or spawn["hour_spawned"] <= 6 for spawn in spawns))
+
+@pytest.fixture(params=[True, False], ids=["replica", "sql"])
+def listing_source(request, database):
+    ''' Serves the mob and biome listings from the in-memory replica, then from SQL. '''
+    app.config["REFERENCE_REPLICA_ENABLED"] = request.param
+    reference_replica.clear()
+    yield request.param
+    app.config["REFERENCE_REPLICA_ENABLED"] = True
+    reference_replica.clear()
+
+@pytest.fixture
+def listed_world(database):
+    ''' Seven mobs and seven biomes, so that a listing spans several small pages. '''
+    db.session.add_all([Mob(name=f"Mob {index}") for index in range(7)] + [Biome(name=f"Biome {index}") for index in range(7)])
+    db.session.commit()
+
+class TestListingPagination:
+    '''  Testing class for assessing keyset pages and streams of `GET /api/mobs` and `GET /api/biomes`. '''
+
+    @pytest.mark.parametrize("path", ["/api/mobs", "/api/biomes"])
+    def test_pages_cover_the_full_listing(self, client, listing_source, listed_world, path):
+        ''' Tests that following the next-page links returns every row once, in ID order, three at a time. '''
+        full_listing = client.get(path).get_json()
+        pages = follow_pages(client, f"{path}?limit=3")
+        assert ([len(page) for page in pages] == [3, 3, 1])
+        assert ([row for page in pages for row in page] == full_listing)
+        assert ([row["id"] for row in full_listing] == sorted(row["id"] for row in full_listing))
+
+    @pytest.mark.parametrize("path", ["/api/mobs", "/api/biomes"])
+    def test_last_page_has_no_cursor(self, client, listing_source, listed_world, path):
+        ''' Tests that the cursor headers are set on a full page and left out of the last one. '''
+        first_page = client.get(f"{path}?limit=3")
+        assert (first_page.headers["X-Next-Cursor"] == str(first_page.get_json()[-1]["id"]))
+        last_page = client.get(f"{path}?limit=3&after={first_page.get_json()[-1]['id'] + 3}")
+        assert ("Link" not in last_page.headers and "X-Next-Cursor" not in last_page.headers)
+
+    @pytest.mark.parametrize("arguments", ["limit=0", "limit=lots", "after=-1", "limit=100000"])
+    def test_invalid_page_arguments_are_rejected(self, client, listing_source, listed_world, arguments):
+        ''' Tests that out-of-range or non-integer `limit` and `after` values return 400. '''
+        assert (client.get(f"/api/mobs?{arguments}").status_code == 400)
+
+    @pytest.mark.parametrize("path", ["/api/mobs", "/api/biomes"])
+    def test_streams_match_the_full_listing(self, client, listing_source, listed_world, path):
+        ''' Tests that the NDJSON stream and the chunked JSON array hold the same rows as the full listing. '''
+        full_listing = client.get(path).get_json()
+        ndjson = client.get(f"{path}?stream=ndjson")
+        assert (ndjson.mimetype == "application/x-ndjson")
+        assert ([json.loads(line) for line in ndjson.get_data(as_text=True).splitlines()] == full_listing)
+        json_array = client.get(f"{path}?stream=json")
+        assert (json_array.mimetype == "application/json")
+        assert (json.loads(json_array.get_data(as_text=True)) == full_listing)
+
+    def test_unknown_stream_format_is_rejected(self, client, listing_source, listed_world):
+        ''' Tests that an unknown `stream` format returns 400. '''
+        assert (client.get("/api/mobs?stream=xml").status_code == 400)
@@ -0,0 +1,48 @@
+from config import app, db, credentials
+from models import Player
+
+class TestPlayerSignup:
+    '''  Testing class for assessing `POST /players` with taken usernames. '''
+
+    def test_taken_username_is_rejected(self, client):
+        ''' Tests that a username differing only by case and whitespace is rejected with 409. '''
+        with app.test_client() as other_client:
+            response = other_client.post("/players", json={"username": "  steve ", "password": "password"})
+        assert (response.status_code == 409)
+
+    def test_concurrent_signup_is_rejected(self, database, monkeypatch):
+        ''' Tests that a signup losing the race to the unique index gets 409 instead of a 500. '''
+        hash_password = credentials.hash_password
+
+        # NOTE: Another signup for "Alice" commits while this request for "alice" is hashing its password.
+        def hash_password_during_other_signup(password):
+            hashed_password = hash_password(password)
+            with app.app_context():
+                db.session.add(Player(username="Alice", password=hashed_password))
+                db.session.commit()
+            return hashed_password
+
+        monkeypatch.setattr(credentials, "hash_password", hash_password_during_other_signup)
+        with app.test_client() as client:
+            response = client.post("/players", json={"username": "alice", "password": "password"})
+        assert (response.status_code == 409)
+        assert (db.session.query(Player).count() == 1)
+
+class TestPlayerStats:
+    '''  Testing class for assessing who may `PATCH /api/players/<id>/stats`. '''
+
+    def test_player_edits_own_stats(self, client):
+        ''' Tests that the logged-in player can set their own stats. '''
+        player_id = client.get("/api").get_json()["player_id"]
+        response = client.patch(f"/api/players/{player_id}/stats", json={"kills": 12, "deaths": 3})
+        assert (response.status_code == 200)
+        assert ((response.get_json()["kills"], response.get_json()["deaths"]) == (12, 3))
+
+    def test_other_player_is_forbidden(self, client):
+        ''' Tests that another logged-in player gets 403 and leaves the stats unchanged. '''
+        player_id = client.get("/api").get_json()["player_id"]
+        with app.test_client() as other_client:
+            assert (other_client.post("/players", json={"username": "Alex", "password": "password"}).status_code == 201)
+            response = other_client.patch(f"/api/players/{player_id}/stats", json={"kills": 9999})
+        assert (response.status_code == 403)
+        assert (db.session.get(Player, player_id).kills == 0)
@@ -0,0 +1,89 @@
+import pytest
+
+from config import app, db
+from models import Mob, count_queries
+from replica import reference_replica, build_record_table, MobRecord
+
+@pytest.fixture
+def zombie(database):
+    ''' One mob, with the replica emptied so that it loads from this test's database. '''
+    reference_replica.clear()
+    mob = Mob(name="Zombie", hit_points=20, damage=3, speed=23, is_hostile=True, can_spawn_during_daytime=False)
+    db.session.add(mob)
+    db.session.commit()
+    yield mob.id
+    reference_replica.wait_for_refresh()
+    reference_replica.clear()
+
+@pytest.fixture
+def without_background_refresh(monkeypatch):
+    ''' Leaves stale tables stale, so that a test can refresh them itself. '''
+    monkeypatch.setattr(reference_replica, "refresh_in_background", lambda: None)
+
+def mob_row(mob_id: int, name: str):
+    return (mob_id, name, 20, 3, 23, True, False)
+
+class TestReferenceReplica:
+    '''  Testing class for assessing when the in-memory mob and biome replica reloads. '''
+
+    def test_write_does_not_reload_the_table(self, client, zombie, without_background_refresh):
+        ''' Tests that a committed mob write does not reload the table itself. '''
+        assert (client.get("/api/mobs").get_json()[0]["damage"] == 3)
+        with count_queries() as queries:
+            response = client.patch(f"/api/mobs/{zombie}", json={"damage": 5})
+        assert (response.status_code == 200)
+        assert (not any(statement.lstrip().upper().startswith("SELECT") and "WHERE" not in statement.upper()
+                        for statement in queries.statements))
+
+    def test_stale_table_falls_back_to_sql(self, client, zombie, without_background_refresh):
+        ''' Tests that reads after a committed write use SQL, not the stale snapshot, until it is rebuilt. '''
+        loaded = reference_replica.table(Mob)
+        client.patch(f"/api/mobs/{zombie}", json={"damage": 5})
+        assert (reference_replica.table(Mob) is None)
+        with count_queries() as queries:
+            assert (client.get("/api/mobs").get_json()[0]["damage"] == 5)
+        assert (queries.count == 1)
+        assert (client.get(f"/api/mobs/{zombie}").get_json()["damage"] == 5)
+        assert (reference_replica.stale_models() == [Mob])
+        reference_replica.refresh()
+        assert (reference_replica.table(Mob) is not loaded)
+        assert (reference_replica.table(Mob).get(zombie).damage == 5)
+
+    def test_write_swaps_in_a_rebuilt_table(self, client, zombie):
+        ''' Tests that a committed write rebuilds the table in the background and the next read is served from it. '''
+        loaded = reference_replica.table(Mob)
+        client.patch(f"/api/mobs/{zombie}", json={"damage": 5, "name": "Husk"})
+        reference_replica.wait_for_refresh(timeout=10)
+        rebuilt = reference_replica.table(Mob)
+        assert (rebuilt is not None and rebuilt is not loaded)
+        assert ((rebuilt.get(zombie).damage, rebuilt.named("Husk"), rebuilt.named("Zombie")) == (5, (rebuilt.get(zombie),), ()))
+        assert ((loaded.get(zombie).damage, loaded.named("Zombie")) == (3, (loaded.get(zombie),)))
+        with count_queries() as queries:
+            assert (client.get("/api/mobs?name=Husk").get_json()[0]["damage"] == 5)
+        assert (queries.count == 0)
+
+class TestRecordTable:
+    '''  Testing class for assessing lookups in a table of replicated records. '''
+
+    def test_lookups_by_id_and_name(self):
+        ''' Tests that records are found by ID and by name, with every record sharing a name listed in ID order. '''
+        table = build_record_table(MobRecord, [mob_row(1, "Zombie"), mob_row(2, "Skeleton"), mob_row(5, "Zombie")], 0, 0.0)
+        assert ((table.get(2).name, table.get(3)) == ("Skeleton", None))
+        assert ([record.id for record in table.named("Zombie")] == [1, 5])
+        assert (table.named("Creeper") == ())
+        assert (table.listed() == table.records)
+        assert (table.listed("Skeleton") == (table.get(2),))
+
+    @pytest.mark.parametrize("replicated", [True, False], ids=["replica", "sql"])
+    def test_name_filter(self, client, zombie, monkeypatch, replicated):
+        ''' Tests that `?name=` lists exactly the mobs with that name, from memory or from SQL alike. '''
+        monkeypatch.setitem(app.config, "REFERENCE_REPLICA_ENABLED", replicated)
+        db.session.add_all([Mob(name="Skeleton"), Mob(name="Zombie")])
+        db.session.commit()
+        reference_replica.clear()
+        zombies = client.get("/api/mobs?name=Zombie").get_json()
+        assert ([mob["name"] for mob in zombies] == ["Zombie", "Zombie"])
+        assert (zombies[0]["id"] == zombie and zombies[0]["id"] < zombies[1]["id"])
+        assert (client.get("/api/mobs?name=Creeper").get_json() == [])
+        page = client.get("/api/mobs?name=Zombie&limit=1")
+        assert ("name=Zombie" in page.headers["Link"])
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import pytest
+
+from models import Player, Mob, Biome, Spawn
+from serializers import serialize, find_parity_mismatches
+from wsgi import ROUTE_SERIALIZERS
+
+def build_serialization_fixtures():
+    ''' Builds transient rows with spawns on both sides, rows without spawns, and NULL columns. '''
+    mobs = [Mob(id=index, name=f"Mob {index}", hit_points=index * 10, damage=index % 9, speed=index % 5,
+                is_hostile=index % 2 == 0, can_spawn_during_daytime=index % 3 == 0) for index in range(1, 6)]
+    biomes = [Biome(id=index, name=f"Biome {index}", elevation="base", rarity="common",
+                    is_in_overworld=True, is_in_nether=index % 2 == 0, is_in_end=False) for index in range(1, 6)]
+    spawns = [Spawn(id=index, mob=mobs[index % 3], biome=biomes[index % 4], hour_spawned=index % 24) for index in range(1, 11)]
+    mobs.append(Mob(id=6))
+    biomes.append(Biome(id=6))
+    spawns.append(Spawn(id=11, hour_spawned=None))
+    players = [Player(id=index, username=f"player_{index}", password="not-a-real-hash", kills=index,
+                      deaths=index % 3, experience=index * 3, created_at=datetime(2023, 9, 11, 8, index)) for index in range(1, 4)]
+    players.append(Player(id=4, username="player_4", password="not-a-real-hash", kills=0, deaths=0, experience=1, created_at=None))
+    return {Mob: mobs, Biome: biomes, Spawn: spawns, Player: players}
+
+class TestCompiledSerializers:
+    '''  Testing class for assessing parity of `serializers.serialize()` with `to_dict()`. '''
+
+    @pytest.mark.parametrize("model, only, rules", ROUTE_SERIALIZERS,
+                             ids=[f"{model.__name__}-{only or 'all'}-{rules or 'default'}" for model, only, rules in ROUTE_SERIALIZERS])
+    def test_matches_to_dict_for_every_route_serializer(self, model, only, rules):
+        ''' Tests that every (only, rules) set the routes use serializes exactly like `to_dict()`. '''
+        rows = build_serialization_fixtures()[model]
+        mismatches = find_parity_mismatches(rows, only=only, rules=rules)
+        assert (mismatches == []), "\n".join(
+            f"{serialize(row, only=only, rules=rules)} != {row.to_dict(only=only, rules=rules)}" for row in mismatches
+        )
+
+    def test_covers_every_model(self):
+        ''' Tests that the route serializers cover Mob, Biome, Spawn, and Player. '''
+        assert ({model for model, _, _ in ROUTE_SERIALIZERS} == {Mob, Biome, Spawn, Player})
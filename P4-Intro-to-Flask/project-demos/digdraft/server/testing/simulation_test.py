@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import simulation
+from simulation import SpawnWorld, SEED_TICKS, draw_uniforms, simulate_spawns
+
+def build_world(biome_count: int, mob_count: int):
+    ''' Builds a world in memory, where every mob can live in every biome. '''
+    return SpawnWorld(
+        mob_ids=np.arange(1, mob_count + 1),
+        mob_names=np.array([f"Mob {index}" for index in range(mob_count)], dtype=object),
+        mob_spawns_by_day=np.arange(mob_count) % 2 == 0,
+        mob_dimensions=np.ones(mob_count, dtype=np.uint8),
+        mob_activity=np.ones((mob_count, 24), dtype=np.float32),
+        biome_ids=np.arange(1, biome_count + 1),
+        biome_names=np.array([f"Biome {index}" for index in range(biome_count)], dtype=object),
+        biome_weights=np.linspace(0.2, 1.0, biome_count, dtype=np.float32),
+        biome_dimensions=np.ones(biome_count, dtype=np.uint8),
+    )
+
+class TestSpawnSimulation:
+    '''  Testing class for assessing `simulation.simulate_spawns()`. '''
+
+    @pytest.mark.parametrize("biome_count, mob_count", [(1, 1), (3, 5), (7, 3)])
+    def test_draws_match_one_sequential_stream(self, biome_count, mob_count):
+        ''' Tests that skipping ahead to any tick or biome gives the same draws as reading the whole stream. '''
+        stream = np.random.default_rng((1, 0)).random(dtype=np.float32, size=10 * biome_count * mob_count)
+        stream = stream.reshape(10, biome_count, mob_count)
+        for tick in range(10):
+            for biome in range(biome_count):
+                draws = np.empty((1, 1, mob_count), dtype=np.float32)
+                draw_uniforms(1, range(tick, tick + 1), slice(biome, biome + 1), biome_count, mob_count, draws)
+                assert (draws[0, 0] == stream[tick, biome]).all()
+        draws = np.empty((7, biome_count, mob_count), dtype=np.float32)
+        draw_uniforms(1, range(3, 10), slice(0, biome_count), biome_count, mob_count, draws)
+        assert (draws == stream[3:]).all()
+
+    @pytest.mark.parametrize("chunk_candidates", [1, 6, 35, 1000, 2_000_000])
+    def test_spawns_do_not_depend_on_chunk_size(self, database, chunk_candidates):
+        ''' Tests that every chunk size, including blocks of biomes within one tick, gives the same spawns. '''
+        world = build_world(7, 5)
+        expected = simulate_spawns(world, SEED_TICKS - 20, SEED_TICKS + 20, seed=3, event_limit=10_000)
+        simulated = simulate_spawns(world, SEED_TICKS - 20, SEED_TICKS + 20, seed=3, event_limit=10_000, chunk_candidates=chunk_candidates)
+        assert (simulated.events == expected.events)
+        assert (simulated.spawns > 0)
+
+    def test_spawns_do_not_depend_on_tick_range(self, database):
+        ''' Tests that a tick's spawns are the same in any tick range containing it. '''
+        world = build_world(3, 4)
+        whole = simulate_spawns(world, 0, 3 * SEED_TICKS, seed=9, event_limit=100_000)
+        part = simulate_spawns(world, SEED_TICKS + 100, 2 * SEED_TICKS + 100, seed=9, event_limit=100_000)
+        assert (part.events == [event for event in whole.events if SEED_TICKS + 100 <= event[0] < 2 * SEED_TICKS + 100])
+
+    def test_generators_are_created_per_block_of_ticks(self, database, monkeypatch):
+        ''' Tests that a long simulation of a tiny world creates one generator per `SEED_TICKS` ticks, not per tick. '''
+        created = []
+        default_rng = np.random.default_rng
+        monkeypatch.setattr(simulation.np.random, "default_rng", lambda seed: created.append(seed) or default_rng(seed))
+        simulate_spawns(build_world(1, 1), 0, 100_000)
+        assert (len(created) <= 100_000 // SEED_TICKS + 2)
+
+
+# Imports the app with NumPy made unimportable, then requests a simulation as a new player.
+WITHOUT_NUMPY_SCRIPT = """
+import sys
+sys.modules["numpy"] = None
+from config import app, db
+import app as digdraft_routes
+assert "simulation" not in sys.modules
+with app.app_context():
+    db.create_all()
+    client = app.test_client()
+    client.post("/players", json={"username": "Alex", "password": "password"})
+    response = client.get("/api/simulate")
+    print(response.status_code, client.get("/api/mobs").status_code)
+"""
+
+class TestWithoutNumpy:
+    '''  Testing class for assessing that NumPy is only needed to run a simulation. '''
+
+    def test_app_runs_without_numpy(self, tmp_path):
+        ''' Tests that the app imports and serves without NumPy, answering `/api/simulate` with 501. '''
+        environment = dict(os.environ, DIGDRAFT_DATABASE_URI=f"sqlite:///{tmp_path / 'without_numpy.db'}")
+        server_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-c", WITHOUT_NUMPY_SCRIPT], cwd=server_directory, env=environment,
+                                capture_output=True, text=True, timeout=60)
+        assert (result.returncode == 0), result.stderr
+        assert (result.stdout.split() == ["501", "200"])
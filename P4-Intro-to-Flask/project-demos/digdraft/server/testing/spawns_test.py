@@ -0,0 +1,42 @@
+from sqlalchemy import inspect, text
+
+import pytest
+
+from config import app, db
+from models import Spawn, find_spawns
+
+SPAWN_INDEX_NAMES = {index.name for index in Spawn.__table__.indexes}
+
+def spawn_index_names():
+    return {index["name"] for index in inspect(db.engine).get_indexes("spawn_table")}
+
+def query_plan(query):
+    compiled = query.compile(db.engine, compile_kwargs={"literal_binds": True})
+    return " ".join(row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+
+class TestSpawnIndexes:
+    '''  Testing class for assessing the spawn search indexes and `flask create-spawn-indexes`. '''
+
+    def test_command_adds_missing_indexes(self, database):
+        ''' Tests that the CLI command creates the indexes on a database made without them, and can be rerun. '''
+        for index_name in SPAWN_INDEX_NAMES:
+            db.session.execute(text(f"DROP INDEX {index_name}"))
+        db.session.commit()
+        assert (spawn_index_names() & SPAWN_INDEX_NAMES == set())
+
+        runner = app.test_cli_runner()
+        for _ in range(2):
+            result = runner.invoke(args=["create-spawn-indexes"])
+            assert (result.exit_code == 0)
+            assert (f"Created {len(SPAWN_INDEX_NAMES)} spawn index(es)" in result.output)
+        assert (spawn_index_names() >= SPAWN_INDEX_NAMES)
+
+    @pytest.mark.parametrize("filters, index_name", [
+        ({"mob_id": 1, "from_hour": 18, "to_hour": 23}, "ix_spawn_table_mob_id_hour_spawned"),
+        ({"biome_id": 1}, "ix_spawn_table_biome_id_hour_spawned"),
+        ({"from_hour": 6, "to_hour": 12}, "ix_spawn_table_hour_spawned"),
+    ])
+    def test_searches_use_an_index(self, database, filters, index_name):
+        ''' Tests that spawn searches by mob, biome, or hour range search an index instead of scanning the table. '''
+        plan = query_plan(find_spawns(**filters))
+        assert (f"USING INDEX {index_name}" in plan), plan
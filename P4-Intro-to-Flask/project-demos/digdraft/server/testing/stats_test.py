@@ -0,0 +1,30 @@
+from config import db
+from models import Mob, Biome, Spawn
+
+class TestAverageHitPoints:
+    '''  Testing class for assessing `GET /api/stats/biomes/average-hit-points`. '''
+
+    def test_null_hit_points_are_skipped(self, client):
+        ''' Tests that biomes whose mobs all lack hit points average to null instead of failing. '''
+        plains, desert = Biome(name="Plains"), Biome(name="Desert")
+        zombie, husk, blaze = Mob(name="Zombie", hit_points=20), Mob(name="Husk", hit_points=None), Mob(name="Blaze", hit_points=11)
+        db.session.add_all([
+            Spawn(mob=zombie, biome=plains, hour_spawned=1), Spawn(mob=husk, biome=plains, hour_spawned=2),
+            Spawn(mob=blaze, biome=plains, hour_spawned=3), Spawn(mob=husk, biome=desert, hour_spawned=4),
+        ])
+        db.session.commit()
+
+        response = client.get("/api/stats/biomes/average-hit-points")
+        assert (response.status_code == 200)
+        averages = {row["biome_name"]: (row["average_hit_points"], row["mob_count"]) for row in response.get_json()}
+        assert (averages == {"Plains": (15.5, 3), "Desert": (None, 1)})
+
+    def test_patching_hit_points_to_null(self, client):
+        ''' Tests that the statistic still answers after a PATCH sets a mob's hit points to null. '''
+        db.session.add(Spawn(mob=Mob(name="Zombie", hit_points=20), biome=Biome(name="Plains"), hour_spawned=1))
+        db.session.commit()
+
+        assert (client.patch("/api/mobs/1", json={"hit_points": None}).status_code == 200)
+        response = client.get("/api/stats/biomes/average-hit-points")
+        assert (response.status_code == 200)
+        assert (response.get_json()[0]["average_hit_points"] is None)
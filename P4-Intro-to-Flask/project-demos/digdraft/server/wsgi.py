@@ -0,0 +1,101 @@
+#######################################################
+############## IMPORTS AND INSTANTIATIONS #############
+#######################################################
+
+
+# Get database instance and Flask application connection.
+from config import app, db
+# Register the API's routes on the application. (Imported under an alias so it does not shadow `app`.)
+import app as digdraft_routes
+# Get all physical models.
+from models import Player, Mob, Biome, Spawn
+# Version counters shared by every worker's response cache.
+from caching import table_versions, VERSIONED_TABLES
+# Compiled serializers, built once before forking.
+from serializers import get_serializer
+# In-memory snapshot of mobs and biomes, loaded once before forking.
+from replica import warm_reference_replica
+# In-memory leaderboard ranks, also loaded once before forking.
+from leaderboard import PLAYER_SCORES_VERSION, warm_player_rankings
+# Pre-forking multi-worker launcher.
+from prefork import serve_from_command_line
+
+from sqlalchemy import func, select
+
+import os
+import sys
+import time
+
+
+"""
+Production entry point for the Digdraft API.
+
+    python wsgi.py --workers 4 --bind 0.0.0.0:5555
+
+This serves `application` from pre-forked worker processes (see `prefork.py`),
+rather than from the single process that `app.run()` starts. Any WSGI server
+can also import `wsgi:application` directly.
+
+    -> `before_fork()` runs once in the master. It compiles every route's
+       serializers, so that workers inherit them, and moves the response
+       cache's table versions into shared memory, so that a write in one
+       worker invalidates cached responses (and replicated tables) in all of
+       them. It then loads the reference replica, which workers share
+       copy-on-write until a write replaces it.
+    -> `after_fork()` runs in each worker before it accepts any traffic. It
+       opens the worker's own SQLite connections (tuned by the `connect` event
+       in `config.py`) and reads each table once to warm the page caches.
+"""
+
+application = app
+
+# (model, only, rules) combinations serialized by the routes in `app.py`.
+ROUTE_SERIALIZERS = [
+    (Mob, (), ()),
+    (Mob, (), ("-spawns",)),
+    (Biome, (), ()),
+    (Biome, (), ("-spawns",)),
+    (Spawn, (), ("-mob",)),
+    (Spawn, (), ("-biome",)),
+    (Spawn, (), ("-mob", "-biome")),
+    (Player, ("id", "username", "created_at"), ()),
+    (Player, ("id", "kills", "deaths", "experience", "username", "created_at"), ()),
+]
+
+
+#######################################################
+########## HOOKS AROUND FORKING WORKER PROCESSES ######
+#######################################################
+
+
+def before_fork():
+    table_versions.share_between_processes(VERSIONED_TABLES | {PLAYER_SCORES_VERSION})
+    for model, only, rules in ROUTE_SERIALIZERS:
+        get_serializer(model, only=only, rules=rules)
+    # NOTE: Loaded after the table versions move to shared memory, so that workers inherit a current snapshot.
+    warm_reference_replica()
+    warm_player_rankings()
+    # NOTE: SQLite connections must never cross a fork; each worker opens its own.
+    with app.app_context():
+        db.engine.dispose()
+
+def after_fork():
+    started_at = time.perf_counter()
+    with app.app_context():
+        db.engine.dispose(close=False)
+        # NOTE: Checking out a full pool runs the connection pragmas before the first request needs them.
+        connections = [db.engine.connect() for _ in range(db.engine.pool.size())]
+        for table in db.metadata.sorted_tables:
+            connections[0].execute(select(func.count()).select_from(table))
+        for connection in connections:
+            connection.close()
+    print(f" * Worker {os.getpid()} warmed up in {(time.perf_counter() - started_at) * 1000:.1f}ms.", file=sys.stderr)
+
+
+#######################################################
+######### PRE-FORKED SERVER FOR EXECUTION #############
+#######################################################
+
+
+if __name__ == "__main__":
+    serve_from_command_line(application, before_fork=before_fork, after_fork=after_fork)